@@ -36,10 +36,13 @@ why the agent chose a particular tool.
 ────────────────────────────────────────────────────────────────
 """
 
-from typing import Optional, Tuple
+from typing import List, Literal, Optional, Tuple
 from langchain_core.messages import SystemMessage, HumanMessage
+from pydantic import BaseModel, Field
 
-from app.config import ANTHROPIC_API_KEY, OPENAI_API_KEY, LLM_MODEL, LLM_PROVIDER
+from app.config import ROUTER_ENABLED, ROUTER_CONFIDENCE_THRESHOLD
+from app.agents.query_router import query_router
+from app.llm.client_registry import get_chat_model
 from app.models.schemas import UserRole
 from app.security.permissions import get_allowed_access_levels
 from app.tools.company_tools import (
@@ -63,103 +66,168 @@ Given a user's question, decide which approach is best:
 4. "summarize"   — Document summarizer (use when user says "summarize the [document name]")
 5. "list"        — List available documents (use when user asks what documents/policies exist, or asks to summarize "everything" or "all documents")
 
-Respond with ONLY ONE of these five words: rag, calculate, policy, summarize, list
-No explanation needed."""
+Also fill in the arguments of the chosen tool:
+  - calculate: salary and bonus_rate, if the query gives them (bonus_rate as a decimal: 10% → 0.10)
+  - policy:    policy_name
+  - summarize: document_name
+Leave every other argument empty."""
 
 
-def _get_llm(max_tokens: int = 10):
-    """Return LLM instance based on configured provider."""
-    if LLM_PROVIDER == "anthropic":
-        from langchain_anthropic import ChatAnthropic
-        return ChatAnthropic(
-            model=LLM_MODEL,
-            anthropic_api_key=ANTHROPIC_API_KEY,
-            temperature=0,
-            max_tokens=max_tokens,
-        )
-    else:
-        from langchain_openai import ChatOpenAI
-        return ChatOpenAI(
-            model=LLM_MODEL,
-            openai_api_key=OPENAI_API_KEY,
-            temperature=0,
-            max_tokens=max_tokens,
-        )
+VALID_CLASSES = {"rag", "calculate", "policy", "summarize", "list"}
+
+# Routes whose handler needs no arguments: a confident router decision is
+# final for these, so they never cost an LLM call.
+NO_ARGUMENT_ROUTES = {"rag", "list"}
 
 
-def classify_query(query: str, user_id: str) -> str:
+class AgentDecision(BaseModel):
     """
-    Use the LLM to classify what approach should handle this query.
+    Route plus typed tool arguments, returned by ONE structured-output call.
 
-    This is the "Thought" step of the ReAct loop.
-    Returns one of: "rag", "calculate", "policy", "summarize"
+    The LLM fills this through tool calling (with_structured_output), so
+    there is no free-text JSON to scrape and no keyword matching: policy
+    and document names are constrained to the keys the tools accept.
     """
-    log_workflow_step("classify_query", user_id, f"query='{query[:60]}'")
+    route:         Literal["rag", "calculate", "policy", "summarize", "list"]
+    salary:        Optional[float] = Field(None, description="Annual salary in dollars (calculate only)")
+    bonus_rate:    Optional[float] = Field(None, description="Bonus rate as a decimal, e.g. 0.10 for 10% (calculate only)")
+    policy_name:   Optional[Literal[tuple(POLICY_DATABASE)]] = Field(
+        None, description="Policy to look up (policy only)"
+    )
+    document_name: Optional[Literal[tuple(DOCUMENT_SUMMARIES)]] = Field(
+        None, description="Document to summarize (summarize only)"
+    )
+
+
+def _get_llm(max_tokens: int = 10):
+    """Return the shared LLM instance for the configured provider (see client_registry.py)."""
+    return get_chat_model(max_tokens=max_tokens)
 
-    llm = _get_llm(max_tokens=10)
 
-    messages = [
+def _get_decision_llm():
+    """LLM bound to the AgentDecision schema (tool calling / structured output)."""
+    return _get_llm(max_tokens=150).with_structured_output(AgentDecision)
+
+
+def _classification_messages(query: str) -> list:
+    return [
         SystemMessage(content=CLASSIFICATION_SYSTEM_PROMPT),
         HumanMessage(content=f"Query: {query}"),
     ]
 
+
+def _parse_decision(decision, user_id: str) -> AgentDecision:
+    """Validate the structured response (raises if the model returned no tool call)."""
+    if not isinstance(decision, AgentDecision):
+        raise ValueError(f"expected AgentDecision, got {type(decision).__name__}")
+
+    arguments = decision.model_dump(exclude={"route"}, exclude_none=True)
+    log_workflow_step("classify_query", user_id, "classified_as=%s | args=%s", decision.route, arguments)
+    return decision
+
+
+def _route_by_embedding(query_embedding: Optional[List[float]], user_id: str) -> Optional[str]:
+    """
+    Nearest-centroid routing from the query embedding (see query_router.py).
+    Returns None when the router is off, has no embedding, or is not confident
+    enough — the caller then asks the LLM.
+    """
+    if not ROUTER_ENABLED or query_embedding is None:
+        return None
+
     try:
-        response = llm.invoke(messages)
-        classification = response.content.strip().lower()
+        classification, confidence = query_router.route(query_embedding)
+    except Exception as e:
+        logger.error(f"[AGENT] Router error: {e}")
+        return None
+
+    if confidence < ROUTER_CONFIDENCE_THRESHOLD:
+        logger.info(
+            "[AGENT] Router unsure (%s, margin=%.4f) — asking the LLM",
+            classification, confidence,
+        )
+        return None
+
+    log_workflow_step(
+        "classify_query", user_id,
+        "classified_as=%s | router margin=%.4f", classification, confidence,
+    )
+    return classification
+
+
+def classify_query(
+    query: str,
+    user_id: str,
+    query_embedding: Optional[List[float]] = None,
+) -> AgentDecision:
+    """
+    Decide what approach should handle this query, and with which arguments.
+
+    This is the "Thought" step of the ReAct loop.
+      - The embedding router settles "rag" and "list" without an LLM call.
+      - Everything else takes ONE structured-output call that returns the
+        route together with the tool's typed arguments.
+    """
+    log_workflow_step("classify_query", user_id, "query='%.60s'", query)
 
-        # Validate the response is one of our expected values
-        valid_classes = {"rag", "calculate", "policy", "summarize", "list"}
-        if classification not in valid_classes:
-            logger.warning(f"[AGENT] Unexpected classification '{classification}', defaulting to 'rag'")
-            classification = "rag"
+    routed = _route_by_embedding(query_embedding, user_id)
+    if routed in NO_ARGUMENT_ROUTES:
+        return AgentDecision(route=routed)
 
-        log_workflow_step("classify_query", user_id, f"classified_as={classification}")
-        return classification
+    try:
+        decision = _get_decision_llm().invoke(_classification_messages(query))
+        return _parse_decision(decision, user_id)
 
     except Exception as e:
         logger.error(f"[AGENT] Classification error: {e}")
-        return "rag"  # Safe default: use document search
+        return AgentDecision(route=routed or "rag")  # Safe default: use document search
+
+
+async def aclassify_query(
+    query: str,
+    user_id: str,
+    query_embedding: Optional[List[float]] = None,
+) -> AgentDecision:
+    """Async variant of classify_query (awaits the structured call with ainvoke)."""
+    log_workflow_step("classify_query", user_id, "query='%.60s'", query)
+
+    routed = _route_by_embedding(query_embedding, user_id)
+    if routed in NO_ARGUMENT_ROUTES:
+        return AgentDecision(route=routed)
+
+    try:
+        decision = await _get_decision_llm().ainvoke(_classification_messages(query))
+        return _parse_decision(decision, user_id)
+
+    except Exception as e:
+        logger.error(f"[AGENT] Classification error: {e}")
+        return AgentDecision(route=routed or "rag")  # Safe default: use document search
 
 
 # ──────────────────────────────────────────────
 # Tool Executors
+# Arguments come typed from AgentDecision; None means "not in the query".
 # ──────────────────────────────────────────────
 
-def execute_calculate_tool(query: str, user_id: str) -> Tuple[str, str]:
+def execute_calculate_tool(
+    salary: Optional[float],
+    bonus_rate: Optional[float],
+    user_id: str,
+) -> Tuple[str, str]:
     """
-    Handle calculation queries by extracting parameters and calling the tool.
+    Call the bonus calculator with the arguments extracted by classify_query.
 
-    The agent uses the LLM to extract structured parameters from natural
-    language, then calls the actual Python function.
+    Missing values fall back to salary=50000, bonus_rate=0.10. A rate given
+    as a percentage (10 instead of 0.10) is converted to a decimal.
 
     Returns: (tool_result, tool_name)
     """
     log_workflow_step("execute_tool", user_id, "tool=calculate_bonus")
 
-    # Use LLM to extract salary and rate from natural language
-    extractor_llm = _get_llm(max_tokens=50)
-
-    extraction_prompt = """Extract the salary and bonus rate from this query.
-Return ONLY JSON in this format: {"salary": 50000, "bonus_rate": 0.10}
-If values are missing, use defaults: salary=50000, bonus_rate=0.10
-Query: """ + query
-
-    try:
-        import json
-        response = extractor_llm.invoke([HumanMessage(content=extraction_prompt)])
-        # Extract JSON from response
-        text = response.content.strip()
-        # Find JSON object in response
-        start = text.find("{")
-        end = text.rfind("}") + 1
-        if start >= 0 and end > start:
-            params = json.loads(text[start:end])
-            salary = float(params.get("salary", 50000))
-            bonus_rate = float(params.get("bonus_rate", 0.10))
-        else:
-            salary, bonus_rate = 50000.0, 0.10
-    except Exception:
-        salary, bonus_rate = 50000.0, 0.10
+    salary = salary if salary is not None else 50000.0
+    bonus_rate = bonus_rate if bonus_rate is not None else 0.10
+    if bonus_rate > 1:
+        bonus_rate /= 100
 
     # Execute the tool (this is the "Action" step)
     result = calculate_bonus.invoke({"salary": salary, "bonus_rate": bonus_rate})
@@ -168,9 +236,13 @@ Query: """ + query
     return str(result), "calculate_bonus"
 
 
-def execute_policy_tool(query: str, user_id: str, user_role: Optional[UserRole] = None) -> Tuple[str, str]:
+def execute_policy_tool(
+    policy_name: Optional[str],
+    user_id: str,
+    user_role: Optional[UserRole] = None,
+) -> Tuple[str, str]:
     """
-    Extract the policy name from the query and look it up.
+    Look up the policy named by classify_query (default: vacation).
 
     Permission check: before calling the tool, verify the matched policy's
     access_level is within the user's allowed levels. This prevents a user
@@ -181,22 +253,7 @@ def execute_policy_tool(query: str, user_id: str, user_role: Optional[UserRole]
     """
     log_workflow_step("execute_tool", user_id, "tool=lookup_employee_policy")
 
-    # Map common query keywords to policy names
-    query_lower = query.lower()
-    if "vacation" in query_lower or "holiday" in query_lower or "time off" in query_lower:
-        policy_name = "vacation"
-    elif "sick" in query_lower or "illness" in query_lower:
-        policy_name = "sick_leave"
-    elif "remote" in query_lower or "work from home" in query_lower or "wfh" in query_lower:
-        policy_name = "remote_work"
-    elif "parental" in query_lower or "maternity" in query_lower or "paternity" in query_lower:
-        policy_name = "maternity_paternity"
-    elif "performance" in query_lower or "review" in query_lower or "evaluation" in query_lower:
-        policy_name = "performance_review"
-    elif "compensation" in query_lower or "salary band" in query_lower or "pay band" in query_lower:
-        policy_name = "compensation_bands"
-    else:
-        policy_name = "vacation"
+    policy_name = policy_name or "vacation"
 
     # ── Permission Check ──────────────────────────────────────────────
     # Resolve allowed access levels for this user's role.
@@ -206,7 +263,7 @@ def execute_policy_tool(query: str, user_id: str, user_role: Optional[UserRole]
     if entry and entry["access_level"] not in allowed_levels:
         log_workflow_step(
             "permission_denied", user_id,
-            f"policy='{policy_name}' requires '{entry['access_level']}', user has {allowed_levels}"
+            "policy='%s' requires '%s', user has %s", policy_name, entry["access_level"], allowed_levels,
         )
         return (
             "You don't have permission to access this policy. "
@@ -220,9 +277,13 @@ def execute_policy_tool(query: str, user_id: str, user_role: Optional[UserRole]
     return str(result), "lookup_employee_policy"
 
 
-def execute_summarize_tool(query: str, user_id: str, user_role: Optional[UserRole] = None) -> Tuple[str, str]:
+def execute_summarize_tool(
+    document_name: Optional[str],
+    user_id: str,
+    user_role: Optional[UserRole] = None,
+) -> Tuple[str, str]:
     """
-    Extract the document name from the query and return its summary.
+    Return the summary of the document named by classify_query (default: HR handbook).
 
     Permission check: verify the document's access_level against the user's
     role before invoking the tool. Prevents the tool path from leaking
@@ -232,17 +293,7 @@ def execute_summarize_tool(query: str, user_id: str, user_role: Optional[UserRol
     """
     log_workflow_step("execute_tool", user_id, "tool=summarize_document")
 
-    query_lower = query.lower()
-    if "hr" in query_lower or "handbook" in query_lower or "human resources" in query_lower:
-        doc_name = "hr_handbook"
-    elif "it" in query_lower or "security" in query_lower or "tech" in query_lower:
-        doc_name = "it_security"
-    elif "finance" in query_lower or "financial" in query_lower or "expense" in query_lower:
-        doc_name = "finance_policy"
-    elif "exec" in query_lower or "executive" in query_lower or "compensation" in query_lower:
-        doc_name = "exec_compensation"
-    else:
-        doc_name = "hr_handbook"  # Default
+    doc_name = document_name or "hr_handbook"
 
     # ── Permission Check ──────────────────────────────────────────────
     allowed_levels = get_allowed_access_levels(user_role) if user_role else []
@@ -250,7 +301,7 @@ def execute_summarize_tool(query: str, user_id: str, user_role: Optional[UserRol
     if entry and entry["access_level"] not in allowed_levels:
         log_workflow_step(
             "permission_denied", user_id,
-            f"document='{doc_name}' requires '{entry['access_level']}', user has {allowed_levels}"
+            "document='%s' requires '%s', user has %s", doc_name, entry["access_level"], allowed_levels,
         )
         return (
             "You don't have permission to access this document. "
@@ -292,6 +343,7 @@ def run_agent(
     query: str,
     user_id: str,
     user_role: Optional[UserRole] = None,
+    query_embedding: Optional[List[float]] = None,
 ) -> Tuple[str, Optional[str], bool]:
     """
     Main agent function: classify the query and route to the right handler.
@@ -302,38 +354,66 @@ def run_agent(
       - Is this a policy summary? → execute tool, return result
       - Is this a document summary? → execute tool, return result
 
+    query_embedding (optional) lets the embedding router settle RAG and
+    list queries without an LLM call. Tool queries take exactly one LLM
+    call, which also extracts the tool's arguments.
+
     Returns:
         (result_or_signal, tool_used_name, is_tool_answer)
         - If classification is "rag": returns ("rag", None, False)
           The workflow will handle RAG separately
         - If a tool was used: returns (tool_result, tool_name, True)
     """
-    log_workflow_step("agent_start", user_id, f"query='{query[:60]}'")
+    log_workflow_step("agent_start", user_id, "query='%.60s'", query)
 
-    # Step 1: THOUGHT — classify what this query needs
-    classification = classify_query(query, user_id)
+    # Step 1: THOUGHT — classify what this query needs (route + tool arguments)
+    decision = classify_query(query, user_id, query_embedding)
 
     # Step 2: ACTION — execute based on classification
-    if classification == "rag":
+    # OBSERVATION: the tool's result is returned to the workflow
+    return _dispatch(decision, user_id, user_role)
+
+
+async def arun_agent(
+    query: str,
+    user_id: str,
+    user_role: Optional[UserRole] = None,
+    query_embedding: Optional[List[float]] = None,
+) -> Tuple[str, Optional[str], bool]:
+    """
+    Async variant of run_agent. Only the classification call is awaited;
+    the tools themselves are local lookups and run inline.
+    """
+    log_workflow_step("agent_start", user_id, "query='%.60s'", query)
+
+    decision = await aclassify_query(query, user_id, query_embedding)
+    return _dispatch(decision, user_id, user_role)
+
+
+def _dispatch(
+    decision: AgentDecision,
+    user_id: str,
+    user_role: Optional[UserRole],
+) -> Tuple[str, Optional[str], bool]:
+    """Route a decision to RAG or to its tool, with the extracted arguments."""
+    if decision.route == "rag":
         # Signal to the workflow: handle this with RAG
         log_workflow_step("agent_decision", user_id, "routing to RAG pipeline")
         return "rag", None, False
 
-    elif classification == "calculate":
-        # ACTION: use calculator tool
-        # OBSERVATION: get the calculation result
-        result, tool_name = execute_calculate_tool(query, user_id)
+    elif decision.route == "calculate":
+        result, tool_name = execute_calculate_tool(decision.salary, decision.bonus_rate, user_id)
         return result, tool_name, True
 
-    elif classification == "policy":
-        result, tool_name = execute_policy_tool(query, user_id, user_role)
+    elif decision.route == "policy":
+        result, tool_name = execute_policy_tool(decision.policy_name, user_id, user_role)
         return result, tool_name, True
 
-    elif classification == "summarize":
-        result, tool_name = execute_summarize_tool(query, user_id, user_role)
+    elif decision.route == "summarize":
+        result, tool_name = execute_summarize_tool(decision.document_name, user_id, user_role)
         return result, tool_name, True
 
-    elif classification == "list":
+    elif decision.route == "list":
         result, tool_name = execute_list_tool(user_id, user_role)
         return result, tool_name, True
 
@@ -0,0 +1,171 @@
+"""
+app/agents/query_router.py — Embedding-Based Query Router
+
+[Concept: Nearest-Centroid Classification over Query Embeddings]
+
+────────────────────────────────────────────────────────────────
+WHY ROUTE WITH EMBEDDINGS?
+────────────────────────────────────────────────────────────────
+classify_query used to make a full LLM round trip only to get back
+ONE word: rag, calculate, policy, summarize or list. On the RAG
+path the same query was then embedded again for retrieval.
+
+The router embeds the query ONCE and reuses that vector twice:
+
+  query ──embed──► vector ──► nearest centroid ──► route
+                      │
+                      └──────► retrieve_documents (no second embed)
+
+Each route has a handful of labeled example queries (ROUTE_EXAMPLES).
+Their embeddings are averaged into one unit-length CENTROID per
+route. A query goes to the route whose centroid has the highest
+cosine similarity.
+
+CONFIDENCE is the margin between the best and the second-best
+route. Embeddings of short questions are close together, so a
+small margin means "ambiguous": below ROUTER_CONFIDENCE_THRESHOLD
+the caller falls back to the LLM classifier. Tool routes need
+arguments (salary, policy name, ...), so classify_query only takes
+a confident "rag" or "list" as final.
+
+The example embeddings go through the shared embedding cache, so
+after the first start-up the centroids cost no API calls.
+────────────────────────────────────────────────────────────────
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.vector_store.chroma_store import vector_store
+from app.observability.logger import logger
+
+
+# ──────────────────────────────────────────────
+# Labeled examples (one centroid per route)
+#
+# Kept disjoint from demo_queries.py so benchmarks/query_router.py
+# measures the router on queries it has not seen.
+# ──────────────────────────────────────────────
+
+ROUTE_EXAMPLES: Dict[str, List[str]] = {
+    "rag": [
+        "How many paid holidays do new employees receive?",
+        "How many sick days am I entitled to per year?",
+        "Do I need to keep receipts for small expenses?",
+        "How long does my account password have to be?",
+        "Is multi-factor authentication required for VPN access?",
+        "Who approves travel expenses over the limit?",
+        "What does the handbook say about overtime pay?",
+        "What equity do executives receive?",
+        "Can I carry unused vacation days over to next year?",
+        "How do I report a lost laptop?",
+        "What is the per diem for business travel?",
+        "When are performance reviews held and who conducts them?",
+    ],
+    "calculate": [
+        "Calculate the bonus on a 60000 salary at an 8 percent rate",
+        "What would my bonus be on a salary of 80000 at 15%?",
+        "Compute a 12% bonus for someone earning 65,000",
+        "How much is a 5 percent bonus on 120000?",
+        "Calculate my bonus: salary 95000, bonus rate 0.08",
+        "If I make 70k and the bonus rate is 10%, what is my bonus?",
+    ],
+    "policy": [
+        "Quick summary of the vacation policy please",
+        "Quick overview of the sick leave policy",
+        "Briefly, what is the parental leave policy?",
+        "Look up the vacation policy",
+        "Give me the short version of the performance review policy",
+        "Quick lookup: compensation bands policy",
+        "Summarize the work from home policy in a few lines",
+    ],
+    "summarize": [
+        "Summarize the human resources handbook for me",
+        "Give me a summary of the IT security document",
+        "Summarize the finance policy document",
+        "Can you summarize the executive compensation document?",
+        "Provide an overview of the employee handbook",
+        "What are the main points of the IT security handbook?",
+    ],
+    "list": [
+        "What documents are available?",
+        "List all the policies I can access",
+        "Which documents can I see?",
+        "Summarize all documents",
+        "Give me a summary of everything",
+        "What policies exist in the knowledge base?",
+    ],
+}
+
+
+# ──────────────────────────────────────────────
+# Router
+# ──────────────────────────────────────────────
+
+class QueryRouter:
+    """
+    Nearest-centroid classifier over ROUTE_EXAMPLES embeddings.
+
+    Centroids are computed by warm_up() at startup, or lazily on the first
+    route() call (one batched embed_documents request), and then kept for
+    the life of the process.
+    """
+
+    def __init__(self, examples: Dict[str, List[str]]):
+        self.examples = examples
+        self._labels: List[str] = []
+        self._centroids: Optional[np.ndarray] = None   # (n_routes, dim), unit rows
+        self._lock = threading.Lock()
+
+    def _get_centroids(self) -> Tuple[List[str], np.ndarray]:
+        if self._centroids is not None:
+            return self._labels, self._centroids
+
+        with self._lock:
+            if self._centroids is None:
+                labels = list(self.examples)
+                texts = [text for label in labels for text in self.examples[label]]
+                vectors = self._unit_rows(vector_store.embeddings.embed_documents(texts))
+
+                centroids, start = [], 0
+                for label in labels:
+                    count = len(self.examples[label])
+                    centroids.append(vectors[start:start + count].mean(axis=0))
+                    start += count
+
+                self._labels = labels
+                self._centroids = self._unit_rows(centroids)
+                logger.info("[ROUTER] Built %s route centroids from %s examples", len(labels), len(texts))
+
+        return self._labels, self._centroids
+
+    def warm_up(self) -> None:
+        """Build the centroids now (called at startup so no request pays for it)."""
+        self._get_centroids()
+
+    @staticmethod
+    def _unit_rows(vectors) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def route(self, query_embedding: Sequence[float]) -> Tuple[str, float]:
+        """
+        Return (route, confidence) for a query embedding.
+        confidence = cosine(best centroid) − cosine(second-best centroid).
+        """
+        labels, centroids = self._get_centroids()
+        similarities = centroids @ self._unit_rows([query_embedding])[0]
+
+        order = np.argsort(similarities)[::-1]
+        best, runner_up = similarities[order[0]], similarities[order[1]]
+        return labels[order[0]], float(best - runner_up)
+
+
+# ──────────────────────────────────────────────
+# Singleton instance
+# ──────────────────────────────────────────────
+
+query_router = QueryRouter(ROUTE_EXAMPLES)
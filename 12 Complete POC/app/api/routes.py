@@ -24,21 +24,38 @@ Why separate API from workflow?
 ────────────────────────────────────────────────────────────────
 """
 
-from fastapi import APIRouter, HTTPException, status, Header
-from typing import Optional
+import asyncio
+import math
+import json
+
+from fastapi import APIRouter, HTTPException, status, Header, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 from app.models.schemas import (
-    IngestRequest, IngestResponse,
-    QueryRequest, QueryResponse,
+    AccessLevel,
+    IngestRequest, IngestResponse, IngestDiff,
+    QueryRequest, QueryResponse, BatchQueryRequest, BatchQueryResponse,
     DocumentListResponse, DocumentSummary,
     Citation,
 )
+from app.config import (
+    ANSWER_CACHE_ENABLED, LLM_MODEL, REQUEST_TIMEOUT_SECONDS, REQUEST_TIMEOUT_MAX_SECONDS,
+    RATE_LIMIT_REQUESTS, TOKEN_RATE_LIMIT_WINDOW,
+)
+from app.rag.answer_cache import answer_cache, AnswerKey
 from app.rag.ingestion import ingest_text_content
-from app.orchestration.workflow import run_workflow
-from app.rate_limiting.limiter import check_rate_limit, get_remaining_requests
+from app.rag.retriever import retrieval_cache
+from app.llm.client_registry import llm_client_stats
+from app.orchestration.workflow import arun_workflow, arun_workflow_batch, astream_workflow
+from app.rate_limiting.backends import RateLimitDecision
+from app.rate_limiting.limiter import aacquire_requests, acheck_rate_limit, aget_remaining_tokens
 from app.vector_store.chroma_store import vector_store
-from app.security.permissions import get_user
+from app.security.permissions import get_user, get_allowed_access_levels
+from app.vector_store.corpus_version import get_corpus_version
 from app.observability.logger import log_query, log_error, logger
+from app.observability.metrics import RATE_LIMIT_REJECTIONS
+from app.observability.tracing import set_span_attributes
 
 
 # ──────────────────────────────────────────────
@@ -86,15 +103,17 @@ async def ingest_document(request: IngestRequest):
             title=request.title,
             department=request.department,
             access_level=request.access_level,
+            doc_id=request.doc_id,
         )
 
-        logger.info(f"[API] Document ingested: {result['doc_id']} — '{request.title}'")
+        logger.info("[API] Document ingested: %s — '%s'", result["doc_id"], request.title)
 
         return IngestResponse(
             doc_id=result["doc_id"],
             title=request.title,
             chunks_created=result["chunks_created"],
             message=result["message"],
+            diff=IngestDiff(**result["diff"]),
         )
 
     except Exception as e:
@@ -120,41 +139,48 @@ async def ingest_document(request: IngestRequest):
         "grounded answer with citations."
     )
 )
-async def ask_question(request: QueryRequest):
+async def ask_question(
+    request: QueryRequest,
+    http_response: Response,
+    x_request_timeout: Optional[float] = Header(None, description="Time budget in seconds for this request"),
+):
     """
     [Section: Full Pipeline — RAG + Agent + Guardrails + Permissions]
 
     Main query endpoint. Routes through the full LangGraph workflow:
       validate_user → guardrails → classify → retrieve/tool → answer
 
-    Rate limiting is applied per user_id.
+    Rate limiting is applied per user_id, on requests and on LLM tokens;
+    the remaining budgets are returned in X-RateLimit-* headers. The whole
+    workflow runs within one time budget (REQUEST_TIMEOUT_SECONDS or
+    X-Request-Timeout).
     """
     user_id = request.user_id
     query   = request.query
 
-    # ── Rate Limiting ──
-    # Check before doing any expensive operations
-    is_allowed, current_count, limit = check_rate_limit(user_id)
-    if not is_allowed:
-        remaining_requests = get_remaining_requests(user_id)
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail={
-                "error":     "Rate limit exceeded",
-                "message":   f"You have exceeded {limit} requests per minute. Please wait.",
-                "remaining": remaining_requests,
-            },
-            headers={"Retry-After": "60"},
-        )
-
-    # ── Log incoming query ──
-    user = get_user(user_id)
-    user_role_str = user["role"].value if user else "unknown"
-    log_query(user_id, query, user_role_str)
+    # ── Rate Limiting + query log ──
+    # Checked before doing any expensive operations
+    rate_limit_headers = await _admit_query(user_id, query, "ask")
+
+    # ── Answer cache ──
+    # An exact repeat (same access levels, corpus version and model) skips
+    # classification, retrieval and generation entirely.
+    cache_key = await _answer_cache_key(user_id, query)
+    if cache_key is not None:
+        cached = answer_cache.get(cache_key)
+        set_span_attributes({"rag.answer_cache_hit": cached is not None})
+        if cached is not None:
+            logger.info("[ANSWER_CACHE] Hit for user=%s — workflow skipped", user_id)
+            http_response.headers.update(rate_limit_headers)
+            return QueryResponse(query=query, user_id=user_id, **cached)
 
     # ── Run the LangGraph Workflow ──
+    # Awaited end to end: the event loop keeps serving other requests
+    # while this one waits on embeddings, ChromaDB and the LLM.
     try:
-        final_state = run_workflow(query=query, user_id=user_id)
+        final_state = await arun_workflow(
+            query=query, user_id=user_id, timeout=_request_timeout(x_request_timeout),
+        )
     except Exception as e:
         log_error(user_id, str(e), "ask_question")
         raise HTTPException(
@@ -162,7 +188,20 @@ async def ask_question(request: QueryRequest):
             detail=f"Workflow error: {str(e)}"
         )
 
-    # ── Build the response ──
+    # Generation spent tokens: report the token budget as it is now
+    rate_limit_headers.update(_token_headers(await _token_budget(user_id)))
+    if final_state.get("error") == "token_budget_exceeded":
+        RATE_LIMIT_REJECTIONS.inc(endpoint="ask", limit="tokens")
+        raise _token_budget_exceeded(rate_limit_headers, final_state.get("answer", ""), final_state.get("retry_after"))
+
+    response = _to_query_response(query, user_id, final_state)
+    _store_answer(cache_key, response)
+    http_response.headers.update(rate_limit_headers)
+    return response
+
+
+def _to_query_response(query: str, user_id: str, final_state: dict) -> QueryResponse:
+    """Build the API response from a final workflow state."""
     # Citations come from the workflow state
     citations = []
     for cit in final_state.get("citations", []):
@@ -182,6 +221,245 @@ async def ask_question(request: QueryRequest):
     )
 
 
+def _store_answer(cache_key: Optional[AnswerKey], response: QueryResponse) -> None:
+    # Only successful answers are cached (never errors or guardrail blocks)
+    if cache_key is not None and response.error is None:
+        answer_cache.put(
+            cache_key,
+            response.model_dump(include={"answer", "citations", "used_tool", "is_from_docs"}),
+        )
+
+
+async def _answer_cache_key(user_id: str, query: str) -> Optional[AnswerKey]:
+    """Cache key for this user's query, or None when caching does not apply."""
+    if not ANSWER_CACHE_ENABLED or get_user(user_id) is None:
+        return None   # skip the corpus version read
+    return _make_answer_cache_key(user_id, query, await asyncio.to_thread(get_corpus_version))
+
+
+def _make_answer_cache_key(user_id: str, query: str, corpus_version: int) -> Optional[AnswerKey]:
+    """_answer_cache_key with the corpus version already read (once per /ask_batch)."""
+    user = get_user(user_id)
+    if not ANSWER_CACHE_ENABLED or user is None:
+        return None   # unknown user: let the workflow produce the error
+    return answer_cache.make_key(query, get_allowed_access_levels(user["role"]), corpus_version, LLM_MODEL)
+
+
+async def _admit_query(user_id: str, query: str, endpoint: str) -> Dict[str, str]:
+    """
+    Rate-limit checks (raise 429) and query log, shared by /ask and /ask/stream.
+    Returns the X-RateLimit-* headers as of admission.
+    """
+    decision = await acheck_rate_limit(user_id)
+    if not decision.allowed:
+        RATE_LIMIT_REJECTIONS.inc(endpoint=endpoint, limit="requests")
+        raise _rate_limit_exceeded(decision)
+
+    # The token budget is reserved at generation time (the prompt size is
+    # only known then); a user with nothing left is turned away right here.
+    tokens = await _token_budget(user_id)
+    headers = {**_request_headers(decision), **_token_headers(tokens)}
+    if tokens is not None and tokens[1] <= 0:
+        RATE_LIMIT_REJECTIONS.inc(endpoint=endpoint, limit="tokens")
+        raise _token_budget_exceeded(headers, f"You have used your budget of {tokens[0]} tokens for now.")
+    _log_query(user_id, query)
+    return headers
+
+
+async def _token_budget(user_id: str) -> Optional[Tuple[int, int]]:
+    """(limit, remaining) LLM tokens for the user, or None if unknown user / unlimited."""
+    user = get_user(user_id)
+    return await aget_remaining_tokens(user_id, user["role"]) if user else None
+
+
+def _request_headers(decision: RateLimitDecision) -> Dict[str, str]:
+    """X-RateLimit-* headers for the request budget, from the admission decision."""
+    return {
+        "X-RateLimit-Limit-Requests":     str(RATE_LIMIT_REQUESTS),
+        "X-RateLimit-Remaining-Requests": str(decision.remaining),
+    }
+
+
+def _token_headers(tokens: Optional[Tuple[int, int]]) -> Dict[str, str]:
+    """X-RateLimit-* headers for the token budget (none when tokens are not limited)."""
+    if tokens is None:
+        return {}
+    return {
+        "X-RateLimit-Limit-Tokens":     str(tokens[0]),
+        "X-RateLimit-Remaining-Tokens": str(tokens[1]),
+    }
+
+
+def _request_timeout(header_value: Optional[float]) -> Optional[float]:
+    """Time budget for a request: the X-Request-Timeout header, capped, or the default."""
+    if header_value is None or header_value <= 0:
+        return REQUEST_TIMEOUT_SECONDS
+    if REQUEST_TIMEOUT_MAX_SECONDS > 0:
+        return min(header_value, REQUEST_TIMEOUT_MAX_SECONDS)
+    return header_value
+
+
+def _rate_limit_exceeded(decision: RateLimitDecision) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={
+            "error":     "Rate limit exceeded",
+            "message":   f"You have exceeded {RATE_LIMIT_REQUESTS} requests per minute. Please wait.",
+            "remaining": decision.remaining,
+        },
+        headers={
+            "Retry-After": str(max(1, math.ceil(decision.retry_after))),
+            **_request_headers(decision),
+        },
+    )
+
+
+def _token_budget_exceeded(
+    headers: Dict[str, str], message: str, retry_after: Optional[float] = None,
+) -> HTTPException:
+    if retry_after is None:
+        retry_after = TOKEN_RATE_LIMIT_WINDOW   # budget empty: wait for it to refill
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail={
+            "error":     "Token budget exceeded",
+            "message":   message,
+            "remaining": int(headers.get("X-RateLimit-Remaining-Tokens", 0)),
+        },
+        headers={"Retry-After": str(max(1, math.ceil(retry_after))), **headers},
+    )
+
+
+def _log_query(user_id: str, query: str) -> None:
+    user = get_user(user_id)
+    user_role_str = user["role"].value if user else "unknown"
+    log_query(user_id, query, user_role_str)
+
+
+# ──────────────────────────────────────────────
+# POST /ask_batch
+# ──────────────────────────────────────────────
+
+@router.post(
+    "/ask_batch",
+    response_model=BatchQueryResponse,
+    summary="Ask many questions in one request",
+    description=(
+        "Answers up to BATCH_MAX_QUESTIONS questions with the same pipeline as /ask. "
+        "All queries are embedded in one request, retrieval runs concurrently and "
+        "generation is limited to BATCH_GENERATION_CONCURRENCY at a time. Results "
+        "come back in input order; a failed question only sets its own `error`."
+    )
+)
+async def ask_batch(
+    request: BatchQueryRequest,
+    x_request_timeout: Optional[float] = Header(None, description="Time budget in seconds for the whole batch"),
+):
+    """
+    [Section: Full Pipeline — Batch]
+
+    For evaluation jobs and bots that would otherwise send hundreds of /ask
+    calls. Every question counts as one request against its user's rate
+    limit (one backend call per user); the questions that do not fit get
+    error="rate_limited" instead of failing the whole request. Exact
+    repeats are served from the answer cache.
+    """
+    questions = request.questions
+    results: List[Optional[QueryResponse]] = [None] * len(questions)
+    cache_keys: List[Optional[AnswerKey]] = [None] * len(questions)
+    pending: List[int] = []
+    cache_hits = 0
+
+    # Questions per user; each user's first `admitted` questions are answered
+    asked: Dict[str, int] = {}
+    for item in questions:
+        asked[item.user_id] = asked.get(item.user_id, 0) + 1
+    admitted = {user_id: await aacquire_requests(user_id, count) for user_id, count in asked.items()}
+    corpus_version = await asyncio.to_thread(get_corpus_version) if ANSWER_CACHE_ENABLED else 0
+
+    for i, item in enumerate(questions):
+        if admitted[item.user_id] <= 0:
+            RATE_LIMIT_REJECTIONS.inc(endpoint="ask_batch", limit="requests")
+            results[i] = QueryResponse(
+                query=item.query, user_id=item.user_id, citations=[],
+                answer="Rate limit exceeded. Please wait before sending more questions.",
+                error="rate_limited",
+            )
+            continue
+
+        admitted[item.user_id] -= 1
+
+        _log_query(item.user_id, item.query)
+        cache_keys[i] = _make_answer_cache_key(item.user_id, item.query, corpus_version)
+        cached = answer_cache.get(cache_keys[i]) if cache_keys[i] is not None else None
+        if cached is not None:
+            results[i] = QueryResponse(query=item.query, user_id=item.user_id, **cached)
+            cache_hits += 1
+        else:
+            pending.append(i)
+
+    final_states = await arun_workflow_batch(
+        [(questions[i].query, questions[i].user_id) for i in pending],
+        timeout=_request_timeout(x_request_timeout),
+    )
+    for i, final_state in zip(pending, final_states):
+        results[i] = _to_query_response(questions[i].query, questions[i].user_id, final_state)
+        _store_answer(cache_keys[i], results[i])
+
+    failed = sum(1 for result in results if result.error is not None)
+    set_span_attributes({"rag.batch_size": len(questions), "rag.answer_cache_hits": cache_hits})
+    logger.info(
+        "[API] Batch of %s answered | cached=%s | workflow=%s | failed=%s",
+        len(questions), cache_hits, len(pending), failed,
+    )
+    return BatchQueryResponse(results=results, failed=failed)
+
+
+# ──────────────────────────────────────────────
+# POST /ask/stream
+# ──────────────────────────────────────────────
+
+@router.post(
+    "/ask/stream",
+    summary="Ask a question and stream the answer (server-sent events)",
+    description=(
+        "Same pipeline as /ask, streamed as text/event-stream: a `citations` "
+        "event as soon as retrieval finishes, `token` events with answer "
+        "deltas, then a `final` event with the full answer, tool and token usage."
+    )
+)
+async def ask_question_stream(
+    request: QueryRequest,
+    x_request_timeout: Optional[float] = Header(None, description="Time budget in seconds for this request"),
+):
+    """
+    [Section: Full Pipeline — Streaming]
+
+    Runs the same LangGraph workflow as /ask (validation, guardrails,
+    permissions, agent) with the same rate limit. The client sees the
+    citations after retrieval latency instead of after the whole answer
+    has been generated.
+
+    Guardrail blocks, tool answers and errors produce no token events, only
+    the final event.
+    """
+    rate_limit_headers = await _admit_query(request.user_id, request.query, "ask_stream")
+    timeout = _request_timeout(x_request_timeout)
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for event, payload in astream_workflow(
+            query=request.query, user_id=request.user_id, timeout=timeout,
+        ):
+            yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+    # Budgets as of the start of the stream; the final event carries the token usage
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", **rate_limit_headers},
+    )
+
+
 # ──────────────────────────────────────────────
 # GET /documents
 # ──────────────────────────────────────────────
@@ -189,18 +467,33 @@ async def ask_question(request: QueryRequest):
 @router.get(
     "/documents",
     response_model=DocumentListResponse,
-    summary="List all ingested documents",
-    description="Returns a list of all documents stored in the vector database with their metadata."
+    summary="List ingested documents",
+    description=(
+        "Returns one page of the documents stored in the vector database with "
+        "their metadata, optionally filtered by department and access level."
+    )
 )
-async def list_documents():
+async def list_documents(
+    limit:        int                   = Query(50, ge=1, le=500, description="Page size"),
+    offset:       int                   = Query(0, ge=0, description="Documents to skip"),
+    department:   Optional[str]         = Query(None, description="Filter by department (case-insensitive)"),
+    access_level: Optional[AccessLevel] = Query(None, description="Filter by access level"),
+):
     """
     [Section: Vector Database]
 
-    Returns a summary of all documents currently in ChromaDB.
-    Groups chunks by document ID to show one entry per document.
+    Returns a page of document summaries from the SQLite document catalog
+    (one row per document, maintained by ingestion and deletion), so the
+    cost depends on the page size, not on the number of stored chunks.
     """
     try:
-        raw_docs = vector_store.list_documents()
+        raw_docs, total = await asyncio.to_thread(
+            vector_store.list_documents,
+            limit=limit,
+            offset=offset,
+            department=department,
+            access_level=access_level.value if access_level else None,
+        )
 
         documents = [
             DocumentSummary(
@@ -215,7 +508,9 @@ async def list_documents():
 
         return DocumentListResponse(
             documents=documents,
-            total=len(documents),
+            total=total,
+            limit=limit,
+            offset=offset,
         )
 
     except Exception as e:
@@ -237,9 +532,13 @@ async def list_documents():
 async def health_check():
     """Simple health check — confirms the service is running."""
     return {
-        "status":  "healthy",
-        "service": "AI Knowledge Assistant",
-        "version": "1.0.0",
+        "status":          "healthy",
+        "service":         "AI Knowledge Assistant",
+        "version":         "1.0.0",
+        "embedding_cache": vector_store.embedding_cache_stats(),
+        "semantic_cache":  retrieval_cache.stats(),
+        "answer_cache":    answer_cache.stats(),
+        "llm_clients":     llm_client_stats(),
     }
 
 
@@ -25,12 +25,32 @@ LLM_PROVIDER: str    = os.getenv("LLM_PROVIDER", "openai")
 LLM_MODEL: str       = os.getenv("LLM_MODEL", "gpt-4o-mini")   # default: OpenAI
 EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "text-embedding-ada-002")
 
+# Chat models are created once per (provider, model, max_tokens, temperature)
+# and share one pooled HTTP client per process (app/llm/client_registry.py).
+LLM_POOL_MAX_CONNECTIONS: int    = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100"))
+LLM_POOL_MAX_KEEPALIVE: int      = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20"))
+LLM_POOL_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_POOL_KEEPALIVE_EXPIRY", "30"))   # seconds
+LLM_REQUEST_TIMEOUT: float       = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))         # seconds
+
 # ──────────────────────────────────────────────
 # Storage Settings
 # ──────────────────────────────────────────────
 CHROMA_PERSIST_DIR: str = os.getenv("CHROMA_PERSIST_DIR", "./data/chroma_db")
 SQLITE_DB_PATH: str     = os.getenv("SQLITE_DB_PATH", "./data/metadata.db")
 
+# VECTOR_BACKEND selects how similarity search is answered:
+# "chroma" → ChromaDB HNSW index + metadata WHERE filter (default)
+# "numpy"  → exact in-process flat index (float32 matrix + access-level masks),
+#            loaded from ChromaDB on first search. Best up to a few 100K chunks.
+VECTOR_BACKEND: str = os.getenv("VECTOR_BACKEND", "chroma")
+
+# Persistent embedding cache keyed by (model, sha256(text)).
+# Shared by ingestion and retrieval; least-recently-used entries are
+# evicted once EMBEDDING_CACHE_MAX_ENTRIES is exceeded.
+EMBEDDING_CACHE_ENABLED: bool    = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH: str        = os.getenv("EMBEDDING_CACHE_PATH", "./data/embedding_cache.db")
+EMBEDDING_CACHE_MAX_ENTRIES: int = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
 # ──────────────────────────────────────────────
 # RAG Settings
 # ──────────────────────────────────────────────
@@ -42,12 +62,105 @@ TOP_K_RESULTS: int = int(os.getenv("TOP_K_RESULTS", "4"))
 # Set to 0 to disable sentence window retrieval and use plain top-K only.
 WINDOW_SIZE: int   = int(os.getenv("WINDOW_SIZE", "1"))
 
+# Prompt context is packed into this many tokens (tiktoken), most relevant
+# source first; the overlap between adjacent chunks is stripped. 0 = no limit.
+CONTEXT_TOKEN_BUDGET: int = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1500"))
+
+# ingest_file streams pages and embeds/stores chunks in batches of this size,
+# so peak memory does not grow with the document.
+INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "64"))
+
+# Hybrid retrieval: fuse BM25 keyword ranking with vector ranking using
+# reciprocal rank fusion. Each leg contributes HYBRID_CANDIDATES candidates;
+# RRF_K damps the weight of top ranks (60 is the standard value).
+HYBRID_SEARCH_ENABLED: bool = os.getenv("HYBRID_SEARCH_ENABLED", "true").lower() == "true"
+HYBRID_CANDIDATES: int      = int(os.getenv("HYBRID_CANDIDATES", "20"))
+RRF_K: int                  = int(os.getenv("RRF_K", "60"))
+
+# Semantic retrieval cache: a query whose embedding has cosine similarity
+# >= SEMANTIC_CACHE_THRESHOLD with a past query (same allowed access levels,
+# same corpus version) reuses that query's retrieved chunks.
+SEMANTIC_CACHE_ENABLED: bool    = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.97"))
+SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))  # per role partition
+
+# Answer cache: /ask returns a stored response for an exact repeat of a
+# question (normalized) from a user with the same access levels, as long as
+# the corpus version and LLM_MODEL are unchanged.
+ANSWER_CACHE_ENABLED: bool    = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_TTL: float       = float(os.getenv("ANSWER_CACHE_TTL", "600"))   # seconds
+ANSWER_CACHE_MAX_ENTRIES: int = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+
+# ──────────────────────────────────────────────
+# Agent Routing Settings
+# ──────────────────────────────────────────────
+# The router classifies a query by its nearest route centroid (the same
+# embedding is reused for retrieval). When the margin between the best and
+# second-best route is below ROUTER_CONFIDENCE_THRESHOLD, the LLM decides.
+ROUTER_ENABLED: bool               = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+ROUTER_CONFIDENCE_THRESHOLD: float = float(os.getenv("ROUTER_CONFIDENCE_THRESHOLD", "0.02"))
+
+# Speculative retrieval: retrieve in parallel with classification instead of
+# after it. Saves the retrieval time on the RAG path; the tool path discards it.
+SPECULATIVE_RETRIEVAL_ENABLED: bool = os.getenv("SPECULATIVE_RETRIEVAL_ENABLED", "false").lower() == "true"
+
+# /ask_batch: questions per request, and how many answers are generated at
+# once (guardrails, the query embedding call and retrieval are not limited).
+BATCH_MAX_QUESTIONS: int          = int(os.getenv("BATCH_MAX_QUESTIONS", "100"))
+BATCH_GENERATION_CONCURRENCY: int = int(os.getenv("BATCH_GENERATION_CONCURRENCY", "8"))
+
+# Every question gets one time budget (absolute deadline) covering embedding,
+# search, classification and generation. Clients may ask for a different one
+# with the X-Request-Timeout header, up to REQUEST_TIMEOUT_MAX_SECONDS.
+# 0 = no deadline.
+REQUEST_TIMEOUT_SECONDS: float     = float(os.getenv("REQUEST_TIMEOUT_SECONDS", "30"))
+REQUEST_TIMEOUT_MAX_SECONDS: float = float(os.getenv("REQUEST_TIMEOUT_MAX_SECONDS", "120"))
+
+# Extra guardrail rule packs (comma-separated JSON files), compiled together
+# with the built-in rules. Files are checked for changes every
+# GUARDRAIL_RELOAD_INTERVAL seconds (0 = load once at startup).
+GUARDRAIL_RULE_PACKS: str         = os.getenv("GUARDRAIL_RULE_PACKS", "")
+GUARDRAIL_RELOAD_INTERVAL: float  = float(os.getenv("GUARDRAIL_RELOAD_INTERVAL", "5"))   # seconds
+
 # ──────────────────────────────────────────────
 # Rate Limiting Settings
 # ──────────────────────────────────────────────
 RATE_LIMIT_REQUESTS: int = int(os.getenv("RATE_LIMIT_REQUESTS", "10"))
 RATE_LIMIT_WINDOW: int   = int(os.getenv("RATE_LIMIT_WINDOW", "60"))  # seconds
 
+# "memory" = per process; "redis" = one limit shared by all workers/servers
+RATE_LIMIT_BACKEND: str          = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_REDIS_URL: str        = os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0")
+RATE_LIMIT_EVICT_INTERVAL: float = float(os.getenv("RATE_LIMIT_EVICT_INTERVAL", "60"))  # seconds, memory backend
+
+# Second budget: LLM tokens (prompt + completion) per user per window,
+# by role. 0 = no token limit for that role.
+TOKEN_RATE_LIMIT_WINDOW: int = int(os.getenv("TOKEN_RATE_LIMIT_WINDOW", "60"))  # seconds
+TOKEN_RATE_LIMITS: dict      = {
+    "employee": int(os.getenv("TOKEN_RATE_LIMIT_EMPLOYEE", "20000")),
+    "manager":  int(os.getenv("TOKEN_RATE_LIMIT_MANAGER",  "40000")),
+    "admin":    int(os.getenv("TOKEN_RATE_LIMIT_ADMIN",    "100000")),
+}
+
+# ──────────────────────────────────────────────
+# Logging Settings
+# ──────────────────────────────────────────────
+LOG_LEVEL: str        = os.getenv("LOG_LEVEL", "DEBUG")
+LOG_FORMAT: str       = os.getenv("LOG_FORMAT", "text").lower()   # "text" | "json"
+# Fraction of INFO/DEBUG lines kept per [CATEGORY], e.g. "WORKFLOW=0.01,RETRIEVAL=0.1"
+# (unlisted categories, warnings and errors: all lines)
+LOG_SAMPLE_RATES: str = os.getenv("LOG_SAMPLE_RATES", "")
+LOG_QUEUE_SIZE: int   = int(os.getenv("LOG_QUEUE_SIZE", "10000"))   # lines; more are dropped, not waited for
+
+# ──────────────────────────────────────────────
+# Tracing Settings
+# ──────────────────────────────────────────────
+TRACING_EXPORTER: str      = os.getenv("TRACING_EXPORTER", "none").lower()   # "none" | "file" | "otlp"
+TRACING_FILE: str          = os.getenv("TRACING_FILE", "./logs/traces.jsonl")
+TRACING_OTLP_ENDPOINT: str = os.getenv("TRACING_OTLP_ENDPOINT", "http://localhost:4318")
+TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))   # new traces only; incoming traceparent decides otherwise
+TRACING_SERVICE_NAME: str  = os.getenv("TRACING_SERVICE_NAME", "ai-knowledge-assistant")
+
 # ──────────────────────────────────────────────
 # App Settings
 # ──────────────────────────────────────────────
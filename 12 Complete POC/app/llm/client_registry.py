@@ -0,0 +1,231 @@
+"""
+app/llm/client_registry.py — Pooled, Reusable LLM Clients
+
+[Concept: Connection Reuse for LLM Calls]
+
+────────────────────────────────────────────────────────────────
+WHY A CLIENT REGISTRY?
+────────────────────────────────────────────────────────────────
+Building a ChatOpenAI / ChatAnthropic per call also builds a new
+HTTP client. Every request then pays for a fresh TCP connect and
+TLS handshake (often 50–150 ms to the provider), and the pool
+is thrown away right after.
+
+The registry keeps ONE long-lived chat model per
+
+  (provider, model, max_tokens, temperature)
+
+and every model of a provider sends its requests through the same
+two httpx clients (one sync, one async). Their connection pool is
+sized by LLM_POOL_* settings, so consecutive calls, from any
+thread or coroutine, reuse warm keep-alive connections:
+
+  call 1 ──► new TCP + TLS ──► provider      (new connection)
+  call 2 ──► pooled socket ──► provider      (reused)
+
+httpx clients are safe to share between threads, and the async
+client between coroutines of one event loop. The registry itself
+is guarded by a lock.
+
+Anthropic is not pooled: ChatAnthropic takes no http_client, and
+swapping its private SDK clients would drop anthropic_api_url,
+default_headers and default_request_timeout. Its models are still
+built once and reused, so each keeps its own SDK connection pool,
+but those requests do not show up in llm_client_stats().
+
+A transport wrapper counts requests and newly opened connections;
+llm_client_stats() reports the reuse rate (shown on /health).
+Every model also carries a metrics callback that times each call
+(rag_llm_duration_seconds on /metrics).
+────────────────────────────────────────────────────────────────
+"""
+
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+from app.config import (
+    ANTHROPIC_API_KEY, OPENAI_API_KEY, LLM_MODEL, LLM_PROVIDER,
+    LLM_POOL_MAX_CONNECTIONS, LLM_POOL_MAX_KEEPALIVE, LLM_POOL_KEEPALIVE_EXPIRY,
+    LLM_REQUEST_TIMEOUT,
+)
+from app.observability.logger import logger
+from app.observability.metrics import LLMMetricsCallback, register_stats
+from app.observability.tracing import LLMTracingCallback
+
+
+RegistryKey = Tuple[str, str, int, float]   # (provider, model, max_tokens, temperature)
+
+
+# ──────────────────────────────────────────────
+# Connection accounting
+# ──────────────────────────────────────────────
+
+class _PoolStats:
+    """Requests sent and TCP connections opened, across all pooled clients."""
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def record_connection(self) -> None:
+        with self._lock:
+            self.new_connections += 1
+
+
+_stats = _PoolStats()
+
+
+def _count_connects(event_name: str) -> None:
+    # httpcore emits connection.connect_tcp.{started,complete,failed}
+    if event_name == "connection.connect_tcp.complete":
+        _stats.record_connection()
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        _stats.record_request()
+        request.extensions["trace"] = lambda event_name, info: _count_connects(event_name)
+        return super().handle_request(request)
+
+
+class _AsyncCountingTransport(httpx.AsyncHTTPTransport):
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        _stats.record_request()
+
+        async def trace(event_name, info):
+            _count_connects(event_name)
+
+        request.extensions["trace"] = trace
+        return await super().handle_async_request(request)
+
+
+# ──────────────────────────────────────────────
+# Registry
+# ──────────────────────────────────────────────
+
+class LLMClientRegistry:
+    """Long-lived chat models keyed by RegistryKey, sharing one connection pool."""
+
+    def __init__(self):
+        self._models: Dict[RegistryKey, object] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    def _pool_kwargs(self) -> dict:
+        return {
+            "limits": httpx.Limits(
+                max_connections=LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_POOL_KEEPALIVE_EXPIRY,
+            ),
+        }
+
+    def _get_http_clients(self) -> Tuple[httpx.Client, httpx.AsyncClient]:
+        # Called with self._lock held
+        if self._http_client is None:
+            timeout = httpx.Timeout(LLM_REQUEST_TIMEOUT, connect=10.0)
+            self._http_client = httpx.Client(
+                transport=_CountingTransport(**self._pool_kwargs()), timeout=timeout,
+            )
+            self._http_async_client = httpx.AsyncClient(
+                transport=_AsyncCountingTransport(**self._pool_kwargs()), timeout=timeout,
+            )
+        return self._http_client, self._http_async_client
+
+    def get(self, max_tokens: int, temperature: float = 0.0):
+        """Return the shared chat model for the configured provider and model."""
+        key: RegistryKey = (LLM_PROVIDER, LLM_MODEL, max_tokens, temperature)
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is None:
+                model = self._build(key)
+                self._models[key] = model
+                logger.info(
+                    "[LLM_CLIENTS] Created %s client model=%s max_tokens=%s temperature=%s",
+                    key[0], key[1], max_tokens, temperature,
+                )
+        return model
+
+    def _build(self, key: RegistryKey):
+        provider, model_name, max_tokens, temperature = key
+        callbacks = [LLMMetricsCallback(provider, model_name), LLMTracingCallback(provider, model_name)]
+
+        if provider == "anthropic":
+            # No http_client hook on ChatAnthropic: it keeps its own SDK pool
+            from langchain_anthropic import ChatAnthropic
+            return ChatAnthropic(
+                model=model_name,
+                anthropic_api_key=ANTHROPIC_API_KEY,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                callbacks=callbacks,
+            )
+
+        http_client, http_async_client = self._get_http_clients()
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(
+            model=model_name,
+            openai_api_key=OPENAI_API_KEY,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream_usage=True,          # token usage on streamed responses too
+            callbacks=callbacks,
+            http_client=http_client,
+            http_async_client=http_async_client,
+        )
+
+    def stats(self) -> dict:
+        requests, new_connections = _stats.requests, _stats.new_connections
+        reused = max(0, requests - new_connections)
+        return {
+            "clients":            len(self._models),
+            "requests":           requests,
+            "new_connections":    new_connections,
+            "reused_connections": reused,
+            "reuse_rate":         round(reused / requests, 4) if requests else 0.0,
+        }
+
+    async def aclose(self) -> None:
+        """Close the pooled connections (application shutdown)."""
+        with self._lock:
+            http_client, http_async_client = self._http_client, self._http_async_client
+            self._models.clear()
+            self._http_client = self._http_async_client = None
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+
+# ──────────────────────────────────────────────
+# Singleton instance + helpers
+# ──────────────────────────────────────────────
+
+llm_clients = LLMClientRegistry()
+
+
+def get_chat_model(max_tokens: int, temperature: float = 0.0):
+    """Shared chat model for LLM_PROVIDER / LLM_MODEL with these generation settings."""
+    return llm_clients.get(max_tokens, temperature)
+
+
+def llm_client_stats() -> dict:
+    return llm_clients.stats()
+
+
+register_stats(
+    "rag_llm_http", llm_client_stats,
+    counters=("requests", "new_connections", "reused_connections"),
+)
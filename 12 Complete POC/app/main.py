@@ -59,12 +59,21 @@ ARCHITECTURE OVERVIEW
 ────────────────────────────────────────────────────────────────
 """
 
+import asyncio
+import uuid
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 
-from app.config import APP_TITLE, APP_VERSION
+from app.config import APP_TITLE, APP_VERSION, ROUTER_ENABLED
 from app.api.routes import router
-from app.observability.logger import logger
+from app.agents.query_router import query_router
+from app.llm.client_registry import llm_clients
+from app.observability.logger import logger, log_stats, request_id_var
+from app.observability.metrics import render_metrics, register_stats
+from app.observability.tracing import KIND_SERVER, STATUS_ERROR, is_enabled as tracing_enabled, span, tracing_stats
+from app.vector_store.chroma_store import vector_store
 
 
 # ──────────────────────────────────────────────
@@ -84,6 +93,80 @@ app = FastAPI(
 )
 
 
+# ──────────────────────────────────────────────
+# Tracing Middleware
+# One SERVER span per HTTP request: the root of the node, vector store
+# and LLM spans. Continues the client's trace when it sends traceparent;
+# the response carries traceparent and X-Trace-Id either way.
+# Added before RequestIdMiddleware so it runs inside it (request id known).
+# ──────────────────────────────────────────────
+
+class TracingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing_enabled():
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope["headers"])
+        with span(
+            f"{scope['method']} {scope['path']}",
+            kind=KIND_SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"], "request.id": request_id_var.get()},
+            traceparent=headers.get(b"traceparent", b"").decode("latin-1"),
+        ) as server_span:
+            async def send_with_trace(message):
+                if message["type"] == "http.response.start":
+                    server_span.set_attribute("http.status_code", message["status"])
+                    if message["status"] >= 500:
+                        server_span.status = STATUS_ERROR
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"traceparent", server_span.traceparent().encode("latin-1")),
+                        (b"x-trace-id", server_span.trace_id.encode("latin-1")),
+                    ]
+                await send(message)
+
+            await self.app(scope, receive, send_with_trace)
+
+
+app.add_middleware(TracingMiddleware)
+register_stats("rag_trace_spans", tracing_stats, counters=("exported", "dropped"))
+
+
+# ──────────────────────────────────────────────
+# Request ID Middleware
+# Every log line of a request carries its id (X-Request-ID from the
+# client or a new one), and the response echoes it back.
+# Plain ASGI, so streaming responses are not buffered.
+# ──────────────────────────────────────────────
+
+class RequestIdMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = dict(scope["headers"]).get(b"x-request-id", b"").decode("latin-1")[:64] or uuid.uuid4().hex[:16]
+        token = request_id_var.set(request_id)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id_var.reset(token)
+
+
+app.add_middleware(RequestIdMiddleware)
+register_stats("rag_log_lines", log_stats, counters=("queued", "dropped", "sampled_out"))
+
+
 # ──────────────────────────────────────────────
 # CORS Middleware
 # Allows browser-based clients to call the API
@@ -112,15 +195,29 @@ app.include_router(router, prefix="/api/v1")
 @app.on_event("startup")
 async def startup_event():
     logger.info("=" * 60)
-    logger.info(f"  {APP_TITLE} v{APP_VERSION} starting up...")
+    logger.info("  %s v%s starting up...", APP_TITLE, APP_VERSION)
     logger.info("  Architecture: FastAPI → LangGraph → RAG → ChromaDB → Claude")
     logger.info("  Endpoints available at: http://localhost:8000/docs")
     logger.info("=" * 60)
 
+    if ROUTER_ENABLED:
+        # Embed the router's example queries once, off the event loop
+        try:
+            await asyncio.to_thread(query_router.warm_up)
+        except Exception as e:
+            logger.warning(f"[ROUTER] Warm-up failed, centroids will be built on first query: {e}")
+
+    # One-time scan of ChromaDB for documents ingested before the catalog existed
+    try:
+        await asyncio.to_thread(vector_store.backfill_catalog)
+    except Exception as e:
+        logger.warning(f"[CATALOG] Backfill failed, retried on the first /documents call: {e}")
+
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logger.info(f"{APP_TITLE} shutting down.")
+    await llm_clients.aclose()
+    logger.info("%s shutting down.", APP_TITLE)
 
 
 # ──────────────────────────────────────────────
@@ -136,6 +233,16 @@ async def root():
     }
 
 
+# ──────────────────────────────────────────────
+# Prometheus Metrics
+# ──────────────────────────────────────────────
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Latency histograms and counters in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 # ──────────────────────────────────────────────
 # Run directly (python app/main.py)
 # ──────────────────────────────────────────────
@@ -15,6 +15,8 @@ from pydantic import BaseModel, Field
 from typing import Optional, List
 from enum import Enum
 
+from app.config import BATCH_MAX_QUESTIONS
+
 
 # ──────────────────────────────────────────────
 # Permission Model
@@ -53,6 +55,10 @@ class IngestRequest(BaseModel):
     department:   str         = Field(..., description="Owning department (HR, Finance, IT...)")
     access_level: AccessLevel = Field(default=AccessLevel.PUBLIC, description="Who can read this doc")
     content:      str         = Field(..., description="Raw text content of the document")
+    doc_id:       Optional[str] = Field(
+        default=None,
+        description="Existing doc_id to update in place (only changed chunks are re-embedded)",
+    )
 
     class Config:
         json_schema_extra = {
@@ -65,12 +71,22 @@ class IngestRequest(BaseModel):
         }
 
 
+class IngestDiff(BaseModel):
+    """What an (re-)ingestion changed, chunk by chunk."""
+    added:      int   # chunks with new or changed text (embedded)
+    reused:     int   # chunks whose text was already stored (embedding reused)
+    renumbered: int   # reused chunks that moved to a different chunk_index
+    removed:    int   # stored chunks deleted because they are no longer in the document
+    embedded:   int   # distinct texts sent to the embedding provider
+
+
 class IngestResponse(BaseModel):
     """Response body for POST /ingest_document"""
     doc_id:      str
     title:       str
     chunks_created: int
     message:     str
+    diff:        Optional[IngestDiff] = None
 
 
 # ──────────────────────────────────────────────
@@ -110,6 +126,30 @@ class QueryResponse(BaseModel):
     error:         Optional[str]  = None
 
 
+class BatchQueryRequest(BaseModel):
+    """Request body for POST /ask_batch"""
+    questions: List[QueryRequest] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_QUESTIONS,
+        description="Questions to answer; results come back in the same order",
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    {"query": "How many vacation days do employees get?", "user_id": "emp_001"},
+                    {"query": "What is the password policy?", "user_id": "emp_001"},
+                ]
+            }
+        }
+
+
+class BatchQueryResponse(BaseModel):
+    """Response body for POST /ask_batch"""
+    results: List[QueryResponse]   # one per question, in input order
+    failed:  int                   # results with an error (blocked, rate-limited, failed)
+
+
 # ──────────────────────────────────────────────
 # Document Listing Model
 # ──────────────────────────────────────────────
@@ -125,7 +165,9 @@ class DocumentSummary(BaseModel):
 
 class DocumentListResponse(BaseModel):
     documents: List[DocumentSummary]
-    total:     int
+    total:     int               # documents matching the filters, across all pages
+    limit:     int = 50
+    offset:    int = 0
 
 
 # ──────────────────────────────────────────────
@@ -25,14 +25,147 @@ What we log:
   7. Guardrail triggers
 
 This creates a full "audit trail" for every AI interaction.
+
+────────────────────────────────────────────────────────────────
+KEEPING LOGGING OFF THE HOT PATH
+────────────────────────────────────────────────────────────────
+One /ask writes a dozen or more lines. Writing them to stderr from
+the request itself makes every request wait for the terminal, so:
+
+  request ── QueueHandler ──► queue ──► QueueListener thread
+             (filters only)              (formats + writes)
+
+  - The request thread only puts the LogRecord on a queue. Message
+    formatting (%-args, JSON) happens on the listener thread. If
+    the queue is full the line is dropped and counted, instead of
+    blocking the request.
+  - The helpers below check the level and sampling rate BEFORE
+    building anything: with DEBUG off, log_workflow_step costs one
+    isEnabledFor() call.
+  - LOG_SAMPLE_RATES keeps a fraction of each category's INFO/DEBUG
+    lines, e.g. "WORKFLOW=0.01,RETRIEVAL=0.1". The category is the
+    [TAG] a message starts with. Warnings and errors are always kept.
+    Sampling is decided per request id, so a sampled request keeps
+    ALL of its lines.
+  - Every line carries the request id (X-Request-ID, set by the
+    middleware in main.py) to correlate the lines of one request.
+
+LOG_FORMAT=json writes one JSON object per line for ELK/Datadog/Loki;
+"text" is the human-readable default.
 ────────────────────────────────────────────────────────────────
 """
 
+import atexit
 import logging
+import logging.handlers
 import json
-import time
-from typing import Any, Dict, List, Optional
-from datetime import datetime
+import queue
+import random
+import zlib
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Union
+from datetime import datetime, timezone
+
+from app.config import LOG_LEVEL, LOG_FORMAT, LOG_SAMPLE_RATES, LOG_QUEUE_SIZE
+
+
+# ──────────────────────────────────────────────
+# Request correlation
+# ──────────────────────────────────────────────
+
+# Set per HTTP request by the middleware in main.py; copied into asyncio
+# tasks and asyncio.to_thread calls automatically.
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+
+def _parse_sample_rates(spec: str) -> Dict[str, float]:
+    rates = {}
+    for part in spec.split(","):
+        if "=" in part:
+            category, rate = part.split("=", 1)
+            rates[category.strip().upper()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+_sample_rates = _parse_sample_rates(LOG_SAMPLE_RATES)
+_stats = {"queued": 0, "dropped": 0, "sampled_out": 0}
+
+
+def _category(msg: Any) -> str:
+    """"WORKFLOW" for a message starting with "[WORKFLOW]"."""
+    if isinstance(msg, str) and msg.startswith("["):
+        end = msg.find("]")
+        if end > 0:
+            return msg[1:end]
+    return ""
+
+
+def _sampled(category: str) -> bool:
+    rate = _sample_rates.get(category)
+    if rate is None or rate >= 1.0:
+        return True
+    request_id = request_id_var.get()
+    if request_id:
+        # Same decision for every line of a request
+        return zlib.crc32(f"{category}:{request_id}".encode()) / 0xFFFFFFFF < rate
+    return random.random() < rate
+
+
+def _enabled(level: int, category: str) -> bool:
+    """Level and sampling check for the helpers, done before any formatting."""
+    if not logger.isEnabledFor(level):
+        return False
+    if level < logging.WARNING and not _sampled(category):
+        _stats["sampled_out"] += 1
+        return False
+    return True
+
+
+class _ContextFilter(logging.Filter):
+    """Runs in the calling thread: adds request id + category, applies sampling."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.request_tag = f"req={record.request_id} | " if record.request_id else ""
+        record.category = _category(record.msg)
+        if getattr(record, "presampled", False) or record.levelno >= logging.WARNING:
+            return True
+        if not _sampled(record.category):
+            _stats["sampled_out"] += 1
+            return False
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread (the stdlib
+    one merges msg % args in the caller) and drops lines when the queue is full.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record   # same process: the record can cross the queue as is
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            _stats["queued"] += 1
+        except queue.Full:
+            _stats["dropped"] += 1
+
+
+class _JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts":         datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level":      record.levelname,
+            "logger":     record.name,
+            "category":   getattr(record, "category", "") or None,
+            "request_id": getattr(record, "request_id", None),
+            "message":    record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
 
 
 # ──────────────────────────────────────────────
@@ -40,38 +173,60 @@ from datetime import datetime
 # ──────────────────────────────────────────────
 
 def setup_logger(name: str = "ai_assistant") -> logging.Logger:
-    """Configure a structured logger that outputs JSON-formatted lines."""
+    """
+    Configure the logger: a non-blocking queue handler in front of a
+    stderr handler that runs on a background listener thread.
+    """
     logger = logging.getLogger(name)
-    logger.setLevel(logging.DEBUG)
+    logger.setLevel(getattr(logging, LOG_LEVEL.upper(), logging.DEBUG))
+    logger.propagate = False
 
     if not logger.handlers:
         handler = logging.StreamHandler()
-        handler.setLevel(logging.DEBUG)
-
-        # Simple readable format — in production use JSON formatter + send to ELK/Datadog
-        formatter = logging.Formatter(
-            "%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
-            datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
+        if LOG_FORMAT == "json":
+            handler.setFormatter(_JsonFormatter())
+        else:
+            # Readable format for local development
+            handler.setFormatter(logging.Formatter(
+                "%(asctime)s | %(levelname)-8s | %(name)s | %(request_tag)s%(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S"
+            ))
+
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        queue_handler = _DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(_ContextFilter())
+        logger.addHandler(queue_handler)
+
+        listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)   # flush what is still queued on exit
 
     return logger
 
 
+def log_stats() -> Dict[str, int]:
+    """Lines queued, dropped (queue full) and skipped by sampling since startup."""
+    return dict(_stats)
+
+
 # Single shared logger instance
 logger = setup_logger("ai_assistant")
 
 
 # ──────────────────────────────────────────────
 # Observability Helper Functions
+#
+# Messages use %-style arguments: they are only merged into a string
+# on the listener thread, and only if the line is actually written.
 # ──────────────────────────────────────────────
 
+_PRESAMPLED = {"presampled": True}
+
+
 def log_query(user_id: str, query: str, user_role: str) -> None:
     """Log an incoming user query."""
-    logger.info(
-        f"[QUERY] user={user_id} role={user_role} | query=\"{query[:100]}\""
-    )
+    if _enabled(logging.INFO, "QUERY"):
+        logger.info('[QUERY] user=%s role=%s | query="%.100s"', user_id, user_role, query, extra=_PRESAMPLED)
 
 
 def log_retrieval(user_id: str, query: str, num_docs: int, scores: List[float]) -> None:
@@ -82,14 +237,17 @@ def log_retrieval(user_id: str, query: str, num_docs: int, scores: List[float])
     Low scores (< 0.3) might mean the query has no matching documents.
     This helps debug cases where the LLM says 'I don't know'.
     """
-    score_summary = [f"{s:.3f}" for s in scores[:5]]
-    logger.info(
-        f"[RETRIEVAL] user={user_id} | retrieved={num_docs} docs | "
-        f"scores={score_summary}"
-    )
+    if _enabled(logging.INFO, "RETRIEVAL"):
+        score_summary = [f"{s:.3f}" for s in scores[:5]]
+        logger.info(
+            "[RETRIEVAL] user=%s | retrieved=%d docs | scores=%s",
+            user_id, num_docs, score_summary, extra=_PRESAMPLED,
+        )
 
 
-def log_llm_call(user_id: str, model: str, prompt_tokens: int, context_length: int) -> None:
+def log_llm_call(
+    user_id: str, model: str, prompt_tokens: Union[int, Callable[[], int]], context_length: int,
+) -> None:
     """
     Log an LLM API call.
 
@@ -97,11 +255,15 @@ def log_llm_call(user_id: str, model: str, prompt_tokens: int, context_length: i
       - Cost monitoring (you pay per token)
       - Debugging context length issues
       - Identifying when context is being truncated
+    prompt_tokens may be a callable: it is only counted if the line is emitted.
     """
-    logger.info(
-        f"[LLM_CALL] user={user_id} | model={model} | "
-        f"prompt_tokens≈{prompt_tokens} | context_chars={context_length}"
-    )
+    if _enabled(logging.INFO, "LLM_CALL"):
+        if callable(prompt_tokens):
+            prompt_tokens = prompt_tokens()
+        logger.info(
+            "[LLM_CALL] user=%s | model=%s | prompt_tokens≈%d | context_chars=%d",
+            user_id, model, prompt_tokens, context_length, extra=_PRESAMPLED,
+        )
 
 
 def log_tool_use(user_id: str, tool_name: str, tool_input: str, tool_result: str) -> None:
@@ -114,13 +276,14 @@ def log_tool_use(user_id: str, tool_name: str, tool_input: str, tool_result: str
       - The tool's output
     This is critical for debugging agent behavior.
     """
-    logger.info(
-        f"[TOOL_USE] user={user_id} | tool={tool_name} | "
-        f"input=\"{tool_input[:80]}\" | result=\"{tool_result[:80]}\""
-    )
+    if _enabled(logging.INFO, "TOOL_USE"):
+        logger.info(
+            '[TOOL_USE] user=%s | tool=%s | input="%.80s" | result="%.80s"',
+            user_id, tool_name, tool_input, tool_result, extra=_PRESAMPLED,
+        )
 
 
-def log_guardrail_trigger(user_id: str, reason: str, query: str) -> None:
+def log_guardrail_trigger(user_id: str, reason: str, query: str, rule: str = "") -> None:
     """
     Log when a guardrail blocks a query.
 
@@ -128,39 +291,44 @@ def log_guardrail_trigger(user_id: str, reason: str, query: str) -> None:
       - Legitimate safety blocks (prompt injection attempts)
       - False positives (valid queries blocked by mistake)
     High false-positive rates indicate guardrails need tuning.
+    rule names the pattern rule that fired, so a false positive can be
+    traced to (and fixed in) its rule pack.
     """
     logger.warning(
-        f"[GUARDRAIL] user={user_id} | blocked_reason={reason} | "
-        f"query=\"{query[:100]}\""
+        '[GUARDRAIL] user=%s | blocked_reason=%s | %squery="%.100s"',
+        user_id, reason, f"rule={rule} | " if rule else "", query,
     )
 
 
 def log_rate_limit_hit(user_id: str, request_count: int, limit: int) -> None:
     """Log when a user hits the rate limit."""
-    logger.warning(
-        f"[RATE_LIMIT] user={user_id} | count={request_count}/{limit} | BLOCKED"
-    )
+    logger.warning("[RATE_LIMIT] user=%s | count=%d/%d | BLOCKED", user_id, request_count, limit)
 
 
 def log_permission_denied(user_id: str, user_role: str, doc_access_level: str) -> None:
     """Log when a user attempts to access a document above their permission level."""
     logger.warning(
-        f"[PERMISSION] user={user_id} role={user_role} | "
-        f"attempted_access={doc_access_level} | DENIED"
+        "[PERMISSION] user=%s role=%s | attempted_access=%s | DENIED", user_id, user_role, doc_access_level,
     )
 
 
-def log_workflow_step(step_name: str, user_id: str, details: Optional[str] = None) -> None:
-    """Log each step of the LangGraph workflow for tracing."""
-    msg = f"[WORKFLOW] step={step_name} | user={user_id}"
-    if details:
-        msg += f" | {details}"
-    logger.debug(msg)
+def log_workflow_step(step_name: str, user_id: str, fmt: Optional[str] = None, *args: Any) -> None:
+    """
+    Log each step of the LangGraph workflow for tracing.
+
+    fmt and args are %-style details, formatted only if the line is emitted.
+    """
+    if not _enabled(logging.DEBUG, "WORKFLOW"):
+        return
+    if fmt:
+        logger.debug("[WORKFLOW] step=%s | user=%s | " + fmt, step_name, user_id, *args, extra=_PRESAMPLED)
+    else:
+        logger.debug("[WORKFLOW] step=%s | user=%s", step_name, user_id, extra=_PRESAMPLED)
 
 
 def log_error(user_id: str, error: str, context: Optional[str] = None) -> None:
     """Log an error with context for debugging."""
-    msg = f"[ERROR] user={user_id} | error={error}"
     if context:
-        msg += f" | context={context}"
-    logger.error(msg)
+        logger.error("[ERROR] user=%s | error=%s | context=%s", user_id, error, context)
+    else:
+        logger.error("[ERROR] user=%s | error=%s", user_id, error)
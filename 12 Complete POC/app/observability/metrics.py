@@ -0,0 +1,320 @@
+"""
+app/observability/metrics.py — Latency Histograms + Prometheus /metrics
+
+[Concept: Metrics]
+
+────────────────────────────────────────────────────────────────
+LOGS TELL YOU WHAT HAPPENED, METRICS TELL YOU HOW OFTEN
+────────────────────────────────────────────────────────────────
+The [WORKFLOW] log lines say which steps ran for ONE request.
+To answer "where does our p99 latency go?" you need every
+request's timings aggregated:
+
+  rag_node_duration_seconds{node="generate_answer"}      ← LangGraph nodes
+  rag_request_duration_seconds{route="rag"}              ← whole workflow
+  rag_llm_duration_seconds{provider="openai",model=...}  ← each LLM call
+  rag_embedding_duration_seconds{provider="openai",...}  ← query embeddings
+  rag_vector_store_duration_seconds{backend="chroma",...}← searches + fetches
+
+Each is a HISTOGRAM: a count per latency bucket, so Prometheus
+can compute any percentile over any time window:
+
+  histogram_quantile(0.99,
+    sum by (le, node) (rate(rag_node_duration_seconds_bucket[5m])))
+
+Counters cover the things that end a request early
+(rag_guardrail_blocks_total, rag_rate_limit_rejections_total,
+rag_deadline_exceeded_total), and
+the caches' own hit/miss statistics are read at scrape time.
+timed_node also opens a span per node (see tracing.py), so one
+request's node timings can be followed in a trace.
+
+GET /metrics renders everything in the Prometheus text format.
+The implementation is a minimal in-process registry, so no extra
+dependency is needed. Values are per process; with several uvicorn
+workers, scrape each one.
+────────────────────────────────────────────────────────────────
+"""
+
+import asyncio
+import functools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.observability.logger import logger
+from app.observability.tracing import span
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+# ──────────────────────────────────────────────
+# Metric types
+# ──────────────────────────────────────────────
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label combination."""
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values → (per-bucket counts incl. +Inf, sum)
+        self._series: Dict[LabelValues, Tuple[List[int], float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with self._lock:
+            counts, total = self._series.get(key) or ([0] * (len(self.buckets) + 1), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._series[key] = (counts, total + value)
+
+    @contextmanager
+    def time(self, **labels: str):
+        """Observe the duration of the with-block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# ──────────────────────────────────────────────
+# Registry
+# ──────────────────────────────────────────────
+
+_metrics: List = []
+# (prefix, stats function, keys exported as counters)
+_stats_collectors: List[Tuple[str, Callable[[], Optional[dict]], Tuple[str, ...]]] = []
+
+
+def counter(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+    metric = Counter(name, help_text, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name: str, help_text: str, labelnames: Sequence[str] = ()) -> Histogram:
+    metric = Histogram(name, help_text, labelnames)
+    _metrics.append(metric)
+    return metric
+
+
+def register_stats(
+    prefix: str,
+    stats_fn: Callable[[], Optional[dict]],
+    counters: Iterable[str] = ("hits", "misses"),
+) -> None:
+    """
+    Export a component's stats() dict at scrape time: every numeric key
+    becomes {prefix}_{key}; keys in counters are exported as {prefix}_{key}_total.
+    """
+    _stats_collectors.append((prefix, stats_fn, tuple(counters)))
+
+
+def _render_stats() -> List[str]:
+    lines: List[str] = []
+    for prefix, stats_fn, counter_keys in _stats_collectors:
+        try:
+            stats = stats_fn() or {}
+        except Exception as e:
+            logger.warning(f"[METRICS] stats collector {prefix} failed: {e}")
+            continue
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key in counter_keys:
+                name, kind = f"{prefix}_{key}_total", "counter"
+            else:
+                name, kind = f"{prefix}_{key}", "gauge"
+            lines += [f"# TYPE {name} {kind}", f"{name} {value}"]
+    return lines
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in _metrics:
+        lines += metric.render()
+    lines += _render_stats()
+    return "\n".join(lines) + "\n"
+
+
+# ──────────────────────────────────────────────
+# Application metrics
+# ──────────────────────────────────────────────
+
+NODE_LATENCY = histogram(
+    "rag_node_duration_seconds", "Duration of each LangGraph workflow node.", ["node"],
+)
+REQUEST_LATENCY = histogram(
+    "rag_request_duration_seconds",
+    "End-to-end workflow duration by route "
+    "(rag, tool name, blocked, invalid_user, deadline_exceeded, token_budget_exceeded, error).",
+    ["route"],
+)
+LLM_LATENCY = histogram(
+    "rag_llm_duration_seconds", "Duration of each chat model call.", ["provider", "model"],
+)
+EMBEDDING_LATENCY = histogram(
+    "rag_embedding_duration_seconds",
+    "Duration of query embedding (including the embedding cache).", ["provider", "operation"],
+)
+VECTOR_STORE_LATENCY = histogram(
+    "rag_vector_store_duration_seconds",
+    "Duration of vector store searches and chunk fetches.", ["backend", "operation"],
+)
+GUARDRAIL_BLOCKS = counter(
+    "rag_guardrail_blocks_total", "Queries blocked by a guardrail check.", ["check"],
+)
+RATE_LIMIT_REJECTIONS = counter(
+    "rag_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter, by endpoint and budget (requests, tokens).", ["endpoint", "limit"],
+)
+DEADLINE_EXCEEDED = counter(
+    "rag_deadline_exceeded_total", "Requests whose time budget ran out, by workflow stage.", ["stage"],
+)
+
+
+# Node result fields copied onto the node's span: state key → (attribute, summary)
+_NODE_SPAN_FIELDS = (
+    ("retrieved_chunks",  "rag.chunks",            len),
+    ("citations",         "rag.citations",         len),
+    ("passed_guardrails", "rag.passed_guardrails", bool),
+    ("use_tool",          "rag.use_tool",          bool),
+    ("tool_name",         "rag.tool_name",         str),
+    ("deadline_exceeded", "rag.deadline_exceeded", bool),
+    ("error",             "rag.error",             str),
+)
+
+
+def _annotate_node_span(current, result) -> None:
+    if current is None or not isinstance(result, dict):
+        return
+    for key, attribute, summary in _NODE_SPAN_FIELDS:
+        value = result.get(key)
+        if value is not None:
+            current.set_attribute(attribute, summary(value))
+
+
+def timed_node(node: str):
+    """
+    Decorator: record a workflow node function (sync or async) in
+    rag_node_duration_seconds{node=...} and as a "node.<name>" span.
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(f"node.{node}") as current, NODE_LATENCY.time(node=node):
+                    result = await func(*args, **kwargs)
+                    _annotate_node_span(current, result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(f"node.{node}") as current, NODE_LATENCY.time(node=node):
+                result = func(*args, **kwargs)
+                _annotate_node_span(current, result)
+                return result
+        return wrapper
+
+    return decorator
+
+
+class LLMMetricsCallback(BaseCallbackHandler):
+    """
+    LangChain callback that times every chat model call (invoke, ainvoke,
+    stream, structured output) into rag_llm_duration_seconds.
+    """
+
+    run_inline = True   # called directly on the event loop, no executor hop
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._finish(run_id)
+
+    def _finish(self, run_id: UUID) -> None:
+        start = self._started.pop(run_id, None)
+        if start is not None:
+            LLM_LATENCY.observe(time.perf_counter() - start, provider=self.provider, model=self.model)
@@ -0,0 +1,410 @@
+"""
+app/observability/tracing.py — Request Tracing (OpenTelemetry-Compatible Spans)
+
+[Concept: Distributed Tracing]
+
+────────────────────────────────────────────────────────────────
+METRICS SAY "p99 IS SLOW", A TRACE SAYS WHERE ONE REQUEST WAITED
+────────────────────────────────────────────────────────────────
+The histograms in metrics.py aggregate over all requests. For ONE
+slow /ask you want its timeline:
+
+  POST /api/v1/ask                               2.41 s
+  ├─ node.validate_user                          0.00 s
+  ├─ node.apply_guardrails                       0.00 s
+  ├─ node.classify_and_route                     0.62 s
+  │   └─ llm.chat gpt-4o-mini  in=412 out=18     0.61 s
+  ├─ node.retrieve_documents                     0.31 s  rag.chunks=12
+  │   ├─ vector_store.aembed_query               0.18 s  cache_hits=0
+  │   ├─ vector_store.similarity_search_by_vector 0.09 s
+  │   └─ vector_store.fetch_neighbor_windows     0.03 s
+  ├─ node.build_context                          0.01 s
+  ├─ node.generate_answer                        1.45 s
+  │   └─ llm.chat gpt-4o-mini  in=1630 out=211   1.44 s
+  └─ node.format_response                        0.00 s
+
+Each box is a SPAN: a name, start/end time, a parent, and
+attributes (token counts, chunk counts, cache hits). Spans follow
+the OpenTelemetry data model: 32-hex trace ids, 16-hex span ids,
+W3C `traceparent` propagation, gen_ai.* attribute names. They can
+be sent to any OpenTelemetry collector (Jaeger, Tempo, Honeycomb…).
+
+  TRACING_EXPORTER=file  → one JSON object per span in TRACING_FILE
+  TRACING_EXPORTER=otlp  → OTLP/HTTP JSON to TRACING_OTLP_ENDPOINT
+  TRACING_EXPORTER=none  → off (default), spans cost nothing
+
+Spans are exported in batches from a background thread. The
+current span is kept in a ContextVar, so it follows asyncio tasks
+and asyncio.to_thread calls automatically.
+
+Clients can continue their own trace by sending `traceparent`. Every
+response carries `traceparent` and `X-Trace-Id`.
+────────────────────────────────────────────────────────────────
+"""
+
+import asyncio
+import atexit
+import functools
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.config import (
+    TRACING_EXPORTER, TRACING_FILE, TRACING_OTLP_ENDPOINT, TRACING_SAMPLE_RATE, TRACING_SERVICE_NAME,
+)
+from app.observability.logger import logger
+
+
+# OTLP span kinds
+KIND_INTERNAL = 1
+KIND_SERVER   = 2
+KIND_CLIENT   = 3
+
+STATUS_UNSET = 0
+STATUS_OK    = 1
+STATUS_ERROR = 2
+
+EXPORT_BATCH_SIZE = 512
+EXPORT_INTERVAL   = 2.0      # seconds
+EXPORT_QUEUE_SIZE = 20000    # spans; more are dropped
+
+
+# ──────────────────────────────────────────────
+# Span
+# ──────────────────────────────────────────────
+
+class Span:
+    """One timed operation. Only sampled spans (recording=True) are exported."""
+
+    __slots__ = (
+        "trace_id", "span_id", "parent_id", "name", "kind",
+        "start_ns", "end_ns", "attributes", "status", "status_message", "recording",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: int, recording: bool):
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+        self.recording = recording
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self.recording and value is not None:
+            self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        for key, value in attributes.items():
+            self.set_attribute(key, value)
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"[:500]
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            if self.recording:
+                _processor.submit(self)
+
+    def traceparent(self) -> str:
+        """W3C trace context header value for this span."""
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.recording else '00'}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id":       self.trace_id,
+            "span_id":        self.span_id,
+            "parent_span_id": self.parent_id,
+            "name":           self.name,
+            "kind":           self.kind,
+            "start_time_ns":  self.start_ns,
+            "end_time_ns":    self.end_ns,
+            "duration_ms":    round((self.end_ns - self.start_ns) / 1e6, 3),
+            "status":         {"code": self.status, "message": self.status_message},
+            "attributes":     self.attributes,
+            "service":        TRACING_SERVICE_NAME,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """(trace_id, parent span_id, sampled) from a W3C traceparent header, or None."""
+    match = _TRACEPARENT.match((header or "").strip().lower())
+    if not match or match.group(1) == "0" * 32 or match.group(2) == "0" * 16:
+        return None
+    return match.group(1), match.group(2), bool(int(match.group(3), 16) & 1)
+
+
+def is_enabled() -> bool:
+    return TRACING_EXPORTER in ("file", "otlp")
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def set_span_attributes(attributes: Dict[str, Any]) -> None:
+    """Add attributes to the current span (no-op when there is none)."""
+    current = _current_span.get()
+    if current is not None:
+        current.set_attributes(attributes)
+
+
+def _new_span(name: str, kind: int, traceparent: Optional[str]) -> Optional[Span]:
+    parent = _current_span.get()
+    if parent is not None:
+        return Span(name, parent.trace_id, parent.span_id, kind, parent.recording)
+
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id, sampled = remote
+        return Span(name, trace_id, parent_id, kind, sampled)
+    return Span(name, os.urandom(16).hex(), None, kind, random.random() < TRACING_SAMPLE_RATE)
+
+
+@contextmanager
+def span(
+    name: str,
+    kind: int = KIND_INTERNAL,
+    attributes: Optional[Dict[str, Any]] = None,
+    traceparent: Optional[str] = None,
+):
+    """
+    Time the with-block as a child of the current span (or as a new trace,
+    continuing traceparent if given). Yields the Span, or None if tracing is off.
+    """
+    if not is_enabled():
+        yield None
+        return
+
+    current = _new_span(name, kind, traceparent)
+    if attributes:
+        current.set_attributes(attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def traced(name: str, count_result: bool = False):
+    """
+    Decorator: run a function (sync or async) inside span(name).
+    count_result adds the length of a returned list or dict as "result.count".
+    """
+    def decorator(func):
+        def finish(current: Optional[Span], result):
+            if count_result and current is not None and isinstance(result, (list, dict)):
+                current.set_attribute("result.count", len(result))
+            return result
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name) as current:
+                    return finish(current, await func(*args, **kwargs))
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name) as current:
+                return finish(current, func(*args, **kwargs))
+        return wrapper
+
+    return decorator
+
+
+# ──────────────────────────────────────────────
+# LLM spans (LangChain callback)
+# ──────────────────────────────────────────────
+
+class LLMTracingCallback(BaseCallbackHandler):
+    """
+    One span per chat model call, as a child of the span that made the call
+    (e.g. node.generate_answer), with gen_ai.* token usage attributes.
+    """
+
+    run_inline = True   # called in the caller's context, so the parent span is visible
+
+    def __init__(self, provider: str, model: str):
+        self.provider = provider
+        self.model = model
+        self._spans: Dict[UUID, Span] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        if not is_enabled():
+            return
+        current = _new_span(f"llm.chat {self.model}", KIND_CLIENT, None)
+        current.set_attributes({
+            "gen_ai.system":         self.provider,
+            "gen_ai.request.model":  self.model,
+            "gen_ai.request.messages": sum(len(batch) for batch in messages),
+        })
+        self._spans[run_id] = current
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        current = self._spans.pop(run_id, None)
+        if current is None:
+            return
+        usage = _usage_from_result(response)
+        current.set_attributes({
+            "gen_ai.usage.input_tokens":  usage.get("input_tokens"),
+            "gen_ai.usage.output_tokens": usage.get("output_tokens"),
+        })
+        current.end()
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        current = self._spans.pop(run_id, None)
+        if current is not None:
+            current.record_error(error)
+            current.end()
+
+
+def _usage_from_result(response) -> Dict[str, int]:
+    """Token usage from an LLMResult (chat message usage_metadata, else llm_output)."""
+    try:
+        message = response.generations[0][0].message
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            return usage
+    except (AttributeError, IndexError):
+        pass
+    token_usage = (getattr(response, "llm_output", None) or {}).get("token_usage") or {}
+    return {
+        "input_tokens":  token_usage.get("prompt_tokens"),
+        "output_tokens": token_usage.get("completion_tokens"),
+    }
+
+
+# ──────────────────────────────────────────────
+# Export
+# ──────────────────────────────────────────────
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_payload(spans: List[Span]) -> Dict[str, Any]:
+    """OTLP/HTTP JSON body (ExportTraceServiceRequest) for a batch of spans."""
+    return {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": TRACING_SERVICE_NAME}}]},
+        "scopeSpans": [{
+            "scope": {"name": "app.observability.tracing"},
+            "spans": [{
+                "traceId":           s.trace_id,
+                "spanId":            s.span_id,
+                "parentSpanId":      s.parent_id or "",
+                "name":              s.name,
+                "kind":              s.kind,
+                "startTimeUnixNano": str(s.start_ns),
+                "endTimeUnixNano":   str(s.end_ns),
+                "attributes":        [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+                "status":            {"code": s.status, "message": s.status_message},
+            } for s in spans],
+        }],
+    }]}
+
+
+class _BatchProcessor:
+    """Collects finished spans and exports them in batches from a daemon thread."""
+
+    def __init__(self, exporter: str):
+        self.exporter = exporter
+        self.exported = 0
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._wake = threading.Event()
+        self._client = None
+        if exporter in ("file", "otlp"):
+            threading.Thread(target=self._run, name="span-exporter", daemon=True).start()
+            atexit.register(self.flush)
+
+    def submit(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= EXPORT_BATCH_SIZE:
+            self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(EXPORT_INTERVAL)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        while True:
+            batch: List[Span] = []
+            while len(batch) < EXPORT_BATCH_SIZE:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                self._export(batch)
+                self.exported += len(batch)
+            except Exception as e:
+                self.dropped += len(batch)
+                logger.warning(f"[TRACING] Export of {len(batch)} spans failed: {e}")
+
+    def _export(self, batch: List[Span]) -> None:
+        if self.exporter == "file":
+            directory = os.path.dirname(TRACING_FILE)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(TRACING_FILE, "a", encoding="utf-8") as f:
+                for s in batch:
+                    f.write(json.dumps(s.to_dict(), default=str) + "\n")
+            return
+
+        if self._client is None:
+            import httpx
+            self._client = httpx.Client(timeout=5.0)
+        response = self._client.post(
+            TRACING_OTLP_ENDPOINT.rstrip("/") + "/v1/traces", json=_otlp_payload(batch),
+        )
+        response.raise_for_status()
+
+    def stats(self) -> Dict[str, int]:
+        return {"exported": self.exported, "dropped": self.dropped, "queued": self._queue.qsize()}
+
+
+_processor = _BatchProcessor(TRACING_EXPORTER)
+
+
+def tracing_stats() -> Optional[Dict[str, int]]:
+    return _processor.stats() if is_enabled() else None
@@ -0,0 +1,101 @@
+"""
+app/orchestration/deadline.py — Per-Request Deadlines
+
+[Concept: Deadline Propagation]
+
+────────────────────────────────────────────────────────────────
+WHY A DEADLINE INSTEAD OF TIMEOUTS PER CALL?
+────────────────────────────────────────────────────────────────
+A question makes several network calls in a row: embed the query,
+search ChromaDB, classify, generate. Giving each call its own
+fixed timeout (say 30 s) still lets one request run for minutes.
+
+Instead each request gets ONE absolute deadline when it starts
+(REQUEST_TIMEOUT_SECONDS, or the X-Request-Timeout header). It is
+stored in WorkflowState["deadline"], and every call gets what is
+LEFT of the budget as its timeout:
+
+  start ─ embed (0.3 s) ─ classify (1.2 s) ─ retrieve ─ generate
+  │◄──────────────── REQUEST_TIMEOUT_SECONDS ────────────────►│
+                                                 generate gets
+                                                 whatever remains
+
+When the budget runs out the workflow DEGRADES instead of hanging:
+the call is cancelled, the remaining work is skipped, and the
+answer lists the citations retrieved so far with
+error="deadline_exceeded".
+
+Async nodes enforce the deadline (asyncio.wait_for cancels the
+call). The sync run_workflow can only check it between calls.
+────────────────────────────────────────────────────────────────
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Optional, TypeVar
+
+from app.observability.logger import logger
+from app.observability.metrics import DEADLINE_EXCEEDED
+
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out during (or before) a stage."""
+
+    def __init__(self, stage: str):
+        super().__init__(f"deadline exceeded during {stage}")
+        self.stage = stage
+
+
+def new_deadline(timeout_seconds: Optional[float]) -> Optional[float]:
+    """Absolute deadline (time.monotonic() clock) for a budget; None = no deadline."""
+    if not timeout_seconds or timeout_seconds <= 0:
+        return None
+    return time.monotonic() + timeout_seconds
+
+
+def time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left before the deadline (may be negative); None = no deadline."""
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def is_expired(deadline: Optional[float]) -> bool:
+    remaining = time_left(deadline)
+    return remaining is not None and remaining <= 0
+
+
+def check_deadline(deadline: Optional[float], stage: str) -> None:
+    """Raise DeadlineExceeded if the budget is already spent (sync code paths)."""
+    if is_expired(deadline):
+        _record(stage)
+        raise DeadlineExceeded(stage)
+
+
+async def within_deadline(deadline: Optional[float], awaitable: Awaitable[T], stage: str) -> T:
+    """
+    Await with the remaining budget as timeout. On expiry the awaitable is
+    cancelled and DeadlineExceeded is raised.
+    """
+    remaining = time_left(deadline)
+    if remaining is None:
+        return await awaitable
+    if remaining <= 0:
+        if asyncio.iscoroutine(awaitable):
+            awaitable.close()   # never started: avoid "coroutine was never awaited"
+        _record(stage)
+        raise DeadlineExceeded(stage)
+
+    try:
+        return await asyncio.wait_for(awaitable, timeout=remaining)
+    except asyncio.TimeoutError:
+        _record(stage)
+        raise DeadlineExceeded(stage) from None
+
+
+def _record(stage: str) -> None:
+    DEADLINE_EXCEEDED.inc(stage=stage)
+    logger.warning(f"[DEADLINE] Budget exhausted during {stage} — degrading the response")
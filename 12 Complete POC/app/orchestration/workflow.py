@@ -43,18 +43,74 @@ GRAPH STRUCTURE:
   format_response       — Add citations, finalize
     ↓
   END
+
+SPECULATIVE MODE (SPECULATIVE_RETRIEVAL_ENABLED=true):
+  Most questions end up on the RAG path, so retrieval does not wait
+  for the agent's decision. After the guardrails the query is
+  embedded once, then two branches run IN PARALLEL:
+
+  embed_query
+    ↓                     ↓
+  classify_and_route    speculative_retrieve
+    ↓                     ↓
+  join_retrieval  ────────┘   — RAG: keep the chunks; tool: discard them
+    ↓ (RAG)               ↓ (Tool)
+  build_context         generate_answer
+    ...
+
+  On the RAG path, retrieval time is hidden behind classification.
+  The tool path pays for a retrieval it throws away. It only waits
+  for it when retrieval is slower than the classification call.
+
+DEADLINE (REQUEST_TIMEOUT_SECONDS / X-Request-Timeout):
+  state["deadline"] is set when the request starts. Every embedding,
+  search and LLM call is given the time that is left (see
+  deadline.py). When it runs out, classification falls back to the
+  RAG path, retrieval is skipped, and generate_answer returns the
+  citations found so far instead of an answer.
+
+BATCH MODE (arun_workflow_batch, used by POST /ask_batch):
+  The same node functions, run phase by phase over many questions
+  so the work that batches well is shared:
+
+  validate_user + apply_guardrails   — every question, no I/O
+    ↓
+  one embed_documents call           — all admitted questions
+    ↓
+  classify → retrieve → build_context — concurrently per question
+    ↓
+  generate_answer                    — at most N at a time
+    ↓
+  format_response
 ────────────────────────────────────────────────────────────────
 """
 
-from typing import TypedDict, List, Optional, Any
+import asyncio
+import operator
+import time
+from typing import TypedDict, List, Optional, Any, AsyncIterator, Sequence, Tuple, Annotated
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END, START
 
 from app.models.schemas import UserRole, RetrievedChunk, Citation, QueryResponse
 from app.security.permissions import validate_user, get_user_role
 from app.security.guardrails import run_all_guardrails
-from app.rag.retriever import retrieve_documents, generate_rag_answer, build_context
-from app.agents.knowledge_agent import run_agent
+from app.rag.retriever import (
+    retrieve_documents, aretrieve_documents,
+    generate_rag_answer, agenerate_rag_answer, build_context, build_citations,
+    pack_context_chunks, estimate_rag_prompt_tokens,
+)
+from app.agents.knowledge_agent import run_agent, arun_agent
+from app.config import (
+    ROUTER_ENABLED, SPECULATIVE_RETRIEVAL_ENABLED, BATCH_GENERATION_CONCURRENCY, REQUEST_TIMEOUT_SECONDS,
+)
+from app.orchestration.deadline import DeadlineExceeded, new_deadline, is_expired, check_deadline, within_deadline
+from app.rate_limiting.limiter import (
+    TokenReservation, areconcile_tokens, areserve_tokens, reconcile_tokens, reserve_tokens,
+)
+from app.vector_store.chroma_store import vector_store
 from app.observability.logger import log_workflow_step, log_error, logger
+from app.observability.metrics import REQUEST_LATENCY, timed_node
 
 
 # ──────────────────────────────────────────────
@@ -70,6 +126,11 @@ class WorkflowState(TypedDict):
     query:          str
     user_id:        str
 
+    # Time budget: absolute time.monotonic() deadline (None = unlimited).
+    # deadline_exceeded is OR-reduced: parallel branches may both set it.
+    deadline:          Optional[float]
+    deadline_exceeded: Annotated[bool, operator.or_]
+
     # Permission Resolution
     user_role:      Optional[UserRole]
     is_valid_user:  bool
@@ -79,6 +140,7 @@ class WorkflowState(TypedDict):
     guardrail_error:   str
 
     # Agent Decision
+    query_embedding: Optional[List[float]]  # computed once: routing + retrieval
     use_tool:       bool
     tool_name:      Optional[str]
     tool_result:    Optional[str]
@@ -91,6 +153,7 @@ class WorkflowState(TypedDict):
     answer:         str
     citations:      List[Any]  # List[Citation]
     error:          Optional[str]
+    retry_after:    Optional[float]  # set when the token budget refused generation
 
 
 # ──────────────────────────────────────────────
@@ -98,6 +161,7 @@ class WorkflowState(TypedDict):
 # Each node receives the current state and returns updated fields
 # ──────────────────────────────────────────────
 
+@timed_node("validate_user")
 def node_validate_user(state: WorkflowState) -> dict:
     """
     Node 1: Validate that the user exists and retrieve their role.
@@ -126,6 +190,7 @@ def node_validate_user(state: WorkflowState) -> dict:
     }
 
 
+@timed_node("apply_guardrails")
 def node_apply_guardrails(state: WorkflowState) -> dict:
     """
     Node 2: Run all safety guardrail checks on the query.
@@ -146,6 +211,7 @@ def node_apply_guardrails(state: WorkflowState) -> dict:
     }
 
 
+@timed_node("classify_and_route")
 def node_classify_and_route(state: WorkflowState) -> dict:
     """
     Node 3: Agent classifies the query and decides the approach.
@@ -158,8 +224,70 @@ def node_classify_and_route(state: WorkflowState) -> dict:
     """
     log_workflow_step("classify_and_route", state["user_id"])
 
-    result, tool_name, is_tool = run_agent(state["query"], state["user_id"], state["user_role"])
+    try:
+        check_deadline(state.get("deadline"), "classify_and_route")
+    except DeadlineExceeded:
+        return _classification_timed_out()
+
+    # The query is embedded once: the router classifies from this vector
+    # and the RAG path reuses it for retrieval. In speculative mode the
+    # embed_query node has already done it.
+    query_embedding = state.get("query_embedding")
+    computed = None
+    if query_embedding is None and ROUTER_ENABLED:
+        query_embedding = computed = vector_store.embed_query(state["query"])
+
+    result, tool_name, is_tool = run_agent(
+        state["query"], state["user_id"], state["user_role"], query_embedding
+    )
+    return _classification_update(result, tool_name, is_tool, computed)
+
 
+@timed_node("classify_and_route")
+async def anode_classify_and_route(state: WorkflowState) -> dict:
+    """
+    Async variant of node_classify_and_route (awaits the embedding and LLM
+    calls, each limited to the time left before the deadline).
+    """
+    log_workflow_step("classify_and_route", state["user_id"])
+    deadline = state.get("deadline")
+
+    try:
+        query_embedding = state.get("query_embedding")
+        computed = None
+        if query_embedding is None and ROUTER_ENABLED:
+            query_embedding = computed = await within_deadline(
+                deadline, vector_store.aembed_query(state["query"]), "embed_query"
+            )
+
+        result, tool_name, is_tool = await within_deadline(
+            deadline,
+            arun_agent(state["query"], state["user_id"], state["user_role"], query_embedding),
+            "classify_and_route",
+        )
+    except DeadlineExceeded:
+        return _classification_timed_out()
+
+    return _classification_update(result, tool_name, is_tool, computed)
+
+
+def _classification_timed_out() -> dict:
+    # No decision in time: take the RAG path (route_after_classification
+    # then skips straight to generate_answer, which degrades)
+    return {
+        "use_tool":          False,
+        "tool_name":         None,
+        "tool_result":       None,
+        "deadline_exceeded": True,
+    }
+
+
+def _classification_update(
+    result: str,
+    tool_name: Optional[str],
+    is_tool: bool,
+    computed_embedding: Optional[List[float]],
+) -> dict:
     if is_tool:
         # Agent used a tool — we have a result already
         return {
@@ -167,49 +295,133 @@ def node_classify_and_route(state: WorkflowState) -> dict:
             "tool_name":   tool_name,
             "tool_result": result,
         }
-    else:
-        # Agent says: use RAG
-        return {
-            "use_tool":    False,
-            "tool_name":   None,
-            "tool_result": None,
-        }
+
+    # Agent says: use RAG
+    update = {
+        "use_tool":    False,
+        "tool_name":   None,
+        "tool_result": None,
+    }
+    if computed_embedding is not None:
+        # Only written when this node embedded the query itself: in
+        # speculative mode a parallel branch must not write the same key.
+        update["query_embedding"] = computed_embedding
+    return update
+
+
+@timed_node("embed_query")
+def node_embed_query(state: WorkflowState) -> dict:
+    """
+    Speculative mode only: embed the query before the parallel branches,
+    so classification and speculative retrieval share one vector.
+    """
+    log_workflow_step("embed_query", state["user_id"])
+    if is_expired(state.get("deadline")):
+        return {"query_embedding": None, "deadline_exceeded": True}
+    return {"query_embedding": vector_store.embed_query(state["query"])}
+
+
+@timed_node("embed_query")
+async def anode_embed_query(state: WorkflowState) -> dict:
+    """Async variant of node_embed_query."""
+    log_workflow_step("embed_query", state["user_id"])
+    try:
+        embedding = await within_deadline(
+            state.get("deadline"), vector_store.aembed_query(state["query"]), "embed_query"
+        )
+    except DeadlineExceeded:
+        return {"query_embedding": None, "deadline_exceeded": True}
+    return {"query_embedding": embedding}
 
 
+@timed_node("retrieve_documents")
 def node_retrieve_documents(state: WorkflowState) -> dict:
     """
     Node 4a (RAG path): Retrieve relevant document chunks from ChromaDB.
 
     Uses permission-aware retrieval — only returns documents
-    the user is authorized to see.
+    the user is authorized to see. Reuses the query embedding computed
+    for routing, so the query is not embedded a second time.
     """
     log_workflow_step("retrieve_documents", state["user_id"])
 
+    try:
+        check_deadline(state.get("deadline"), "retrieve_documents")
+    except DeadlineExceeded:
+        return {"retrieved_chunks": [], "deadline_exceeded": True}
+
     chunks = retrieve_documents(
         query=state["query"],
         user_role=state["user_role"],
         user_id=state["user_id"],
+        query_embedding=state.get("query_embedding"),
     )
 
     return {"retrieved_chunks": chunks}
 
 
+@timed_node("retrieve_documents")
+async def anode_retrieve_documents(state: WorkflowState) -> dict:
+    """Async variant of node_retrieve_documents (awaits embedding + search within the deadline)."""
+    log_workflow_step("retrieve_documents", state["user_id"])
+
+    try:
+        chunks = await within_deadline(
+            state.get("deadline"),
+            aretrieve_documents(
+                query=state["query"],
+                user_role=state["user_role"],
+                user_id=state["user_id"],
+                query_embedding=state.get("query_embedding"),
+            ),
+            "retrieve_documents",
+        )
+    except DeadlineExceeded:
+        return {"retrieved_chunks": [], "deadline_exceeded": True}
+
+    return {"retrieved_chunks": chunks}
+
+
+@timed_node("join_retrieval")
+def node_join_retrieval(state: WorkflowState) -> dict:
+    """
+    Speculative mode only: join point of classification and retrieval.
+
+    On the RAG path the speculatively retrieved chunks are kept as-is.
+    On the tool path they are discarded so they cannot leak into the answer.
+    """
+    if state.get("use_tool"):
+        log_workflow_step("join_retrieval", state["user_id"], "tool path — speculative retrieval discarded")
+        return {"retrieved_chunks": []}
+
+    log_workflow_step(
+        "join_retrieval", state["user_id"],
+        "RAG path — reusing %s speculatively retrieved chunks", len(state.get("retrieved_chunks", [])),
+    )
+    return {}
+
+
+@timed_node("build_context")
 def node_build_context(state: WorkflowState) -> dict:
     """
     Node 5 (RAG path): Format retrieved chunks into a context string.
 
     Why a separate node: Context building can be customized.
+    The chunks are packed into CONTEXT_TOKEN_BUDGET tokens (most relevant
+    first); the packed list replaces retrieved_chunks so the answer only
+    cites sources the LLM actually saw.
     Future enhancements: summarize long contexts, rerank chunks,
     filter by recency, etc.
     """
     log_workflow_step("build_context", state["user_id"])
 
-    chunks = state.get("retrieved_chunks", [])
+    chunks = pack_context_chunks(state.get("retrieved_chunks", []))
     context = build_context(chunks)
 
-    return {"context": context}
+    return {"retrieved_chunks": chunks, "context": context}
 
 
+@timed_node("generate_answer")
 def node_generate_answer(state: WorkflowState) -> dict:
     """
     Node 6: Generate the final answer.
@@ -229,11 +441,29 @@ def node_generate_answer(state: WorkflowState) -> dict:
     else:
         # RAG path: generate answer from retrieved documents
         chunks = state.get("retrieved_chunks", [])
-        answer, citations = generate_rag_answer(
-            query=state["query"],
-            chunks=chunks,
-            user_id=state["user_id"],
-        )
+        try:
+            if state.get("deadline_exceeded"):
+                raise DeadlineExceeded("generate_answer")
+            check_deadline(state.get("deadline"), "generate_answer")
+        except DeadlineExceeded:
+            return _degraded_answer(chunks)
+
+        prompt_tokens = _generation_prompt_tokens(state, chunks)
+        reservation = reserve_tokens(state["user_id"], state.get("user_role"), prompt_tokens)
+        if not reservation.allowed:
+            return _token_budget_exceeded(reservation)
+        try:
+            answer, citations, tokens_used = generate_rag_answer(
+                query=state["query"],
+                chunks=chunks,
+                user_id=state["user_id"],
+                context=state.get("context") or None,
+                prompt_tokens=prompt_tokens,
+            )
+        except Exception:
+            reconcile_tokens(reservation, 0)
+            raise
+        reconcile_tokens(reservation, tokens_used)
 
     return {
         "answer":    answer,
@@ -241,6 +471,90 @@ def node_generate_answer(state: WorkflowState) -> dict:
     }
 
 
+@timed_node("generate_answer")
+async def anode_generate_answer(state: WorkflowState) -> dict:
+    """Async variant of node_generate_answer (awaits the LLM with ainvoke)."""
+    log_workflow_step("generate_answer", state["user_id"])
+
+    if state.get("use_tool") and state.get("tool_result"):
+        answer = state["tool_result"]
+        citations = []
+
+    else:
+        chunks = state.get("retrieved_chunks", [])
+        if state.get("deadline_exceeded"):
+            return _degraded_answer(chunks)
+
+        prompt_tokens = _generation_prompt_tokens(state, chunks)
+        reservation = await areserve_tokens(state["user_id"], state.get("user_role"), prompt_tokens)
+        if not reservation.allowed:
+            return _token_budget_exceeded(reservation)
+        try:
+            answer, citations, tokens_used = await within_deadline(
+                state.get("deadline"),
+                agenerate_rag_answer(
+                    query=state["query"],
+                    chunks=chunks,
+                    user_id=state["user_id"],
+                    context=state.get("context") or None,
+                    prompt_tokens=prompt_tokens,
+                ),
+                "generate_answer",
+            )
+        except DeadlineExceeded:
+            return _degraded_answer(chunks)   # cancelled mid-call: the reservation stays spent
+        except Exception:
+            await areconcile_tokens(reservation, 0)
+            raise
+        await areconcile_tokens(reservation, tokens_used)
+
+    return {
+        "answer":    answer,
+        "citations": citations,
+    }
+
+
+def _generation_prompt_tokens(state: WorkflowState, chunks: List[Any]) -> int:
+    """
+    Prompt tokens of the generation call: reserved in the user's token
+    budget, then passed to generate_rag_answer for its log line.
+    """
+    context = state.get("context") or build_context(pack_context_chunks(chunks))
+    return estimate_rag_prompt_tokens(state["query"], context)
+
+
+def _token_budget_exceeded(reservation: TokenReservation) -> dict:
+    """The question does not fit in what is left of the user's token budget."""
+    return {
+        "answer": (
+            f"You have used your budget of {reservation.limit} tokens for now. "
+            f"Please try again in {max(1, round(reservation.retry_after))} seconds."
+        ),
+        "citations":   [],
+        "error":       "token_budget_exceeded",
+        "retry_after": reservation.retry_after,
+    }
+
+
+def _degraded_answer(chunks: List[Any]) -> dict:
+    """Out of time: return what was retrieved instead of a generated answer."""
+    citations = build_citations(chunks)
+    if citations:
+        answer = (
+            "The answer could not be generated within the time limit. "
+            "These documents are the most relevant to your question."
+        )
+    else:
+        answer = "The request ran out of time before an answer could be found. Please try again."
+    return {
+        "answer":            answer,
+        "citations":         citations,
+        "error":             "deadline_exceeded",
+        "deadline_exceeded": True,
+    }
+
+
+@timed_node("format_response")
 def node_format_response(state: WorkflowState) -> dict:
     """
     Node 7: Final formatting and response assembly.
@@ -267,10 +581,8 @@ def node_format_response(state: WorkflowState) -> dict:
         answer += f"\n\n📎 Sources: {doc_refs}"
 
     logger.info(
-        f"[WORKFLOW] Complete for user={state['user_id']} | "
-        f"tool_used={tool_name or 'none'} | "
-        f"citations={len(citations)} | "
-        f"answer_length={len(answer)}"
+        "[WORKFLOW] Complete for user=%s | tool_used=%s | citations=%s | answer_length=%s",
+        state["user_id"], tool_name or "none", len(citations), len(answer),
     )
 
     return {"answer": answer}
@@ -299,13 +611,23 @@ def route_after_classification(state: WorkflowState) -> str:
     """After agent classification: go to tool path or RAG path."""
     if state.get("use_tool", False):
         return "generate_answer"    # Tool already ran, skip retrieval
+    if state.get("deadline_exceeded", False):
+        return "generate_answer"    # Out of time: degrade without retrieving
     return "retrieve_documents"     # Use RAG pipeline
 
 
+def route_after_join(state: WorkflowState) -> str:
+    """Speculative mode: after the join, the chunks are already in state."""
+    if state.get("use_tool", False):
+        return "generate_answer"    # Tool already ran, retrieval discarded
+    return "build_context"          # Retrieval already ran in parallel
+
+
 # ──────────────────────────────────────────────
 # Terminal Error Nodes
 # ──────────────────────────────────────────────
 
+@timed_node("end_with_error")
 def node_end_with_error(state: WorkflowState) -> dict:
     """Terminal node for user validation failures."""
     return {
@@ -314,6 +636,7 @@ def node_end_with_error(state: WorkflowState) -> dict:
     }
 
 
+@timed_node("end_with_guardrail_block")
 def node_end_with_guardrail_block(state: WorkflowState) -> dict:
     """Terminal node for guardrail blocks."""
     return {
@@ -327,7 +650,7 @@ def node_end_with_guardrail_block(state: WorkflowState) -> dict:
 # Graph Assembly
 # ──────────────────────────────────────────────
 
-def build_workflow() -> Any:
+def build_workflow(speculative: bool = SPECULATIVE_RETRIEVAL_ENABLED) -> Any:
     """
     Assemble the LangGraph StateGraph.
 
@@ -341,6 +664,14 @@ def build_workflow() -> Any:
       - State is typed and explicit (TypedDict)
       - Each node only gets/sets what it needs
       - Makes the data flow transparent and debuggable
+
+    Nodes that wait on the network (LLM, embeddings) are registered with
+    both a sync and an async implementation. workflow.invoke() runs the
+    sync ones; workflow.ainvoke() awaits the async ones, so the FastAPI
+    event loop is never blocked while a question is in flight.
+
+    With speculative=True, retrieval runs in parallel with classification
+    (see SPECULATIVE MODE in the module docstring).
     """
     # Create the graph with our state type
     graph = StateGraph(WorkflowState)
@@ -348,13 +679,23 @@ def build_workflow() -> Any:
     # ── Add all nodes ──
     graph.add_node("validate_user",           node_validate_user)
     graph.add_node("apply_guardrails",         node_apply_guardrails)
-    graph.add_node("classify_and_route",       node_classify_and_route)
-    graph.add_node("retrieve_documents",       node_retrieve_documents)
+    graph.add_node("classify_and_route",
+                   RunnableLambda(node_classify_and_route, afunc=anode_classify_and_route))
     graph.add_node("build_context",            node_build_context)
-    graph.add_node("generate_answer",          node_generate_answer)
+    graph.add_node("generate_answer",
+                   RunnableLambda(node_generate_answer, afunc=anode_generate_answer))
     graph.add_node("format_response",          node_format_response)
     graph.add_node("end_with_error",           node_end_with_error)
     graph.add_node("end_with_guardrail_block", node_end_with_guardrail_block)
+    if speculative:
+        graph.add_node("embed_query",
+                       RunnableLambda(node_embed_query, afunc=anode_embed_query))
+        graph.add_node("speculative_retrieve",
+                       RunnableLambda(node_retrieve_documents, afunc=anode_retrieve_documents))
+        graph.add_node("join_retrieval",       node_join_retrieval)
+    else:
+        graph.add_node("retrieve_documents",
+                       RunnableLambda(node_retrieve_documents, afunc=anode_retrieve_documents))
 
     # ── Add edges ──
 
@@ -376,23 +717,41 @@ def build_workflow() -> Any:
         "apply_guardrails",
         route_after_guardrails,
         {
-            "classify_and_route":        "classify_and_route",
+            "classify_and_route":        "embed_query" if speculative else "classify_and_route",
             "end_with_guardrail_block":  "end_with_guardrail_block",
         }
     )
 
-    # Conditional: after classification → RAG path or Tool path
-    graph.add_conditional_edges(
-        "classify_and_route",
-        route_after_classification,
-        {
-            "retrieve_documents": "retrieve_documents",   # RAG path
-            "generate_answer":    "generate_answer",      # Tool path (skip retrieval)
-        }
-    )
+    if speculative:
+        # Fan out: classification and retrieval run in the same step
+        graph.add_edge("embed_query", "classify_and_route")
+        graph.add_edge("embed_query", "speculative_retrieve")
+
+        # Fan in: join_retrieval waits for both branches
+        graph.add_edge(["classify_and_route", "speculative_retrieve"], "join_retrieval")
+        graph.add_conditional_edges(
+            "join_retrieval",
+            route_after_join,
+            {
+                "build_context":   "build_context",     # RAG path (chunks ready)
+                "generate_answer": "generate_answer",   # Tool path
+            }
+        )
+    else:
+        # Conditional: after classification → RAG path or Tool path
+        graph.add_conditional_edges(
+            "classify_and_route",
+            route_after_classification,
+            {
+                "retrieve_documents": "retrieve_documents",   # RAG path
+                "generate_answer":    "generate_answer",      # Tool path (skip retrieval)
+            }
+        )
+
+        # RAG path: retrieve → build context
+        graph.add_edge("retrieve_documents", "build_context")
 
-    # RAG path: retrieve → build context → generate
-    graph.add_edge("retrieve_documents", "build_context")
+    # RAG path: build context → generate
     graph.add_edge("build_context",      "generate_answer")
 
     # Both paths converge at generate_answer → format → END
@@ -419,7 +778,11 @@ workflow = build_workflow()
 # Public API
 # ──────────────────────────────────────────────
 
-def run_workflow(query: str, user_id: str) -> WorkflowState:
+def run_workflow(
+    query: str,
+    user_id: str,
+    timeout: Optional[float] = REQUEST_TIMEOUT_SECONDS,
+) -> WorkflowState:
     """
     Execute the complete workflow for a user query.
 
@@ -430,17 +793,223 @@ def run_workflow(query: str, user_id: str) -> WorkflowState:
     Args:
         query:   The user's question
         user_id: The authenticated user's ID
+        timeout: Time budget in seconds (None or 0 = no deadline). The
+                 sync path checks it between calls; it cannot cancel one.
 
     Returns:
         Final WorkflowState with answer, citations, and metadata
     """
-    initial_state: WorkflowState = {
+    initial_state = _initial_state(query, user_id, timeout)
+
+    logger.info("[WORKFLOW] Starting for user=%s | query='%s'", user_id, query[:60])
+    started = time.perf_counter()
+
+    try:
+        final_state = workflow.invoke(initial_state)
+    except Exception as e:
+        final_state = _failed_state(initial_state, user_id, e)
+    _observe_request(final_state, started)
+    return final_state
+
+
+async def arun_workflow(
+    query: str,
+    user_id: str,
+    timeout: Optional[float] = REQUEST_TIMEOUT_SECONDS,
+) -> WorkflowState:
+    """
+    Async variant of run_workflow, used by POST /ask.
+
+    Drives the same graph with workflow.ainvoke(), so embedding, vector
+    search and LLM calls are awaited instead of blocking the event loop.
+    One uvicorn worker can keep many questions in flight at once. Each
+    call is cancelled when the timeout budget runs out.
+    """
+    initial_state = _initial_state(query, user_id, timeout)
+
+    logger.info("[WORKFLOW] Starting for user=%s | query='%s'", user_id, query[:60])
+    started = time.perf_counter()
+
+    try:
+        final_state = await workflow.ainvoke(initial_state)
+    except Exception as e:
+        final_state = _failed_state(initial_state, user_id, e)
+    _observe_request(final_state, started)
+    return final_state
+
+
+async def astream_workflow(
+    query: str,
+    user_id: str,
+    timeout: Optional[float] = REQUEST_TIMEOUT_SECONDS,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Streaming variant of arun_workflow, used by POST /ask/stream.
+
+    Drives the same graph with workflow.astream() in two stream modes:
+      - "updates":  node outputs, merged into a local copy of the state;
+                    citations are emitted as soon as retrieval is done
+      - "messages": LLM token chunks; only those produced inside the
+                    generate_answer node are forwarded
+
+    Yields (event, payload) pairs, in this order:
+      ("citations", {"citations": [...]})   — RAG path only, after retrieval
+      ("token",     {"delta": "..."})       — zero or more answer deltas
+      ("final",     {...})                  — answer, tool, error, usage
+    """
+    state = _initial_state(query, user_id, timeout)
+    usage = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    citations_sent = False
+
+    logger.info("[WORKFLOW] Starting stream for user=%s | query='%s'", user_id, query[:60])
+    started = time.perf_counter()
+
+    try:
+        async for mode, payload in workflow.astream(state, stream_mode=["updates", "messages"]):
+            if mode == "messages":
+                chunk, metadata = payload
+                if metadata.get("langgraph_node") != "generate_answer":
+                    continue   # e.g. the classification call
+                for key, value in (getattr(chunk, "usage_metadata", None) or {}).items():
+                    if key in usage:
+                        usage[key] += value
+                delta = _chunk_text(chunk)
+                if delta:
+                    yield "token", {"delta": delta}
+                continue
+
+            for node, update in payload.items():
+                state.update(update or {})
+                # build_context runs right after retrieval (no I/O), on the RAG path only
+                if node == "build_context" and not citations_sent:
+                    citations_sent = True
+                    citations = build_citations(state.get("retrieved_chunks", []))
+                    yield "citations", {"citations": [c.model_dump() for c in citations]}
+
+    except Exception as e:
+        state = _failed_state(state, user_id, e)
+
+    _observe_request(state, started)
+    yield "final", {
+        "answer":       state.get("answer") or "No answer generated.",
+        "used_tool":    state.get("tool_name"),
+        "is_from_docs": not state.get("use_tool", False),
+        "error":        state.get("error"),
+        "usage":        usage,
+    }
+
+
+async def arun_workflow_batch(
+    requests: Sequence[Tuple[str, str]],
+    generation_concurrency: int = BATCH_GENERATION_CONCURRENCY,
+    timeout: Optional[float] = REQUEST_TIMEOUT_SECONDS,
+) -> List[WorkflowState]:
+    """
+    Run many (query, user_id) pairs through the workflow, used by POST /ask_batch.
+
+    Runs the graph's node functions directly (see BATCH MODE in the module
+    docstring) instead of one graph invocation per question, so that:
+      - all admitted queries are embedded with ONE provider request
+      - classification and retrieval run concurrently for every question
+      - at most generation_concurrency answers are generated at once
+
+    All questions share one deadline (timeout from now), including the time
+    spent waiting for a generation slot.
+
+    Returns one final state per request, in input order. A failure in one
+    question is recorded in its state ("error") and does not affect the others.
+    """
+    states = [_initial_state(query, user_id, timeout) for query, user_id in requests]
+    logger.info("[WORKFLOW] Starting batch of %s questions", len(states))
+
+    # ── Phase 1: validation + guardrails (cheap, no I/O) ──
+    admitted: List[WorkflowState] = []
+    for state in states:
+        try:
+            state.update(node_validate_user(state))
+            if route_after_validation(state) == "end_with_error":
+                state.update(node_end_with_error(state))
+                continue
+            state.update(node_apply_guardrails(state))
+            if route_after_guardrails(state) == "end_with_guardrail_block":
+                state.update(node_end_with_guardrail_block(state))
+                continue
+        except Exception as e:
+            _failed_state(state, state["user_id"], e)
+            continue
+        admitted.append(state)
+
+    # ── Phase 2: one embedding request for every admitted query ──
+    # A None entry (provider error) makes that question embed on its own later.
+    deadline = states[0]["deadline"] if states else None
+    try:
+        embeddings = await within_deadline(
+            deadline, vector_store.aembed_queries([state["query"] for state in admitted]), "embed_query"
+        )
+    except DeadlineExceeded:
+        embeddings = [None] * len(admitted)
+        for state in admitted:
+            state["deadline_exceeded"] = True
+    for state, embedding in zip(admitted, embeddings):
+        state["query_embedding"] = embedding
+
+    # ── Phase 3: per question, concurrently; generation is bounded ──
+    generation_slots = asyncio.Semaphore(max(1, generation_concurrency))
+
+    async def finish(state: WorkflowState) -> None:
+        started = time.perf_counter()
+        try:
+            state.update(await anode_classify_and_route(state))
+            if route_after_classification(state) == "retrieve_documents":
+                state.update(await anode_retrieve_documents(state))
+                state.update(node_build_context(state))
+            async with generation_slots:
+                state.update(await anode_generate_answer(state))
+            state.update(node_format_response(state))
+        except Exception as e:
+            _failed_state(state, state["user_id"], e)
+        _observe_request(state, started)
+
+    await asyncio.gather(*(finish(state) for state in admitted))
+    return states
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Text of a streamed message chunk (Anthropic streams a list of content blocks)."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return content or ""
+
+
+def _observe_request(state: WorkflowState, started: float) -> None:
+    """Record the workflow duration in rag_request_duration_seconds{route=...}."""
+    if not state.get("is_valid_user"):
+        route = "invalid_user"
+    elif state.get("error") == "guardrail_block":
+        route = "blocked"
+    elif state.get("error") in ("deadline_exceeded", "token_budget_exceeded"):
+        route = state["error"]
+    elif state.get("error"):
+        route = "error"
+    elif state.get("use_tool"):
+        route = state.get("tool_name") or "tool"
+    else:
+        route = "rag"
+    REQUEST_LATENCY.observe(time.perf_counter() - started, route=route)
+
+
+def _initial_state(query: str, user_id: str, timeout: Optional[float] = None) -> WorkflowState:
+    return {
         "query":              query,
         "user_id":            user_id,
+        "deadline":           new_deadline(timeout),
+        "deadline_exceeded":  False,
         "user_role":          None,
         "is_valid_user":      False,
         "passed_guardrails":  False,
         "guardrail_error":    "",
+        "query_embedding":    None,
         "use_tool":           False,
         "tool_name":          None,
         "tool_result":        None,
@@ -449,15 +1018,12 @@ def run_workflow(query: str, user_id: str) -> WorkflowState:
         "answer":             "",
         "citations":          [],
         "error":              None,
+        "retry_after":        None,
     }
 
-    logger.info(f"[WORKFLOW] Starting for user={user_id} | query='{query[:60]}'")
 
-    try:
-        final_state = workflow.invoke(initial_state)
-        return final_state
-    except Exception as e:
-        log_error(user_id, str(e), "workflow_execution")
-        initial_state["answer"] = f"An internal error occurred: {str(e)}"
-        initial_state["error"]  = str(e)
-        return initial_state
+def _failed_state(initial_state: WorkflowState, user_id: str, e: Exception) -> WorkflowState:
+    log_error(user_id, str(e), "workflow_execution")
+    initial_state["answer"] = f"An internal error occurred: {str(e)}"
+    initial_state["error"]  = str(e)
+    return initial_state
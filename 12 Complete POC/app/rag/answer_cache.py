@@ -0,0 +1,149 @@
+"""
+app/rag/answer_cache.py — Full Answer Cache for /ask
+
+[Concept: Response Caching]
+
+────────────────────────────────────────────────────────────────
+WHY CACHE WHOLE ANSWERS?
+────────────────────────────────────────────────────────────────
+Many questions are exact repeats ("how many vacation days?")
+asked by different employees with the same role. Each one paid
+for classification, retrieval and a full generation call to
+produce the same answer.
+
+The answer cache stores the finished response under
+
+  (normalized query, allowed access levels, corpus version, model)
+
+and /ask returns it directly on a hit — no LLM call, no vector
+search. The key makes reuse safe:
+
+  - allowed access levels: an answer built from manager documents
+    is never served to an employee
+  - corpus version: ingestion and deletion bump it, and the whole
+    cache is dropped the first time a new version is seen
+  - model: switching LLM_MODEL does not serve the old model's answers
+
+Entries expire after ANSWER_CACHE_TTL seconds and the least
+recently used entry is evicted beyond ANSWER_CACHE_MAX_ENTRIES.
+Only successful answers are stored (no errors, no guardrail blocks).
+A cache hit skips the guardrails, so the cache is also cleared
+whenever the guardrail rule packs are reloaded.
+
+This complements the semantic retrieval cache (semantic_cache.py):
+that one skips retrieval for paraphrases; this one skips the whole
+pipeline for exact repeats.
+────────────────────────────────────────────────────────────────
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.config import ANSWER_CACHE_TTL, ANSWER_CACHE_MAX_ENTRIES
+from app.observability.logger import logger
+from app.observability.metrics import register_stats
+from app.security.guardrails import guardrail_engine
+
+
+AnswerKey = Tuple[str, Tuple[str, ...], int, str]   # (query, levels, corpus version, model)
+
+
+def normalize_query(query: str) -> str:
+    """Case-, whitespace- and trailing-punctuation-insensitive form of a query."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?.! ").lower()
+
+
+class AnswerCache:
+    """TTL + LRU cache of finished answers, invalidated by corpus version."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidations = 0
+        self._corpus_version: Optional[int] = None
+        # key → (stored_at, response fields); insertion order = LRU order
+        self._entries: "OrderedDict[AnswerKey, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(query: str, allowed_levels: Sequence[str], corpus_version: int, model: str) -> AnswerKey:
+        return normalize_query(query), tuple(sorted(set(allowed_levels))), corpus_version, model
+
+    def _check_version(self, corpus_version: int) -> bool:
+        """
+        Drop everything when a newer corpus version shows up. Returns False for
+        a key from an older version (a request that started before an ingest).
+        Called with self._lock held.
+        """
+        if self._corpus_version is not None and corpus_version < self._corpus_version:
+            return False
+        if self._corpus_version != corpus_version:
+            if self._entries:
+                self.invalidations += 1
+                logger.info(
+                    "[ANSWER_CACHE] Corpus version %s → %s, dropping %s answers",
+                    self._corpus_version, corpus_version, len(self._entries),
+                )
+            self._entries.clear()
+            self._corpus_version = corpus_version
+        return True
+
+    def get(self, key: AnswerKey) -> Optional[Dict]:
+        """Return the stored response fields for key, or None."""
+        with self._lock:
+            entry = self._entries.get(key) if self._check_version(key[2]) else None
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, response = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(response)
+
+    def put(self, key: AnswerKey, response: Dict) -> None:
+        with self._lock:
+            if not self._check_version(key[2]):
+                return   # computed against a corpus that has since changed
+            self._entries[key] = (time.monotonic(), dict(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._entries:
+                logger.info("[ANSWER_CACHE] Dropping %s answers", len(self._entries))
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits":          self.hits,
+            "misses":        self.misses,
+            "hit_rate":      round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries":       len(self._entries),
+            "expired":       self.expired,
+            "invalidations": self.invalidations,
+        }
+
+
+# ──────────────────────────────────────────────
+# Singleton instance
+# ──────────────────────────────────────────────
+
+answer_cache = AnswerCache(ttl_seconds=ANSWER_CACHE_TTL, max_entries=ANSWER_CACHE_MAX_ENTRIES)
+register_stats("rag_answer_cache", answer_cache.stats, counters=("hits", "misses", "expired", "invalidations"))
+guardrail_engine.add_reload_listener(answer_cache.clear)   # new rules may block cached questions
@@ -0,0 +1,178 @@
+"""
+app/rag/context_packer.py — Token-Budget Context Packing
+
+[Concept: Context Window Management]
+
+────────────────────────────────────────────────────────────────
+WHY PACK THE CONTEXT?
+────────────────────────────────────────────────────────────────
+Retrieval returns TOP_K_RESULTS chunks, and sentence window
+expansion grows each one by WINDOW_SIZE neighbors on both sides.
+With the defaults that is up to 12 chunks in every prompt, and
+every prompt token costs money and generation latency.
+
+Two things shrink it without losing information:
+
+  1. OVERLAP STRIPPING
+     The splitter repeats up to CHUNK_OVERLAP characters between
+     consecutive chunks. When neighbors are joined into one window,
+     the repeated text is dropped:
+
+       chunk 4: "...15 vacation days per year. Unused days carry over"
+       chunk 5: "Unused days carry over up to 5 days into..."
+       joined:  "...15 vacation days per year. Unused days carry over up to 5 days into..."
+
+  2. TOKEN BUDGET
+     Sources are added in score order (most relevant first) until
+     CONTEXT_TOKEN_BUDGET tokens are used. The source that crosses
+     the budget is cut at a token boundary; the rest are left out
+     (and are not cited).
+
+Tokens are counted with tiktoken using the encoding of LLM_MODEL.
+Models tiktoken does not know (e.g. Claude) use cl100k_base, which
+is close enough for a budget. If the encoding cannot be loaded,
+tokens are estimated as characters / 4.
+────────────────────────────────────────────────────────────────
+"""
+
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+from app.config import LLM_MODEL, CHUNK_OVERLAP, CONTEXT_TOKEN_BUDGET
+from app.models.schemas import RetrievedChunk
+from app.observability.logger import logger
+
+
+# Shorter suffix/prefix matches between neighbors are treated as coincidence
+MIN_OVERLAP_CHARS = 16
+
+# A source is only cut to fit when at least this many tokens remain
+MIN_TRUNCATED_TOKENS = 32
+
+SOURCE_SEPARATOR = "\n\n---\n\n"
+NO_CONTEXT = "No relevant documents found."
+
+
+# ──────────────────────────────────────────────
+# Token counting
+# ──────────────────────────────────────────────
+
+@lru_cache(maxsize=1)
+def _get_encoding():
+    try:
+        import tiktoken
+        try:
+            return tiktoken.encoding_for_model(LLM_MODEL)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"[CONTEXT] tiktoken encoding unavailable ({e}) — estimating tokens as chars/4")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max_tokens * 4]
+    return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+# ──────────────────────────────────────────────
+# Overlap stripping
+# ──────────────────────────────────────────────
+
+def _overlap_length(previous: str, current: str) -> int:
+    """Length of the longest suffix of previous that is also a prefix of current."""
+    longest = min(len(previous), len(current), CHUNK_OVERLAP)
+    for size in range(longest, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(current[:size]):
+            return size
+    return 0
+
+
+def join_adjacent_chunks(contents: Sequence[str]) -> Tuple[str, int]:
+    """
+    Join consecutive chunks of one document (in chunk_index order),
+    dropping the text each chunk repeats from the one before it.
+
+    Returns (joined text, number of overlapping characters removed).
+    """
+    parts: List[str] = []
+    removed = 0
+    previous = ""
+    for content in contents:
+        overlap = _overlap_length(previous, content) if previous else 0
+        if overlap:
+            # Overlap is a continuation of the previous chunk, not a new paragraph
+            parts[-1] += content[overlap:]
+            removed += overlap
+        else:
+            parts.append(content)
+        previous = content
+    return "\n\n".join(parts), removed
+
+
+# ──────────────────────────────────────────────
+# Packing
+# ──────────────────────────────────────────────
+
+def _format_source(index: int, chunk: RetrievedChunk) -> str:
+    return f"[Source {index}] {chunk.title} ({chunk.department} Department):\n{chunk.content}"
+
+
+def format_context(chunks: Sequence[RetrievedChunk]) -> str:
+    """Label each chunk with its source document and join them."""
+    if not chunks:
+        return NO_CONTEXT
+    return SOURCE_SEPARATOR.join(_format_source(i, chunk) for i, chunk in enumerate(chunks, 1))
+
+
+def pack_chunks(
+    chunks: Sequence[RetrievedChunk],
+    budget: int = CONTEXT_TOKEN_BUDGET,
+) -> List[RetrievedChunk]:
+    """
+    Keep chunks in score order until the formatted context reaches budget tokens.
+
+    The chunk that crosses the budget is truncated (if enough room is left);
+    chunks after it are dropped. budget <= 0 disables the limit.
+    """
+    if budget <= 0 or not chunks:
+        return list(chunks)
+
+    ordered = sorted(chunks, key=lambda c: c.score, reverse=True)
+    separator_tokens = count_tokens(SOURCE_SEPARATOR)
+    costs = [count_tokens(_format_source(i, chunk)) for i, chunk in enumerate(ordered, 1)]
+    total = sum(costs) + separator_tokens * (len(ordered) - 1)
+
+    packed: List[RetrievedChunk] = []
+    used = 0
+    for chunk, cost in zip(ordered, costs):
+        if packed:
+            cost += separator_tokens
+        if used + cost <= budget:
+            packed.append(chunk)
+            used += cost
+            continue
+
+        # Cut this source to what is left after its header (and separator)
+        overhead = cost - count_tokens(chunk.content)
+        remaining = budget - used - overhead
+        if remaining >= MIN_TRUNCATED_TOKENS:
+            packed.append(chunk.model_copy(update={"content": truncate_to_tokens(chunk.content, remaining)}))
+            used += overhead + remaining
+        break
+
+    if len(packed) < len(ordered) or used < total:
+        logger.info(
+            "[CONTEXT] Packed %s/%s sources into ~%s tokens (budget=%s) — saved ~%s tokens",
+            len(packed), len(ordered), used, budget, total - used,
+        )
+    return packed
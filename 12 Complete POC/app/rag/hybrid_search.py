@@ -0,0 +1,104 @@
+"""
+app/rag/hybrid_search.py — Hybrid BM25 + Vector Retrieval
+
+[Concept: Reciprocal Rank Fusion]
+
+────────────────────────────────────────────────────────────────
+HOW THE TWO RANKINGS ARE COMBINED
+────────────────────────────────────────────────────────────────
+The vector leg (ChromaDB / flat index) and the keyword leg (BM25,
+see vector_store/keyword_index.py) each return a ranked list of
+candidate chunks. Their raw scores live on different scales — a
+cosine-style relevance in [0, 1] vs an unbounded BM25 sum — so
+they cannot simply be added.
+
+Reciprocal Rank Fusion (RRF) ignores the raw scores and uses only
+each chunk's RANK in each list:
+
+  rrf(chunk) = Σ over lists  1 / (RRF_K + rank_in_list)
+
+  Chunk ranked #1 by vectors, #3 by BM25  → 1/61 + 1/63 = 0.0323
+  Chunk ranked #2 by vectors, absent BM25 → 1/62        = 0.0161
+  Chunk absent vectors, #1 by BM25        → 1/61        = 0.0164
+
+A chunk that BOTH legs like rises to the top; a chunk only one leg
+finds still competes. RRF_K=60 is the value from the original paper
+and damps the influence of any single list's top positions.
+
+Both legs apply the caller's allowed access levels themselves, so
+fusion never sees a chunk the user may not read.
+
+The returned 'score' of each chunk is still its VECTOR relevance
+score (keyword-only hits are scored from their stored embeddings),
+so citation thresholds and logs mean the same thing as before.
+────────────────────────────────────────────────────────────────
+"""
+
+from typing import Any, Dict, List, Sequence, Tuple
+
+from app.config import HYBRID_CANDIDATES, RRF_K
+from app.vector_store.chroma_store import vector_store, chunk_id
+from app.observability.logger import logger
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """Fuse ranked id lists into one (id, rrf score) list, best first."""
+    fused: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, 1):
+            fused[item_id] = fused.get(item_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: item[1], reverse=True)
+
+
+def hybrid_search(
+    query: str,
+    query_embedding: List[float],
+    allowed_access_levels: List[str],
+    k: int,
+) -> List[Dict[str, Any]]:
+    """
+    Permission-filtered hybrid search. Same result shape as
+    VectorStore.similarity_search: dicts with 'content', 'metadata', 'score'.
+    """
+    if not allowed_access_levels:
+        return []
+
+    candidates = max(k, HYBRID_CANDIDATES)
+
+    # Leg 1: vector similarity (access-level WHERE filter / mask)
+    vector_results = vector_store.similarity_search_by_vector(
+        query_embedding, allowed_access_levels, candidates
+    )
+    by_id: Dict[str, Dict[str, Any]] = {
+        chunk_id(r["metadata"].get("doc_id"), r["metadata"].get("chunk_index", 0)): r
+        for r in vector_results
+    }
+
+    # Leg 2: BM25 keyword match (disallowed postings skipped while scoring)
+    keyword_hits = vector_store.keyword_search(query, allowed_access_levels, candidates)
+
+    fused = reciprocal_rank_fusion([list(by_id), [cid for cid, _ in keyword_hits]])
+    top_ids = [cid for cid, _ in fused[:k]]
+
+    # Chunks only the keyword leg found: one batched fetch for content + vector score
+    keyword_only = [cid for cid in top_ids if cid not in by_id]
+    by_id.update(vector_store.get_scored_chunks(keyword_only, query_embedding, allowed_access_levels))
+
+    results: List[Dict[str, Any]] = []
+    seen = set()
+    for cid in top_ids:
+        result = by_id.get(cid)
+        if result is None:
+            continue
+        # Legacy random-ID chunks can surface under two keys — keep one per position
+        position = (result["metadata"].get("doc_id"), result["metadata"].get("chunk_index", 0))
+        if position in seen:
+            continue
+        seen.add(position)
+        results.append(result)
+
+    logger.debug(
+        "[HYBRID] vector=%s keyword=%s fused_top=%s keyword_only=%s",
+        len(vector_results), len(keyword_hits), len(results), len(keyword_only),
+    )
+    return results
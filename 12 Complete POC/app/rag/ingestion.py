@@ -34,18 +34,20 @@ But the REAL reason we chunk is different:
 
 The ingestion pipeline:
   Raw text/PDF → Load → Split into chunks → Embed → Store in ChromaDB
+  (files are streamed page by page and stored in batches — see ingest_file)
 ────────────────────────────────────────────────────────────────
 """
 
 import uuid
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
 from langchain_community.document_loaders import TextLoader, PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
-from app.config import CHUNK_SIZE, CHUNK_OVERLAP
+from app.config import CHUNK_SIZE, CHUNK_OVERLAP, INGEST_BATCH_SIZE
 from app.models.schemas import AccessLevel
-from app.vector_store.chroma_store import vector_store
+from app.vector_store.catalog import document_catalog
+from app.vector_store.chroma_store import vector_store, chunk_id, content_hash
 from app.observability.logger import logger
 
 
@@ -95,8 +97,9 @@ def ingest_text_content(
     Pipeline:
       1. Wrap text in a LangChain Document object
       2. Split into chunks using RecursiveCharacterTextSplitter
-      3. Attach metadata to each chunk (doc_id, title, etc.)
-      4. Embed and store all chunks in ChromaDB
+      3. Attach metadata to each chunk (doc_id, title, content_hash, etc.)
+      4. Embed and store the chunks in ChromaDB — when doc_id already
+         exists, only new/changed chunks are embedded (see IncrementalWriter)
 
     The metadata stored with each chunk is critical because:
       - It allows us to filter by access_level during search
@@ -108,16 +111,18 @@ def ingest_text_content(
         title:        Human-readable document title
         department:   Owning department (HR, Finance, IT...)
         access_level: Who can access this document
-        doc_id:       Optional — auto-generated if not provided
+        doc_id:       Optional — auto-generated if not provided. Pass an
+                      existing doc_id to update that document in place.
 
     Returns:
-        dict with doc_id, chunk_count, and status message
+        dict with doc_id, chunks_created, diff (added / reused / renumbered /
+        removed / embedded chunk counts) and status message
     """
     if doc_id is None:
         # Generate a unique ID for this document
         doc_id = f"doc_{uuid.uuid4().hex[:8]}"
 
-    logger.info(f"[INGESTION] Starting ingestion: title='{title}' doc_id={doc_id}")
+    logger.info("[INGESTION] Starting ingestion: title='%s' doc_id=%s", title, doc_id)
 
     # Step 1: Create a LangChain Document
     source_doc = Document(
@@ -135,24 +140,39 @@ def ingest_text_content(
     splitter = get_text_splitter()
     chunks = splitter.split_documents([source_doc])
 
-    logger.info(f"[INGESTION] Split into {len(chunks)} chunks (chunk_size={CHUNK_SIZE}, overlap={CHUNK_OVERLAP})")
-
-    # Step 3: Add chunk index to metadata
-    # This helps us display chunks in order and debug retrieval
-    for i, chunk in enumerate(chunks):
-        chunk.metadata["chunk_index"] = i
-        chunk.metadata["total_chunks"] = len(chunks)
-
-    # Step 4: Embed and store in ChromaDB
-    # The vector_store handles embedding generation and persistence
-    ids = vector_store.add_documents(chunks)
+    logger.info("[INGESTION] Split into %s chunks (chunk_size=%s, overlap=%s)", len(chunks), CHUNK_SIZE, CHUNK_OVERLAP)
+
+    # Steps 3-4: Attach chunk_index / content_hash, embed and store in ChromaDB.
+    # The writer embeds only chunks whose text is not already stored under
+    # this doc_id (an update of an existing document reuses the rest) and
+    # the vector_store adds them to the BM25 keyword index and bumps the
+    # corpus version (which invalidates cached retrieval results).
+    # IDs are deterministic ("{doc_id}:{chunk_index}") so the retriever can
+    # fetch a chunk's neighbors by ID without a metadata scan.
+    writer = IncrementalWriter(doc_id, dict(source_doc.metadata, total_chunks=len(chunks)))
+    texts = [chunk.page_content for chunk in chunks]
+    for start in range(0, len(texts), INGEST_BATCH_SIZE):
+        writer.write(texts[start:start + INGEST_BATCH_SIZE])
+    diff = writer.finish()
+
+    # Step 5: Record the document in the catalog (one row, one transaction)
+    # so GET /documents never has to scan chunk metadata
+    document_catalog.upsert_document(
+        doc_id=doc_id,
+        title=title,
+        department=department,
+        access_level=access_level.value,
+        chunk_count=writer.count,
+        source="text_input",
+    )
 
-    logger.info(f"[INGESTION] Successfully stored {len(ids)} chunks for doc_id={doc_id}")
+    logger.info("[INGESTION] Successfully stored %s chunks for doc_id=%s | diff=%s", writer.count, doc_id, diff)
 
     return {
         "doc_id":        doc_id,
         "title":         title,
         "chunks_created": len(chunks),
+        "diff":          diff,
         "message":       f"Successfully ingested '{title}' as {len(chunks)} chunks."
     }
 
@@ -169,27 +189,232 @@ def ingest_file(
 
     Uses LangChain document loaders which handle format-specific
     parsing (PDF page extraction, text encoding, etc.)
+
+    ────────────────────────────────────────────────────────────────
+    STREAMING INGESTION (bounded memory)
+    ────────────────────────────────────────────────────────────────
+    A 2,000-page manual must not be held in RAM as one string, split
+    in one go and embedded in one giant request. Instead:
+
+      lazy_load()         → one page at a time
+      incremental split   → only the unfinished tail of the previous
+                            page is carried over into the next one
+      batched embed/store → every INGEST_BATCH_SIZE chunks are
+                            embedded and upserted, then released
+
+    Peak memory is ~ one page + one batch, whatever the document size.
+    chunk_index is a running counter, so indices stay contiguous across
+    page boundaries (neighbor expansion relies on that). total_chunks is
+    not known until the last page, so it is recorded in the document
+    catalog rather than on every chunk.
+    ────────────────────────────────────────────────────────────────
     """
     if doc_id is None:
         doc_id = f"doc_{uuid.uuid4().hex[:8]}"
 
-    logger.info(f"[INGESTION] Loading file: {file_path}")
+    logger.info("[INGESTION] Loading file: %s", file_path)
+
+    base_metadata = {
+        "doc_id":       doc_id,
+        "title":        title,
+        "department":   department,
+        "access_level": access_level.value,
+        "source":       file_path,
+    }
+
+    writer = IncrementalWriter(doc_id, base_metadata)
+    batch: List[str] = []
+
+    for text in split_file(file_path):
+        batch.append(text)
+        if len(batch) >= INGEST_BATCH_SIZE:
+            writer.write(batch)
+            batch = []
+    writer.write(batch)
+    diff = writer.finish()
+    chunk_count = writer.count
+
+    logger.info(
+        "[INGESTION] Streamed %s chunks for doc_id=%s (batch_size=%s) | diff=%s",
+        chunk_count, doc_id, INGEST_BATCH_SIZE, diff,
+    )
+
+    document_catalog.upsert_document(
+        doc_id=doc_id,
+        title=title,
+        department=department,
+        access_level=access_level.value,
+        chunk_count=chunk_count,
+        source=file_path,
+    )
+
+    return {
+        "doc_id":         doc_id,
+        "title":          title,
+        "chunks_created": chunk_count,
+        "diff":           diff,
+        "message":        f"Successfully ingested '{title}' as {chunk_count} chunks."
+    }
 
+
+# ──────────────────────────────────────────────
+# Incremental Chunk Writer
+# ──────────────────────────────────────────────
+
+class PlannedBatch(NamedTuple):
+    start:   int                      # chunk_index of the first text
+    ids:     List[str]
+    texts:   List[str]
+    hashes:  List[str]
+    reused:  Dict[str, List[float]]   # hash → stored embedding
+    missing: List[str]                # distinct texts that still need embedding
+
+class IncrementalWriter:
+    """
+    Writes one document's chunks in order, reusing stored embeddings.
+
+    ────────────────────────────────────────────────────────────────
+    INCREMENTAL RE-INGESTION
+    ────────────────────────────────────────────────────────────────
+    Every chunk carries content_hash = sha256(text) in its metadata.
+    When a document is ingested again under the same doc_id:
+
+      1. The hashes of its currently stored chunks are read (metadata only)
+      2. A new chunk whose text is already stored reuses that chunk's
+         embedding — only NEW or CHANGED text is sent to the provider
+      3. Chunks are written at chunk_id(doc_id, i): chunk_index is
+         renumbered in place, so an inserted paragraph just shifts IDs
+      4. Stored chunks that were not rewritten are deleted
+
+    A typical policy edit touches a few paragraphs, so almost every
+    chunk's embedding is reused.
+    ────────────────────────────────────────────────────────────────
+    """
+
+    def __init__(self, doc_id: str, base_metadata: dict):
+        self.doc_id = doc_id
+        self.base_metadata = base_metadata
+        self.count = 0
+
+        self._old_hashes = vector_store.get_chunk_hashes(doc_id)   # id → hash
+        self._old_id_of: Dict[str, str] = {}                          # hash → id
+        for cid, h in self._old_hashes.items():
+            self._old_id_of.setdefault(h, cid)
+        self._written: Set[str] = set()
+        # hash → embedding of stored chunks fetched but not yet reused; lets a
+        # later batch reuse a chunk that an earlier batch overwrote (shifted text)
+        self._stash: Dict[str, List[float]] = {}
+
+        self.diff = {"added": 0, "reused": 0, "renumbered": 0, "removed": 0, "embedded": 0}
+
+    def write(self, texts: List[str]) -> None:
+        """Store the next batch of chunk texts (chunk_index continues from the last batch)."""
+        batch = self.plan(texts)
+        if batch is None:
+            return
+        vectors = vector_store.embeddings.embed_documents(batch.missing) if batch.missing else []
+        self.store(batch, vectors)
+
+    def plan(self, texts: List[str]) -> Optional["PlannedBatch"]:
+        """
+        First half of write(): assign the next chunk IDs and collect the stored
+        embeddings the batch can reuse. The caller embeds batch.missing and
+        passes the vectors to store(). Batches may be planned ahead of storing
+        earlier ones (bulk_ingest.py embeds several batches at once).
+        """
+        if not texts:
+            return None
+
+        ids    = [chunk_id(self.doc_id, self.count + i) for i in range(len(texts))]
+        hashes = [content_hash(t) for t in texts]
+
+        # One fetch for (a) stored chunks with the same text and (b) stored
+        # chunks this batch is about to overwrite. Fetched text is re-hashed
+        # because an earlier batch of this update may have overwritten the ID.
+        fetch_ids = {self._old_id_of[h] for h in hashes if h in self._old_id_of and h not in self._stash}
+        fetch_ids.update(cid for cid in ids if cid in self._old_hashes and cid not in self._written)
+        for chunk in vector_store.get_chunks(list(fetch_ids)).values():
+            self._stash[content_hash(chunk["content"])] = chunk["embedding"]
+
+        reused: Dict[str, List[float]] = {h: self._stash.pop(h) for h in set(hashes) if h in self._stash}
+        # Bound the stash: text shifted by more than a few batches is re-embedded
+        while len(self._stash) > 4 * INGEST_BATCH_SIZE:
+            self._stash.pop(next(iter(self._stash)))
+
+        missing = list(dict.fromkeys(t for t, h in zip(texts, hashes) if h not in reused))
+        batch = PlannedBatch(self.count, ids, texts, hashes, reused, missing)
+        self.count += len(texts)
+        return batch
+
+    def store(self, batch: "PlannedBatch", missing_vectors: List[List[float]]) -> None:
+        """Second half of write(): upsert the batch with reused + new embeddings."""
+        vectors = dict(batch.reused)
+        for text, vector in zip(batch.missing, missing_vectors):
+            vectors.setdefault(content_hash(text), vector)
+        self.diff["embedded"] += len(batch.missing)
+
+        missing_hashes = {content_hash(t) for t in batch.missing}
+        for cid, h in zip(batch.ids, batch.hashes):
+            if h in missing_hashes:
+                self.diff["added"] += 1
+            else:
+                self.diff["reused"] += 1
+                if self._old_id_of.get(h) != cid:
+                    self.diff["renumbered"] += 1
+
+        metadatas = [
+            dict(self.base_metadata, chunk_index=batch.start + i, content_hash=h)
+            for i, h in enumerate(batch.hashes)
+        ]
+        vector_store.upsert_embedded(batch.ids, batch.texts, [vectors[h] for h in batch.hashes], metadatas)
+        self._written.update(batch.ids)
+
+    def finish(self) -> Dict[str, int]:
+        """
+        Delete stored chunks that were not rewritten; return the diff summary.
+        Call only after every planned batch has been stored.
+        """
+        stale = [cid for cid in self._old_hashes if cid not in self._written]
+        self.diff["removed"] = vector_store.delete_chunks(stale)
+        return dict(self.diff)
+
+
+def split_file(file_path: str) -> Iterator[str]:
+    """
+    Stream a TXT or PDF file's chunk texts, page by page.
+    Shared by ingest_file and the bulk ingestion CLI (bulk_ingest.py).
+    """
     # Select loader based on file extension
     if file_path.lower().endswith(".pdf"):
         loader = PyPDFLoader(file_path)
     else:
         loader = TextLoader(file_path, encoding="utf-8")
 
-    raw_docs = loader.load()
+    return _split_pages_incrementally(page.page_content for page in loader.lazy_load())
 
-    # Combine pages into a single text for consistent chunking
-    full_text = "\n\n".join([doc.page_content for doc in raw_docs])
 
-    return ingest_text_content(
-        content=full_text,
-        title=title,
-        department=department,
-        access_level=access_level,
-        doc_id=doc_id,
-    )
+def _split_pages_incrementally(pages: Iterable[str]) -> Iterator[str]:
+    """
+    Split a stream of pages into chunks without materializing the document.
+
+    Pages are joined with a paragraph break (as the one-shot path did).
+    After each page, every chunk except the LAST is final; the last one may
+    continue on the next page, so it is carried over and re-split together
+    with that page. The splitter's overlap is preserved because the carried
+    piece already begins with the overlap of the chunk before it.
+    """
+    splitter = get_text_splitter()
+    carry = ""
+
+    for page in pages:
+        if not page.strip():
+            continue
+        text = f"{carry}\n\n{page}" if carry else page
+        pieces = splitter.split_text(text)
+        if not pieces:
+            continue
+        yield from pieces[:-1]
+        carry = pieces[-1]
+
+    if carry:
+        yield carry
@@ -31,16 +31,28 @@ The system prompt enforces this by saying:
 ────────────────────────────────────────────────────────────────
 """
 
+import asyncio
 from typing import List, Tuple, Optional, NamedTuple
 from langchain_core.messages import SystemMessage, HumanMessage
 
-from app.config import ANTHROPIC_API_KEY, OPENAI_API_KEY, LLM_MODEL, LLM_PROVIDER, TOP_K_RESULTS, WINDOW_SIZE
+from app.config import (
+    LLM_MODEL, TOP_K_RESULTS, WINDOW_SIZE,
+    SEMANTIC_CACHE_ENABLED, SEMANTIC_CACHE_THRESHOLD, SEMANTIC_CACHE_MAX_ENTRIES,
+    HYBRID_SEARCH_ENABLED,
+)
+from app.llm.client_registry import get_chat_model
 from app.models.schemas import UserRole, RetrievedChunk, Citation
+from app.rag.context_packer import count_tokens, format_context, join_adjacent_chunks, pack_chunks
+from app.rag.hybrid_search import hybrid_search
+from app.rag.semantic_cache import SemanticRetrievalCache
 from app.security.permissions import get_allowed_access_levels
 from app.vector_store.chroma_store import vector_store
+from app.vector_store.corpus_version import get_corpus_version
 from app.observability.logger import (
     log_retrieval, log_llm_call, log_workflow_step, logger
 )
+from app.observability.metrics import register_stats
+from app.observability.tracing import set_span_attributes
 
 
 # ──────────────────────────────────────────────
@@ -66,66 +78,179 @@ class _IndexedChunk(NamedTuple):
 
 def get_llm():
     """
-    Return a configured LLM instance based on LLM_PROVIDER setting.
+    Return the shared LLM instance for answer generation.
 
     LLM_PROVIDER=openai    → ChatOpenAI  (only OPENAI_API_KEY needed)
     LLM_PROVIDER=anthropic → ChatAnthropic (ANTHROPIC_API_KEY needed)
+
+    The instance comes from the client registry, so repeated calls reuse
+    one model object and its pooled keep-alive connections.
     """
-    if LLM_PROVIDER == "anthropic":
-        from langchain_anthropic import ChatAnthropic
-        return ChatAnthropic(
-            model=LLM_MODEL,
-            anthropic_api_key=ANTHROPIC_API_KEY,
-            temperature=0,
-            max_tokens=1024,
-        )
-    else:  # default: openai
-        from langchain_openai import ChatOpenAI
-        return ChatOpenAI(
-            model=LLM_MODEL,
-            openai_api_key=OPENAI_API_KEY,
-            temperature=0,
-            max_tokens=1024,
-        )
+    return get_chat_model(max_tokens=1024)
 
 
 # ──────────────────────────────────────────────
 # Retrieval
 # ──────────────────────────────────────────────
 
+retrieval_cache = SemanticRetrievalCache(
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+)
+register_stats("rag_semantic_cache", retrieval_cache.stats)
+
+
 def retrieve_documents(
     query: str,
     user_role: UserRole,
     user_id: str,
     k: int = TOP_K_RESULTS,
+    query_embedding: Optional[List[float]] = None,
 ) -> List[RetrievedChunk]:
     """
     Retrieve the most relevant document chunks for a query,
     filtered to only include documents the user is allowed to see.
 
     Step 1: Determine which access levels the user can see
-    Step 2: Query ChromaDB with permission filter + semantic similarity
-    Step 3: Return structured RetrievedChunk objects
+    Step 2: Embed the query once (or reuse query_embedding, already computed
+            for routing); serve a semantic cache hit if one exists
+    Step 3: Search with permission filter — vector similarity, fused with
+            BM25 keyword ranking when HYBRID_SEARCH_ENABLED
+    Step 4: Return structured RetrievedChunk objects (window-expanded)
     """
-    log_workflow_step("retrieve_documents", user_id, f"query='{query[:60]}'")
+    log_workflow_step("retrieve_documents", user_id, "query='%.60s'", query)
 
     # Step 1: Permission-aware access level list
-    # e.g., employee → ["public"]
-    # e.g., manager  → ["public", "manager"]
+    allowed_levels = _resolve_allowed_levels(user_role, user_id)
+    if not allowed_levels:
+        return _finalize_retrieval([], allowed_levels, user_id, query)
+
+    # Step 2: One embedding serves routing, the cache lookup and the search
+    if query_embedding is None:
+        query_embedding = vector_store.embed_query(query)
+    if query_embedding is None:
+        return _finalize_retrieval([], allowed_levels, user_id, query)
+
+    corpus_version = get_corpus_version()
+    cached = _cache_lookup(query_embedding, allowed_levels, k, corpus_version, user_id, query)
+    if cached is not None:
+        return cached
+
+    # Step 3: Similarity (+ keyword) search with permission filter
+    raw_results = _search(query, query_embedding, allowed_levels, k)
+
+    # Step 4: typed chunks + sentence window expansion
+    chunks = _finalize_retrieval(raw_results, allowed_levels, user_id, query)
+    _cache_store(query_embedding, allowed_levels, k, corpus_version, chunks)
+    return chunks
+
+
+async def aretrieve_documents(
+    query: str,
+    user_role: UserRole,
+    user_id: str,
+    k: int = TOP_K_RESULTS,
+    query_embedding: Optional[List[float]] = None,
+) -> List[RetrievedChunk]:
+    """
+    Async variant of retrieve_documents used by the non-blocking /ask path.
+
+    The query embedding is awaited; ChromaDB lookups (search and neighbor
+    fetches) are local blocking calls, so they run in a worker thread.
+    """
+    log_workflow_step("retrieve_documents", user_id, "query='%.60s'", query)
+
+    allowed_levels = _resolve_allowed_levels(user_role, user_id)
+    if not allowed_levels:
+        return _finalize_retrieval([], allowed_levels, user_id, query)
+
+    if query_embedding is None:
+        query_embedding = await vector_store.aembed_query(query)
+    if query_embedding is None:
+        return _finalize_retrieval([], allowed_levels, user_id, query)
+
+    corpus_version = await asyncio.to_thread(get_corpus_version)
+    cached = _cache_lookup(query_embedding, allowed_levels, k, corpus_version, user_id, query)
+    if cached is not None:
+        return cached
+
+    def _search_and_finalize() -> List[RetrievedChunk]:
+        raw_results = _search(query, query_embedding, allowed_levels, k)
+        return _finalize_retrieval(raw_results, allowed_levels, user_id, query)
+
+    chunks = await asyncio.to_thread(_search_and_finalize)
+    _cache_store(query_embedding, allowed_levels, k, corpus_version, chunks)
+    return chunks
+
+
+def _search(
+    query: str,
+    query_embedding: List[float],
+    allowed_levels: List[str],
+    k: int,
+) -> List[dict]:
+    """Vector-only or hybrid (BM25 + vector, RRF-fused) search, per HYBRID_SEARCH_ENABLED."""
+    if HYBRID_SEARCH_ENABLED:
+        return hybrid_search(query, query_embedding, allowed_levels, k)
+    return vector_store.similarity_search_by_vector(query_embedding, allowed_levels, k)
+
+
+def _cache_lookup(
+    query_embedding: List[float],
+    allowed_levels: List[str],
+    k: int,
+    corpus_version: int,
+    user_id: str,
+    query: str,
+) -> Optional[List[RetrievedChunk]]:
+    """Return cached (already window-expanded) chunks for a near-duplicate query."""
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+
+    hit = retrieval_cache.lookup(query_embedding, allowed_levels, k, corpus_version)
+    set_span_attributes({"rag.retrieval_cache_hit": hit is not None})
+    if hit is None:
+        return None
+
+    chunks, similarity = hit
+    logger.info("[RETRIEVER] Semantic cache hit (similarity=%.4f) — search skipped", similarity)
+    log_retrieval(user_id, query, len(chunks), [c.score for c in chunks])
+    return chunks
+
+
+def _cache_store(
+    query_embedding: List[float],
+    allowed_levels: List[str],
+    k: int,
+    corpus_version: int,
+    chunks: List[RetrievedChunk],
+) -> None:
+    if SEMANTIC_CACHE_ENABLED:
+        retrieval_cache.store(query_embedding, allowed_levels, k, corpus_version, chunks)
+
+
+def _resolve_allowed_levels(user_role: UserRole, user_id: str) -> List[str]:
+    """
+    Permission-aware access level list.
+    e.g., employee → ["public"]
+    e.g., manager  → ["public", "manager"]
+    """
     allowed_levels = get_allowed_access_levels(user_role)
 
     log_workflow_step(
         "permission_filter", user_id,
-        f"role={user_role.value} | allowed_levels={allowed_levels}"
+        "role=%s | allowed_levels=%s", user_role.value, allowed_levels,
     )
+    return allowed_levels
 
-    # Step 2: Vector similarity search with permission filter
-    raw_results = vector_store.similarity_search(
-        query=query,
-        allowed_access_levels=allowed_levels,
-        k=k,
-    )
 
+def _finalize_retrieval(
+    raw_results: List[dict],
+    allowed_levels: List[str],
+    user_id: str,
+    query: str,
+) -> List[RetrievedChunk]:
+    """Shared tail of the sync and async retrieval paths (Steps 3 and 4)."""
     # Step 3: Convert to typed objects, preserving chunk_index for window expansion
     chunks:  List[RetrievedChunk] = []
     indexed: List[_IndexedChunk]  = []
@@ -185,14 +310,16 @@ def expand_chunks_with_window(
     Algorithm:
       1. Sort matched chunks by (doc_id, chunk_index)
       2. Greedy merge: extend current group while same doc and gap ≤ 2*W
-      3. For each group: fetch full index range from ChromaDB, join content
-      4. Score = highest score in the group (anchor chunk)
+      3. Fetch every group's full index range in ONE batched ID lookup
+         (chunk IDs are "{doc_id}:{chunk_index}", see chunk_id())
+      4. For each group: join content, dropping the CHUNK_OVERLAP text
+         repeated between neighbors; score = highest score in the group
       5. Sort output by score descending
     ────────────────────────────────────────────────────────────────
 
     Args:
         indexed_chunks: _IndexedChunk list from retrieve_documents Step 3
-        allowed_levels: Permission filter passed through to fetch_neighbors
+        allowed_levels: Permission filter re-checked on every fetched chunk
         window_size:    Neighbors on each side to include (from WINDOW_SIZE)
 
     Returns:
@@ -224,36 +351,49 @@ def expand_chunks_with_window(
         else:
             groups.append([item])
 
-    # Step 3: For each group, fetch expanded content and build one RetrievedChunk
-    expanded: List[RetrievedChunk] = []
-
+    # Step 3: Compute every group's index range, then fetch ALL of them in a
+    # single batched ID lookup (one ChromaDB round trip for the whole query)
+    windows = []
     for group in groups:
-        # Anchor = highest-scoring matched chunk in this group
-        anchor_item = max(group, key=lambda ic: ic.chunk.score)
-        anchor      = anchor_item.chunk
-
         # Full index range: span of all group members ± window_size
         min_idx = min(ic.chunk_index for ic in group)
         max_idx = max(ic.chunk_index for ic in group)
         start   = max(0, min_idx - window_size)   # clamp: no negative indices
-        end     = max_idx + window_size            # ChromaDB handles past-end gracefully
+        end     = max_idx + window_size            # missing past-end IDs are skipped
+        windows.append((group[0].chunk.doc_id, start, end))
 
-        # Fetch neighbors: direct metadata lookup, not semantic search
-        neighbors = vector_store.fetch_neighbors(
-            doc_id=anchor.doc_id,
-            start_index=start,
-            end_index=end,
-            allowed_access_levels=allowed_levels,
-        )
+    fetched = vector_store.fetch_neighbor_windows(windows, allowed_levels)
+
+    # Step 4: Build one RetrievedChunk per group
+    expanded: List[RetrievedChunk] = []
+    overlap_chars = 0
+
+    for group, window in zip(groups, windows):
+        # Anchor = highest-scoring matched chunk in this group
+        anchor_item = max(group, key=lambda ic: ic.chunk.score)
+        anchor      = anchor_item.chunk
+        _, start, end = window
+
+        neighbors = fetched.get(window, [])
+        if not neighbors:
+            # Documents ingested before deterministic chunk IDs are not
+            # addressable by ID — fall back to the metadata-filter lookup
+            neighbors = vector_store.fetch_neighbors(
+                doc_id=anchor.doc_id,
+                start_index=start,
+                end_index=end,
+                allowed_access_levels=allowed_levels,
+            )
 
         if neighbors:
-            # Join in document order (already sorted by chunk_index in fetch_neighbors)
-            expanded_content = "\n\n".join(content for _, content in neighbors)
+            # Join in document order (sorted by chunk_index by the fetch)
+            expanded_content, removed = join_adjacent_chunks([content for _, content in neighbors])
+            overlap_chars += removed
         else:
             # Fallback: use original matched content if neighbor fetch failed
             expanded_content = anchor.content
             logger.warning(
-                f"[RETRIEVER] fetch_neighbors returned empty for "
+                f"[RETRIEVER] neighbor fetch returned empty for "
                 f"doc_id={anchor.doc_id} range=[{start},{end}] — using original chunk"
             )
 
@@ -266,7 +406,10 @@ def expand_chunks_with_window(
             score=anchor.score,   # score of the anchor, not the neighbors
         ))
 
-    # Step 4: Re-sort by score descending (most relevant expanded block first)
+    if overlap_chars:
+        logger.debug("[CONTEXT] Stripped %s overlapping chars from %s windows", overlap_chars, len(groups))
+
+    # Step 5: Re-sort by score descending (most relevant expanded block first)
     expanded.sort(key=lambda c: c.score, reverse=True)
     return expanded
 
@@ -281,6 +424,8 @@ def build_context(chunks: List[RetrievedChunk]) -> str:
 
     Each chunk is labeled with its source document so the LLM can
     attribute information to specific documents (enabling citations).
+    Pass the chunks through pack_context_chunks first to respect
+    CONTEXT_TOKEN_BUDGET.
 
     Example output:
         [Source 1] HR Handbook (HR Department):
@@ -289,17 +434,15 @@ def build_context(chunks: List[RetrievedChunk]) -> str:
         [Source 2] Vacation Policy 2024 (HR Department):
         Vacation days accrue at 1.25 days per month...
     """
-    if not chunks:
-        return "No relevant documents found."
-
-    context_parts = []
-    for i, chunk in enumerate(chunks, 1):
-        context_parts.append(
-            f"[Source {i}] {chunk.title} ({chunk.department} Department):\n"
-            f"{chunk.content}"
-        )
+    return format_context(chunks)
 
-    return "\n\n---\n\n".join(context_parts)
+
+def pack_context_chunks(chunks: List[RetrievedChunk]) -> List[RetrievedChunk]:
+    """
+    The chunks that fit in CONTEXT_TOKEN_BUDGET tokens, most relevant first
+    (see context_packer.py). Dropped chunks are also left out of the citations.
+    """
+    return pack_chunks(chunks)
 
 
 # ──────────────────────────────────────────────
@@ -328,12 +471,15 @@ def generate_rag_answer(
     query: str,
     chunks: List[RetrievedChunk],
     user_id: str,
-) -> Tuple[str, List[Citation]]:
+    context: Optional[str] = None,
+    prompt_tokens: Optional[int] = None,
+) -> Tuple[str, List[Citation], int]:
     """
     Generate a grounded answer using RAG.
 
     Pipeline:
-      1. Build context string from retrieved chunks
+      1. Pack the chunks into the token budget and build the context string
+         (skipped when the build_context node already did: pass context)
       2. Construct the prompt: system rules + context + user question
       3. Call the LLM
       4. Extract citations from the retrieved chunks
@@ -341,39 +487,117 @@ def generate_rag_answer(
     The system prompt enforces "answer only from context" — this
     is the guardrail against hallucination.
 
+    prompt_tokens, when the caller already counted the prompt (to reserve
+    the token budget), is reused for the LLM_CALL log line.
+
     Returns:
-        (answer_text, list_of_citations)
+        (answer_text, list_of_citations, tokens_used)
+        tokens_used is prompt + completion tokens as reported by the LLM
+        (counted locally if the provider does not report usage).
     """
     log_workflow_step("generate_rag_answer", user_id)
 
-    # Step 1: Build context
-    context = build_context(chunks)
+    # Steps 1-2: Build context and prompt
+    if context is None:
+        chunks = pack_context_chunks(chunks)
+    messages = _build_rag_messages(query, chunks, user_id, context, prompt_tokens)
 
-    # Step 2: Construct the user message (context + question)
-    user_message = f"""Here are the relevant documents from our knowledge base:
+    # Step 3: Call LLM
+    llm = get_llm()
+    response = llm.invoke(messages)
+    answer = response.content
 
-{context}
+    # Step 4: Build citations from retrieved chunks
+    citations = build_citations(chunks)
 
----
+    logger.info("[RAG] Generated answer (%s chars) with %s citations", len(answer), len(citations))
 
-Question: {query}
+    return answer, citations, _tokens_used(response, messages)
 
-Please answer based only on the documents above."""
 
-    # Log token estimate (rough: 1 token ≈ 4 chars)
-    log_llm_call(user_id, LLM_MODEL, len(user_message) // 4, len(context))
+async def agenerate_rag_answer(
+    query: str,
+    chunks: List[RetrievedChunk],
+    user_id: str,
+    context: Optional[str] = None,
+    prompt_tokens: Optional[int] = None,
+) -> Tuple[str, List[Citation], int]:
+    """
+    Async variant of generate_rag_answer: awaits the LLM with ainvoke so
+    the event loop keeps serving other requests during generation.
+    """
+    log_workflow_step("generate_rag_answer", user_id)
+
+    if context is None:
+        chunks = pack_context_chunks(chunks)
+    messages = _build_rag_messages(query, chunks, user_id, context, prompt_tokens)
 
-    # Step 3: Call LLM
     llm = get_llm()
-    messages = [
+    response = await llm.ainvoke(messages)
+    answer = response.content
+
+    citations = build_citations(chunks)
+
+    logger.info("[RAG] Generated answer (%s chars) with %s citations", len(answer), len(citations))
+
+    return answer, citations, _tokens_used(response, messages)
+
+
+def _tokens_used(response, messages: list) -> int:
+    """Prompt + completion tokens from the response's usage metadata, else counted."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    if usage.get("total_tokens"):
+        return usage["total_tokens"]
+    return sum(count_tokens(m.content) for m in messages) + count_tokens(str(response.content))
+
+
+def estimate_rag_prompt_tokens(query: str, context: str) -> int:
+    """Prompt tokens of the RAG generation call for this query and context."""
+    return count_tokens(RAG_SYSTEM_PROMPT) + count_tokens(_rag_user_message(query, context))
+
+
+def _build_rag_messages(
+    query: str,
+    chunks: List[RetrievedChunk],
+    user_id: str,
+    context: Optional[str] = None,
+    prompt_tokens: Optional[int] = None,
+) -> list:
+    """Steps 1-2 of RAG generation: context string + system/user messages."""
+    # Step 1: Build context (chunks are already packed)
+    if context is None:
+        context = build_context(chunks)
+
+    # Step 2: Construct the user message (context + question)
+    user_message = _rag_user_message(query, context)
+
+    # Not counted by the caller: count only if the LLM_CALL line is emitted
+    log_llm_call(
+        user_id, LLM_MODEL,
+        prompt_tokens if prompt_tokens is not None else (lambda: estimate_rag_prompt_tokens(query, context)),
+        len(context),
+    )
+
+    return [
         SystemMessage(content=RAG_SYSTEM_PROMPT),
         HumanMessage(content=user_message),
     ]
 
-    response = llm.invoke(messages)
-    answer = response.content
 
-    # Step 4: Build citations from retrieved chunks
+def _rag_user_message(query: str, context: str) -> str:
+    return f"""Here are the relevant documents from our knowledge base:
+
+{context}
+
+---
+
+Question: {query}
+
+Please answer based only on the documents above."""
+
+
+def build_citations(chunks: List[RetrievedChunk]) -> List[Citation]:
+    """One citation per source document, skipping low-relevance chunks."""
     citations = []
     seen_docs = set()
     for chunk in chunks:
@@ -386,7 +610,4 @@ Please answer based only on the documents above."""
                 snippet=chunk.content[:200] + "..." if len(chunk.content) > 200 else chunk.content,
             ))
             seen_docs.add(chunk.doc_id)
-
-    logger.info(f"[RAG] Generated answer ({len(answer)} chars) with {len(citations)} citations")
-
-    return answer, citations
+    return citations
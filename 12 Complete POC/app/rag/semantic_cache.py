@@ -0,0 +1,172 @@
+"""
+app/rag/semantic_cache.py — Semantic Retrieval Result Cache
+
+[Concept: Semantic Caching]
+
+────────────────────────────────────────────────────────────────
+WHY A SEMANTIC CACHE?
+────────────────────────────────────────────────────────────────
+Employees ask the same handful of questions in different words:
+
+  "How many vacation days do I get?"
+  "how many vacation days do employees get"
+  "What's my annual vacation allowance?"
+
+An exact-string cache misses all but the first. A SEMANTIC cache
+compares the new query's embedding against embeddings of past
+queries; if one is similar enough (cosine ≥ threshold), the stored
+retrieval result is reused and the vector search + neighbor
+expansion are skipped entirely.
+
+Two safety rules keep cached results correct:
+
+  1. PARTITIONED BY PERMISSIONS
+     Entries are stored per allowed_access_levels set. A result
+     computed for an admin is NEVER served to an employee, even
+     for an identical question.
+
+  2. STAMPED WITH THE CORPUS VERSION
+     Every entry records the corpus version (see corpus_version.py)
+     it was computed at. Ingestion and deletion bump the version,
+     so results computed before a corpus change are never served.
+────────────────────────────────────────────────────────────────
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.models.schemas import RetrievedChunk
+
+
+PartitionKey = Tuple[Tuple[str, ...], int]   # (sorted allowed levels, k)
+
+
+class _Partition:
+    """
+    Entries for one (allowed levels, k) combination at one corpus version.
+
+    The unit query vectors are rows of one contiguous float32 matrix, so a
+    lookup is a single matrix-vector product over matrix[:size]. Rows are
+    written in place on store; when the partition is full, the least
+    recently used row is overwritten.
+    """
+
+    def __init__(self, corpus_version: int):
+        self.corpus_version = corpus_version
+        self.matrix: Optional[np.ndarray] = None                    # (capacity, dim); rows [0, size) in use
+        self.size = 0
+        self.chunks: List[List[RetrievedChunk]] = []                # row → cached result
+        self.lru: "OrderedDict[int, None]" = OrderedDict()          # rows, least recently used first
+
+    def add(self, vector: np.ndarray, chunks: List[RetrievedChunk], max_entries: int) -> None:
+        if self.size < max_entries:
+            row = self.size
+            if self.matrix is None or row == len(self.matrix):
+                self._grow(len(vector), max_entries)
+            self.size += 1
+            self.chunks.append(chunks)
+        else:
+            row, _ = self.lru.popitem(last=False)
+            self.chunks[row] = chunks
+        self.matrix[row] = vector
+        self.lru[row] = None
+
+    def _grow(self, dim: int, max_entries: int) -> None:
+        """Double the capacity (up to max_entries); rows are copied once per doubling."""
+        capacity = min(max_entries, max(16, 2 * self.size))
+        matrix = np.empty((capacity, dim), dtype=np.float32)
+        if self.matrix is not None:
+            matrix[:self.size] = self.matrix[:self.size]
+        self.matrix = matrix
+
+
+class SemanticRetrievalCache:
+    """
+    Nearest-neighbor cache over past query embeddings.
+
+    Lookups are one matrix-vector product over the partition's stored
+    query vectors. Each partition holds at most max_entries entries and
+    evicts the least recently used one when full.
+    """
+
+    def __init__(self, threshold: float, max_entries: int):
+        self.threshold   = threshold
+        self.max_entries = max_entries
+        self.hits   = 0
+        self.misses = 0
+        self._partitions: Dict[PartitionKey, _Partition] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(allowed_levels: Sequence[str], k: int) -> PartitionKey:
+        return tuple(sorted(set(allowed_levels))), k
+
+    @staticmethod
+    def _unit(query_embedding: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(query_embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def lookup(
+        self,
+        query_embedding: Sequence[float],
+        allowed_levels: Sequence[str],
+        k: int,
+        corpus_version: int,
+    ) -> Optional[Tuple[List[RetrievedChunk], float]]:
+        """
+        Return (cached chunks, similarity) for the closest past query in the
+        caller's partition, or None when nothing clears the threshold.
+        """
+        query = self._unit(query_embedding)
+        with self._lock:
+            partition = self._partitions.get(self._key(allowed_levels, k))
+            if partition is None or partition.corpus_version != corpus_version or not partition.size:
+                self.misses += 1
+                return None
+
+            similarities = partition.matrix[:partition.size] @ query
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+
+            if similarity < self.threshold:
+                self.misses += 1
+                return None
+
+            partition.lru.move_to_end(best)
+            self.hits += 1
+            return list(partition.chunks[best]), similarity
+
+    def store(
+        self,
+        query_embedding: Sequence[float],
+        allowed_levels: Sequence[str],
+        k: int,
+        corpus_version: int,
+        chunks: List[RetrievedChunk],
+    ) -> None:
+        """Remember a retrieval result under the caller's partition."""
+        key = self._key(allowed_levels, k)
+        vector = self._unit(query_embedding)
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is not None and corpus_version < partition.corpus_version:
+                return   # computed before an ingest that this partition already reflects
+            if partition is None or partition.corpus_version != corpus_version:
+                # Corpus changed since this partition was filled — start over
+                partition = _Partition(corpus_version)
+                self._partitions[key] = partition
+
+            partition.add(vector, list(chunks), self.max_entries)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits":     self.hits,
+            "misses":   self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries":  sum(p.size for p in self._partitions.values()),
+        }
@@ -0,0 +1,202 @@
+"""
+app/rate_limiting/backends.py — Rate Limiter Storage Backends (GCRA)
+
+[Concept: Generic Cell Rate Algorithm]
+
+────────────────────────────────────────────────────────────────
+ONE NUMBER PER USER INSTEAD OF A LIST OF TIMESTAMPS
+────────────────────────────────────────────────────────────────
+GCRA gives the same result as a sliding window ("at most LIMIT
+requests in any WINDOW seconds, with bursts allowed") but stores a
+single float per user: the THEORETICAL ARRIVAL TIME (TAT), the moment
+the user's budget would be completely refilled.
+
+  interval = WINDOW / LIMIT          (10 req / 60 s → one every 6 s)
+
+  on each request at time now:
+    tat     = max(stored_tat, now)
+    new_tat = tat + interval * cost
+    allowed = new_tat - now <= WINDOW
+    if allowed: stored_tat = new_tat
+
+  remaining   = (WINDOW - (tat - now)) / interval
+  retry after = new_tat - WINDOW - now   (when rejected)
+
+cost does not have to be 1: the token budget (limiter.py) spends
+one unit per LLM token with the same state. force=True applies the
+cost unconditionally (also a negative one, i.e. a refund), which
+is how a token reservation is corrected to the real usage.
+
+A user whose TAT is in the past has their full budget back, so
+their key can be deleted — that is how idle users are evicted.
+
+Backends:
+  MemoryBackend — dict in this process, swept by a background thread.
+                  Fine for one uvicorn worker.
+  RedisBackend  — one key per user, updated atomically by a Lua
+                  script, so every worker shares the limit. Keys
+                  expire by themselves once the TAT has passed.
+────────────────────────────────────────────────────────────────
+"""
+
+import math
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+from app.observability.logger import logger
+
+
+class RateLimitDecision(NamedTuple):
+    allowed:     bool
+    remaining:   int      # requests left right now (after this one, if allowed)
+    retry_after: float    # seconds until the request (a peek: one request) would fit
+
+
+def _remaining(tat: float, now: float, interval: float, window: float) -> int:
+    # Tiny epsilon: 60 / 10 * 10 is not always exactly 60.0 in floating point
+    return max(0, int(math.floor((window - (tat - now)) / interval + 1e-9)))
+
+
+class MemoryBackend:
+    """GCRA state in a dict (one float per active user), per process."""
+
+    blocking = False   # a dict update under a lock: fine to call on the event loop
+
+    def __init__(self, evict_interval: float = 60.0):
+        self._tat: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+        if evict_interval > 0:
+            thread = threading.Thread(
+                target=self._evict_loop, args=(evict_interval,), name="rate-limit-evict", daemon=True,
+            )
+            thread.start()
+
+    def acquire(
+        self, key: str, limit: int, window: float, cost: float = 1.0, force: bool = False,
+    ) -> RateLimitDecision:
+        """Spend cost units of the key's budget if they fit (cost=0 only peeks)."""
+        interval = window / limit
+        now = time.monotonic()
+        with self._lock:
+            tat = max(self._tat.get(key, now), now)
+            if force:
+                new_tat = max(now, tat + interval * cost)
+                self._tat[key] = new_tat
+                return RateLimitDecision(True, _remaining(new_tat, now, interval, window), 0.0)
+            if cost <= 0:
+                wait = max(0.0, tat + interval - window - now)
+                return RateLimitDecision(True, _remaining(tat, now, interval, window), wait)
+
+            new_tat = tat + interval * cost
+            if new_tat - now > window:
+                return RateLimitDecision(False, _remaining(tat, now, interval, window), new_tat - window - now)
+            self._tat[key] = new_tat
+        return RateLimitDecision(True, _remaining(new_tat, now, interval, window), 0.0)
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._tat.pop(key, None)
+
+    def evict_idle(self) -> int:
+        """Drop keys whose budget is full again; they carry no information."""
+        now = time.monotonic()
+        with self._lock:
+            idle = [key for key, tat in self._tat.items() if tat <= now]
+            for key in idle:
+                del self._tat[key]
+        self.evicted += len(idle)
+        return len(idle)
+
+    def _evict_loop(self, interval: float) -> None:
+        while True:
+            time.sleep(interval)
+            try:
+                evicted = self.evict_idle()
+                if evicted:
+                    logger.debug("[RATE_LIMIT] Evicted %s idle users", evicted)
+            except Exception as e:
+                logger.warning(f"[RATE_LIMIT] Idle-key eviction failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys": len(self._tat), "evicted": self.evicted}
+
+
+# Runs atomically inside Redis, so concurrent workers cannot both spend
+# the last unit of a budget. Times are in milliseconds on Redis' clock,
+# which keeps workers with skewed clocks consistent.
+_GCRA_SCRIPT = """
+local interval = tonumber(ARGV[1])
+local window   = tonumber(ARGV[2])
+local cost     = tonumber(ARGV[3])
+local force    = ARGV[4] == '1'
+
+local t   = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + tonumber(t[2]) / 1000
+
+local tat = tonumber(redis.call('GET', KEYS[1])) or now
+if tat < now then tat = now end
+
+if force then
+  local new_tat = math.max(now, tat + interval * cost)
+  if new_tat > now then
+    redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+  else
+    redis.call('DEL', KEYS[1])
+  end
+  return {1, math.floor((window - (new_tat - now)) / interval + 1e-9), 0}
+end
+
+if cost <= 0 then
+  local remaining = math.floor((window - (tat - now)) / interval + 1e-9)
+  return {1, remaining, math.max(0, math.ceil(tat + interval - window - now))}
+end
+
+local new_tat = tat + interval * cost
+
+if new_tat - now > window then
+  local remaining = math.floor((window - (tat - now)) / interval + 1e-9)
+  return {0, remaining, math.ceil(new_tat - window - now)}
+end
+
+redis.call('SET', KEYS[1], string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+local remaining = math.floor((window - (new_tat - now)) / interval + 1e-9)
+return {1, remaining, 0}
+"""
+
+
+class RedisBackend:
+    """
+    GCRA state in Redis (or anything speaking its protocol with Lua support),
+    shared by all workers. client: a redis.Redis-compatible client, e.g.
+    fakeredis.FakeRedis() as a local stand-in; otherwise one is created from url.
+    """
+
+    blocking = True    # a network round trip: async callers run it in a worker thread
+
+    def __init__(self, url: str = "redis://localhost:6379/0", key_prefix: str = "ratelimit:", client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("RATE_LIMIT_BACKEND=redis requires the 'redis' package (pip install redis)") from e
+            client = redis.Redis.from_url(url, socket_timeout=1.0)
+        self.client = client
+        self.key_prefix = key_prefix
+        self._script = client.register_script(_GCRA_SCRIPT)
+
+    def acquire(
+        self, key: str, limit: int, window: float, cost: float = 1.0, force: bool = False,
+    ) -> RateLimitDecision:
+        window_ms = window * 1000
+        allowed, remaining, retry_ms = self._script(
+            keys=[self.key_prefix + key], args=[window_ms / limit, window_ms, cost, int(force)],
+        )
+        return RateLimitDecision(bool(allowed), max(0, int(remaining)), int(retry_ms) / 1000)
+
+    def reset(self, key: str) -> None:
+        self.client.delete(self.key_prefix + key)
+
+    def stats(self) -> Optional[Dict[str, int]]:
+        return None   # keys live in Redis and expire there
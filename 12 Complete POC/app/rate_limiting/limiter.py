@@ -14,83 +14,229 @@ cost $0.01–$0.06. Without rate limiting:
   - A bug in client code with a retry loop could bankrupt you.
   - Denial-of-service attacks become trivially cheap for attackers.
 
-Production systems use Redis for distributed rate limiting
-(works across multiple server instances). For this reference
-project we use an in-memory dictionary — same logic, no Redis
-dependency needed to run locally.
-
-Algorithm used: Sliding Window Counter
-  - Track timestamps of recent requests per user
-  - Remove timestamps older than the window
-  - If remaining count < limit → allow request
-  - Otherwise → block request
+Algorithm used: GCRA (Generic Cell Rate Algorithm)
+  - Behaves like a sliding window: at most RATE_LIMIT_REQUESTS in
+    any RATE_LIMIT_WINDOW seconds, bursts up to the limit allowed
+  - Stores ONE number per user instead of a list of timestamps
+  - Idle users are evicted in the background
+  (details in backends.py)
+
+Backend (RATE_LIMIT_BACKEND):
+  - "memory": in this process — fine for a single uvicorn worker
+  - "redis":  shared by all workers and servers, updated atomically
+              by a Lua script
+
+TOKEN BUDGET (second dimension)
+  Counting requests treats a question with a huge context like a
+  one-liner. Each user therefore also has a budget of LLM tokens
+  per TOKEN_RATE_LIMIT_WINDOW, set per role (TOKEN_RATE_LIMITS):
+
+    before generation:  reserve the ESTIMATED prompt tokens
+                        (packed context + question + system prompt)
+                        → refused if they do not fit
+    after generation:   reconcile to the ACTUAL usage reported by
+                        the LLM (prompt + completion tokens)
+
+  Only RAG answer generation is counted; tool calls and the
+  classification call are not.
+
+Every check returns the backend's decision (allowed, remaining,
+retry_after), so callers build their 429s and X-RateLimit-* headers
+without asking the backend again. Async callers use the a* variants:
+with Redis each check is a network round trip, which then runs in a
+worker thread instead of on the event loop.
 ────────────────────────────────────────────────────────────────
 """
 
-import time
-from collections import defaultdict
-from typing import Dict, List, Tuple
-from app.config import RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW
-from app.observability.logger import log_rate_limit_hit
+import asyncio
+from typing import NamedTuple, Optional, Tuple
+from app.config import (
+    RATE_LIMIT_REQUESTS, RATE_LIMIT_WINDOW,
+    RATE_LIMIT_BACKEND, RATE_LIMIT_REDIS_URL, RATE_LIMIT_EVICT_INTERVAL,
+    TOKEN_RATE_LIMIT_WINDOW, TOKEN_RATE_LIMITS,
+)
+from app.observability.logger import logger, log_rate_limit_hit
+from app.observability.metrics import register_stats
+from app.rate_limiting.backends import MemoryBackend, RateLimitDecision, RedisBackend
 
 
 # ──────────────────────────────────────────────
-# In-Memory Store
+# Backend
 # ──────────────────────────────────────────────
 
-# Maps user_id → list of request timestamps (Unix epoch seconds)
-# In production this would be a Redis sorted set
-_request_log: Dict[str, List[float]] = defaultdict(list)
+def _create_backend():
+    if RATE_LIMIT_BACKEND == "redis":
+        logger.info("[RATE_LIMIT] Using Redis backend at %s", RATE_LIMIT_REDIS_URL)
+        return RedisBackend(url=RATE_LIMIT_REDIS_URL)
+    return MemoryBackend(evict_interval=RATE_LIMIT_EVICT_INTERVAL)
+
+
+_backend = _create_backend()
+register_stats("rag_rate_limit", _backend.stats, counters=("evicted",))
+
+
+def _acquire(
+    key: str, cost: float, limit: int = RATE_LIMIT_REQUESTS, window: float = RATE_LIMIT_WINDOW,
+    force: bool = False,
+) -> RateLimitDecision:
+    try:
+        return _backend.acquire(key, limit, window, cost, force)
+    except Exception as e:
+        # Fail open: an unreachable Redis should not take the whole API down
+        logger.error(f"[RATE_LIMIT] Backend error, allowing request: {e}")
+        return RateLimitDecision(True, limit, 0.0)
+
+
+async def _aacquire(
+    key: str, cost: float, limit: int = RATE_LIMIT_REQUESTS, window: float = RATE_LIMIT_WINDOW,
+    force: bool = False,
+) -> RateLimitDecision:
+    """_acquire for async callers; a backend doing network I/O runs in a worker thread."""
+    if _backend.blocking:
+        return await asyncio.to_thread(_acquire, key, cost, limit, window, force)
+    return _acquire(key, cost, limit, window, force)
 
 
 # ──────────────────────────────────────────────
 # Rate Limiter Logic
 # ──────────────────────────────────────────────
 
-def check_rate_limit(user_id: str) -> Tuple[bool, int, int]:
+def check_rate_limit(user_id: str) -> RateLimitDecision:
     """
-    Check whether a user is within their rate limit.
-
-    Algorithm:
-      1. Get the current timestamp
-      2. Remove all timestamps older than the window
-      3. Count remaining (recent) requests
-      4. If count < limit → allowed, record this request
-      5. Otherwise → blocked
+    Check whether a user is within their rate limit, and count this
+    request if so.
 
     Returns:
-        (is_allowed, current_count, limit)
+        the backend's decision: allowed, remaining (after this request)
+        and retry_after (seconds, when refused)
     """
-    now = time.time()
-    window_start = now - RATE_LIMIT_WINDOW
+    return _log_refusal(user_id, _acquire(user_id, cost=1))
 
-    # Keep only timestamps within the current window (sliding window)
-    recent_requests = [
-        ts for ts in _request_log[user_id]
-        if ts > window_start
-    ]
-    _request_log[user_id] = recent_requests
 
-    current_count = len(recent_requests)
+async def acheck_rate_limit(user_id: str) -> RateLimitDecision:
+    """Async variant of check_rate_limit."""
+    return _log_refusal(user_id, await _aacquire(user_id, cost=1))
 
-    if current_count >= RATE_LIMIT_REQUESTS:
-        # User has exceeded the limit — log and block
-        log_rate_limit_hit(user_id, current_count, RATE_LIMIT_REQUESTS)
-        return False, current_count, RATE_LIMIT_REQUESTS
 
-    # Record this request and allow it
-    _request_log[user_id].append(now)
-    return True, current_count + 1, RATE_LIMIT_REQUESTS
+async def aacquire_requests(user_id: str, count: int) -> int:
+    """
+    Charge up to count requests (e.g. the questions of one batch) to the
+    user's budget; returns how many fit. The caller refuses the rest.
+    """
+    admitted = min(count, (await _aacquire(user_id, cost=0)).remaining)
+    while admitted > 0:
+        decision = await _aacquire(user_id, cost=admitted)
+        if decision.allowed:
+            break
+        # A concurrent request spent part of the budget in between
+        admitted = min(admitted - 1, decision.remaining)
+    if admitted < count:
+        log_rate_limit_hit(user_id, RATE_LIMIT_REQUESTS + count - admitted, RATE_LIMIT_REQUESTS)
+    return admitted
+
+
+def _log_refusal(user_id: str, decision: RateLimitDecision) -> RateLimitDecision:
+    if not decision.allowed:
+        # User has exceeded the limit — log and block
+        log_rate_limit_hit(user_id, RATE_LIMIT_REQUESTS - decision.remaining + 1, RATE_LIMIT_REQUESTS)
+    return decision
 
 
 def get_remaining_requests(user_id: str) -> int:
-    """Return how many more requests the user can make in this window."""
-    now = time.time()
-    window_start = now - RATE_LIMIT_WINDOW
-    recent = [ts for ts in _request_log[user_id] if ts > window_start]
-    return max(0, RATE_LIMIT_REQUESTS - len(recent))
+    """Return how many more requests the user can make right now."""
+    return _acquire(user_id, cost=0).remaining
 
 
 def reset_user_limit(user_id: str) -> None:
     """Reset a user's rate limit counter (useful for testing)."""
-    _request_log[user_id] = []
+    _backend.reset(user_id)
+
+
+# ──────────────────────────────────────────────
+# Token Budget
+# ──────────────────────────────────────────────
+
+class TokenReservation(NamedTuple):
+    user_id:     str
+    limit:       int      # the role's tokens per window (0 = unlimited)
+    reserved:    int      # tokens taken from the budget (0 if refused)
+    allowed:     bool
+    remaining:   int
+    retry_after: float    # seconds until the reservation would fit (if refused)
+
+
+def _token_key(user_id: str) -> str:
+    return f"tokens:{user_id}"
+
+
+def get_token_limit(user_role) -> int:
+    """Tokens per TOKEN_RATE_LIMIT_WINDOW for a role (UserRole or its value); 0 = unlimited."""
+    return TOKEN_RATE_LIMITS.get(getattr(user_role, "value", user_role), 0)
+
+
+def reserve_tokens(user_id: str, user_role, estimated_tokens: int) -> TokenReservation:
+    """
+    Take estimated_tokens from the user's token budget before an LLM call.
+    A single request larger than the whole budget reserves the whole budget,
+    so it can still run once the budget is full.
+    """
+    limit = get_token_limit(user_role)
+    if limit <= 0:
+        return TokenReservation(user_id, 0, 0, True, 0, 0.0)
+    cost = max(1, min(estimated_tokens, limit))
+    return _reservation(user_id, limit, cost, _acquire(_token_key(user_id), cost, limit, TOKEN_RATE_LIMIT_WINDOW))
+
+
+async def areserve_tokens(user_id: str, user_role, estimated_tokens: int) -> TokenReservation:
+    """Async variant of reserve_tokens."""
+    limit = get_token_limit(user_role)
+    if limit <= 0:
+        return TokenReservation(user_id, 0, 0, True, 0, 0.0)
+    cost = max(1, min(estimated_tokens, limit))
+    decision = await _aacquire(_token_key(user_id), cost, limit, TOKEN_RATE_LIMIT_WINDOW)
+    return _reservation(user_id, limit, cost, decision)
+
+
+def _reservation(user_id: str, limit: int, cost: int, decision: RateLimitDecision) -> TokenReservation:
+    if not decision.allowed:
+        logger.warning(
+            f"[RATE_LIMIT] user={user_id} | tokens={cost} | remaining={decision.remaining}/{limit} | BLOCKED"
+        )
+        return TokenReservation(user_id, limit, 0, False, decision.remaining, decision.retry_after)
+    return TokenReservation(user_id, limit, cost, True, decision.remaining, 0.0)
+
+
+def reconcile_tokens(reservation: TokenReservation, actual_tokens: int) -> None:
+    """Correct a reservation to the tokens actually used (0 = refund it)."""
+    delta = _reconcile_delta(reservation, actual_tokens)
+    if delta:
+        _acquire(_token_key(reservation.user_id), delta, reservation.limit, TOKEN_RATE_LIMIT_WINDOW, force=True)
+
+
+async def areconcile_tokens(reservation: TokenReservation, actual_tokens: int) -> None:
+    """Async variant of reconcile_tokens."""
+    delta = _reconcile_delta(reservation, actual_tokens)
+    if delta:
+        await _aacquire(_token_key(reservation.user_id), delta, reservation.limit, TOKEN_RATE_LIMIT_WINDOW, force=True)
+
+
+def _reconcile_delta(reservation: TokenReservation, actual_tokens: int) -> int:
+    if reservation.limit <= 0 or not reservation.allowed:
+        return 0
+    return actual_tokens - reservation.reserved
+
+
+def get_remaining_tokens(user_id: str, user_role) -> Optional[Tuple[int, int]]:
+    """(limit, remaining tokens) for the user's role, or None when tokens are not limited."""
+    limit = get_token_limit(user_role)
+    if limit <= 0:
+        return None
+    return limit, _acquire(_token_key(user_id), 0, limit, TOKEN_RATE_LIMIT_WINDOW).remaining
+
+
+async def aget_remaining_tokens(user_id: str, user_role) -> Optional[Tuple[int, int]]:
+    """Async variant of get_remaining_tokens."""
+    limit = get_token_limit(user_role)
+    if limit <= 0:
+        return None
+    return limit, (await _aacquire(_token_key(user_id), 0, limit, TOKEN_RATE_LIMIT_WINDOW)).remaining
@@ -0,0 +1,381 @@
+"""
+app/security/guardrail_engine.py — Precompiled Multi-Pattern Guardrail Engine
+
+[Concept: Multi-Pattern Matching]
+
+────────────────────────────────────────────────────────────────
+WHY AN ENGINE INSTEAD OF A LOOP OVER re.search?
+────────────────────────────────────────────────────────────────
+Checking a query against N regexes one by one costs N searches
+per request, and re's internal cache only holds 512 compiled
+patterns, so a large rule list is also RE-COMPILED on every call.
+Latency grows with every rule the security team adds.
+
+The engine compiles every rule ONCE and puts a literal prefilter
+in front of them:
+
+  1. For each rule, the pattern is parsed and a REQUIRED LITERAL
+     is extracted — text that every match must contain:
+
+       ignore\s+(all\s+)?(previous|prior)\s+instructions
+         → "instructions"
+       \b(recipe|cook|bake|food)\b
+         → any of "recipe", "cook", "bake", "food"
+
+  2. All literals go into ONE Aho-Corasick automaton. A single pass
+     over the lowercased query finds every literal it contains,
+     no matter how many rules there are.
+
+  3. Only the rules whose literal was found (plus the few rules
+     without an extractable literal) run their full regex.
+
+A typical query contains no rule literal at all, so the cost is one
+pass over the query whether there are 20 rules or 20,000
+(benchmarks/guardrails.py).
+
+RULE PACKS
+  Besides the built-in rules, JSON rule packs can be listed in
+  GUARDRAIL_RULE_PACKS:
+
+    {"name": "security-team",
+     "rules": [{"id": "exfil-01", "category": "prompt_injection",
+                "pattern": "dump\\s+(the\\s+)?vector\\s+store"}]}
+
+  Pack files are checked for changes every GUARDRAIL_RELOAD_INTERVAL
+  seconds and recompiled on change. A pack that fails to load
+  (bad JSON, bad regex) is logged and the previous rules stay active.
+────────────────────────────────────────────────────────────────
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set
+
+try:                                   # Python 3.11+
+    import re._parser as sre_parse
+    from re._constants import (
+        LITERAL, AT, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT, POSSESSIVE_REPEAT,
+    )
+except ImportError:                    # Python 3.8 – 3.10
+    import sre_parse
+    from sre_constants import LITERAL, AT, SUBPATTERN, BRANCH, MAX_REPEAT, MIN_REPEAT
+    POSSESSIVE_REPEAT = MAX_REPEAT
+
+from app.observability.logger import logger
+
+
+# Literals shorter than this match too many queries to be a useful filter
+MIN_ANCHOR_CHARS = 3
+
+CATEGORIES = ("prompt_injection", "off_domain")
+
+
+class GuardrailRule(NamedTuple):
+    rule_id:  str
+    category: str
+    pattern:  str
+    pack:     str
+
+
+class RuleMatch(NamedTuple):
+    """Which rule fired, and on what text."""
+    rule_id:  str
+    category: str
+    pack:     str
+    matched:  str
+
+
+# ──────────────────────────────────────────────
+# Required-literal extraction
+# ──────────────────────────────────────────────
+
+def _usable(candidate: Set[str]) -> bool:
+    return bool(candidate) and min(map(len, candidate)) >= MIN_ANCHOR_CHARS
+
+
+def _best(candidates: List[Set[str]]) -> Optional[Set[str]]:
+    """Pick the anchor set whose shortest literal is longest (the most selective)."""
+    usable = [c for c in candidates if _usable(c)]
+    if not usable:
+        return None
+    return max(usable, key=lambda c: (min(map(len, c)), -len(c)))
+
+
+def _candidates(items) -> List[Set[str]]:
+    """
+    Anchor sets for a parsed pattern: every match contains at least one
+    literal of EACH returned set, so any one of them can be the prefilter.
+    """
+    candidates: List[Set[str]] = []
+    run: List[str] = []
+
+    def close_run():
+        if run:
+            candidates.append({"".join(run).lower()})
+            run.clear()
+
+    for op, arg in items:
+        if op is LITERAL:
+            run.append(chr(arg))
+            continue
+        if op is AT:                   # \b, ^, $: zero-width, the run continues
+            continue
+        close_run()
+
+        if op is SUBPATTERN:
+            sub = _anchors(arg[-1])
+            if sub:
+                candidates.append(sub)
+        elif op is BRANCH:
+            branches = [_anchors(branch) for branch in arg[1]]
+            if all(branches):
+                candidates.append(set().union(*branches))
+        elif op in (MAX_REPEAT, MIN_REPEAT, POSSESSIVE_REPEAT) and arg[0] >= 1:
+            sub = _anchors(arg[2])
+            if sub:
+                candidates.append(sub)
+        # Anything else (classes, lookarounds, optional parts) is not required
+
+    close_run()
+    return [c for c in candidates if _usable(c)]
+
+
+def _anchors(items) -> Optional[Set[str]]:
+    return _best(_candidates(items))
+
+
+def literal_candidates(pattern: str) -> List[Set[str]]:
+    """Lowercased anchor sets for pattern (empty if no literal is required)."""
+    try:
+        return _candidates(sre_parse.parse(pattern))
+    except Exception:
+        return []
+
+
+def required_literals(pattern: str) -> Optional[Set[str]]:
+    """Lowercased literals, one of which every match of pattern contains."""
+    return _best(literal_candidates(pattern))
+
+
+# ──────────────────────────────────────────────
+# Aho-Corasick automaton
+# ──────────────────────────────────────────────
+
+class _Automaton:
+    """Finds every occurrence of many literals in one pass over the text."""
+
+    def __init__(self, literals: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Set[str]] = [set()]
+
+        for literal in literals:
+            node = 0
+            for ch in literal:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(set())
+                node = nxt
+            self._out[node].add(literal)
+
+        # Breadth-first failure links
+        queue = deque([0])
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                if node == 0:
+                    continue   # depth-1 nodes fail back to the root
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] |= self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Set[str]:
+        found: Set[str] = set()
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found |= out[node]
+        return found
+
+
+# ──────────────────────────────────────────────
+# Compiled rule set
+# ──────────────────────────────────────────────
+
+class CompiledRules:
+    """An immutable, fully compiled rule set (swapped as a whole on reload)."""
+
+    def __init__(self, rules: Sequence[GuardrailRule]):
+        self.rules = list(rules)
+        self.regexes = [re.compile(rule.pattern, re.IGNORECASE) for rule in self.rules]
+
+        # Of each rule's anchor sets, use the one whose literals the fewest
+        # other rules share: a literal common to many rules ("policy")
+        # would send all of them to the regex stage
+        per_rule = [literal_candidates(rule.pattern) for rule in self.rules]
+        frequency: Dict[str, int] = {}
+        for candidates in per_rule:
+            for literal in set().union(*candidates):
+                frequency[literal] = frequency.get(literal, 0) + 1
+
+        by_literal: Dict[str, List[int]] = {}
+        self.unanchored: List[int] = []
+        for index, candidates in enumerate(per_rule):
+            if not candidates:
+                self.unanchored.append(index)
+                continue
+            literals = min(candidates, key=lambda c: (
+                sum(frequency[literal] for literal in c), -min(map(len, c)),
+            ))
+            for literal in literals:
+                by_literal.setdefault(literal, []).append(index)
+
+        self.by_literal = by_literal
+        self.automaton = _Automaton(by_literal)
+
+    def scan(self, query: str) -> Dict[str, RuleMatch]:
+        """First matching rule (in rule order) for each category that fired."""
+        candidates = set(self.unanchored)
+        for literal in self.automaton.find(query.lower()):
+            candidates.update(self.by_literal[literal])
+
+        matches: Dict[str, RuleMatch] = {}
+        for index in sorted(candidates):
+            rule = self.rules[index]
+            if rule.category in matches:
+                continue
+            found = self.regexes[index].search(query)
+            if found:
+                matches[rule.category] = RuleMatch(rule.rule_id, rule.category, rule.pack, found.group(0))
+        return matches
+
+
+def load_rule_pack(path: str) -> List[GuardrailRule]:
+    """Read and validate one JSON rule pack (raises ValueError on bad content)."""
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    pack = data.get("name") or os.path.basename(path)
+    rules = []
+    for i, entry in enumerate(data.get("rules", [])):
+        category = entry.get("category")
+        if category not in CATEGORIES:
+            raise ValueError(f"{path}: rule {i} has unknown category {category!r}")
+        try:
+            re.compile(entry["pattern"])
+        except (KeyError, re.error) as e:
+            raise ValueError(f"{path}: rule {i} has an invalid pattern: {e}")
+        rules.append(GuardrailRule(entry.get("id") or f"{pack}.{i}", category, entry["pattern"], pack))
+    return rules
+
+
+# ──────────────────────────────────────────────
+# Engine (built-in rules + hot-reloaded packs)
+# ──────────────────────────────────────────────
+
+class GuardrailEngine:
+    """Built-in rules plus JSON rule packs, recompiled when a pack file changes."""
+
+    def __init__(
+        self,
+        builtin_rules: Sequence[GuardrailRule],
+        pack_paths: Sequence[str] = (),
+        reload_interval: float = 5.0,
+    ):
+        self.builtin_rules = list(builtin_rules)
+        self.pack_paths = [p for p in pack_paths if p]
+        self.reload_interval = reload_interval
+        self.reloads = 0
+        self._mtimes: Dict[str, Optional[float]] = {}
+        self._next_check = 0.0
+        self._listeners: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._compiled = self._build()
+
+    def _stat(self) -> Dict[str, Optional[float]]:
+        mtimes = {}
+        for path in self.pack_paths:
+            try:
+                mtimes[path] = os.stat(path).st_mtime
+            except OSError:
+                mtimes[path] = None
+        return mtimes
+
+    def _build(self) -> CompiledRules:
+        self._mtimes = self._stat()
+        rules = list(self.builtin_rules)
+        for path in self.pack_paths:
+            if self._mtimes[path] is None:
+                logger.warning(f"[GUARDRAIL] Rule pack not found: {path}")
+                continue
+            rules.extend(load_rule_pack(path))
+
+        started = time.perf_counter()
+        compiled = CompiledRules(rules)
+        logger.info(
+            "[GUARDRAIL] Compiled %s rules from %s packs (%s prefiltered) in %.1fms",
+            len(rules), 1 + len(self.pack_paths), len(rules) - len(compiled.unanchored),
+            (time.perf_counter() - started) * 1000,
+        )
+        return compiled
+
+    def add_reload_listener(self, callback: Callable[[], None]) -> None:
+        """Called after the rules changed (e.g. to drop answers cached under the old rules)."""
+        self._listeners.append(callback)
+
+    def reload(self, force: bool = False) -> bool:
+        """Recompile if a pack file changed (or force). Returns True if rules were swapped."""
+        with self._lock:
+            if not force and self._stat() == self._mtimes:
+                return False
+            try:
+                compiled = self._build()
+            except Exception as e:
+                self._mtimes = self._stat()   # do not retry the same broken file every check
+                logger.error(f"[GUARDRAIL] Rule pack reload failed, keeping previous rules: {e}")
+                return False
+            self._compiled = compiled
+            self.reloads += 1
+
+        for callback in self._listeners:
+            callback()
+        return True
+
+    def _maybe_reload(self) -> None:
+        now = time.monotonic()
+        if not self.pack_paths or self.reload_interval <= 0 or now < self._next_check:
+            return
+        self._next_check = now + self.reload_interval
+        self.reload()
+
+    def scan(self, query: str) -> Dict[str, RuleMatch]:
+        """{category: first RuleMatch} for every category with a matching rule."""
+        self._maybe_reload()
+        return self._compiled.scan(query)
+
+    def first_match(self, query: str, category: str) -> Optional[RuleMatch]:
+        return self.scan(query).get(category)
+
+    def stats(self) -> Dict[str, int]:
+        compiled = self._compiled
+        return {
+            "rules":      len(compiled.rules),
+            "unanchored": len(compiled.unanchored),
+            "packs":      1 + len(self.pack_paths),
+            "reloads":    self.reloads,
+        }
@@ -30,12 +30,19 @@ Without guardrails, users can abuse an AI assistant in several ways:
 
 These are DEFENSE IN DEPTH — multiple layers that must all pass
 before a query reaches the expensive LLM call.
+
+The pattern lists below are the BUILT-IN rule pack. They are compiled
+together with any packs in GUARDRAIL_RULE_PACKS by the guardrail
+engine (guardrail_engine.py), which checks a query against all of
+them in one pass and reports which rule fired.
 ────────────────────────────────────────────────────────────────
 """
 
-import re
-from typing import Tuple, List
+from typing import Dict, Optional, Tuple, List
+from app.config import GUARDRAIL_RULE_PACKS, GUARDRAIL_RELOAD_INTERVAL
 from app.observability.logger import log_guardrail_trigger
+from app.observability.metrics import GUARDRAIL_BLOCKS, register_stats
+from app.security.guardrail_engine import GuardrailEngine, GuardrailRule, RuleMatch
 
 
 # ──────────────────────────────────────────────
@@ -75,29 +82,65 @@ OFF_DOMAIN_PATTERNS: List[str] = [
 ]
 
 
+# ──────────────────────────────────────────────
+# Rule engine (built-in rules + rule packs)
+# ──────────────────────────────────────────────
+
+def _builtin_rules() -> List[GuardrailRule]:
+    rules = []
+    for category, patterns in (("prompt_injection", INJECTION_PATTERNS), ("off_domain", OFF_DOMAIN_PATTERNS)):
+        for i, pattern in enumerate(patterns, 1):
+            rules.append(GuardrailRule(f"builtin.{category}.{i}", category, pattern, "builtin"))
+    return rules
+
+
+guardrail_engine = GuardrailEngine(
+    builtin_rules=_builtin_rules(),
+    pack_paths=[p.strip() for p in GUARDRAIL_RULE_PACKS.split(",")],
+    reload_interval=GUARDRAIL_RELOAD_INTERVAL,
+)
+register_stats("rag_guardrail_rules", guardrail_engine.stats, counters=("reloads",))
+
+
 # ──────────────────────────────────────────────
 # Guardrail Functions
 # ──────────────────────────────────────────────
 
-def check_prompt_injection(query: str, user_id: str) -> Tuple[bool, str]:
+INJECTION_MESSAGE = (
+    "This query appears to contain an attempt to override system instructions. "
+    "Please ask a genuine company-related question."
+)
+OFF_DOMAIN_MESSAGE = (
+    "I can only answer questions about company policies, procedures, "
+    "benefits, and internal documentation. Please ask a work-related question."
+)
+
+
+def check_prompt_injection(
+    query: str, user_id: str, matches: Optional[Dict[str, RuleMatch]] = None,
+) -> Tuple[bool, str]:
     """
     Check if the query contains prompt injection patterns.
 
+    matches: result of guardrail_engine.scan(query), if already computed.
+
     Returns:
         (is_safe, reason_if_blocked)
     """
-    query_lower = query.lower()
+    if matches is None:
+        matches = guardrail_engine.scan(query)
 
-    for pattern in INJECTION_PATTERNS:
-        if re.search(pattern, query_lower):
-            reason = f"Prompt injection pattern detected: '{pattern}'"
-            log_guardrail_trigger(user_id, "PROMPT_INJECTION", query)
-            return False, "This query appears to contain an attempt to override system instructions. Please ask a genuine company-related question."
+    match = matches.get("prompt_injection")
+    if match:
+        log_guardrail_trigger(user_id, "PROMPT_INJECTION", query, rule=match.rule_id)
+        return False, INJECTION_MESSAGE
 
     return True, ""
 
 
-def check_off_domain(query: str, user_id: str) -> Tuple[bool, str]:
+def check_off_domain(
+    query: str, user_id: str, matches: Optional[Dict[str, RuleMatch]] = None,
+) -> Tuple[bool, str]:
     """
     Check if the query is clearly outside the company knowledge domain.
 
@@ -107,15 +150,13 @@ def check_off_domain(query: str, user_id: str) -> Tuple[bool, str]:
     Returns:
         (is_in_domain, reason_if_blocked)
     """
-    query_lower = query.lower()
+    if matches is None:
+        matches = guardrail_engine.scan(query)
 
-    for pattern in OFF_DOMAIN_PATTERNS:
-        if re.search(pattern, query_lower):
-            log_guardrail_trigger(user_id, "OFF_DOMAIN", query)
-            return False, (
-                "I can only answer questions about company policies, procedures, "
-                "benefits, and internal documentation. Please ask a work-related question."
-            )
+    match = matches.get("off_domain")
+    if match:
+        log_guardrail_trigger(user_id, "OFF_DOMAIN", query, rule=match.rule_id)
+        return False, OFF_DOMAIN_MESSAGE
 
     return True, ""
 
@@ -147,20 +188,22 @@ def run_all_guardrails(query: str, user_id: str) -> Tuple[bool, str]:
 
     Order matters: cheapest checks first (string matching before LLM calls).
     If any check fails, we stop and return the error immediately.
+    The pattern checks share one engine scan of the query.
 
     Returns:
         (passed_all_checks, error_message_if_blocked)
     """
-    checks = [
-        check_empty_query,
-        check_query_length,
-        check_prompt_injection,
-        check_off_domain,
-    ]
-
-    for check_fn in checks:
+    for check_fn in (check_empty_query, check_query_length):
         is_safe, message = check_fn(query, user_id)
         if not is_safe:
+            GUARDRAIL_BLOCKS.inc(check=check_fn.__name__.replace("check_", "", 1))
+            return False, message
+
+    matches = guardrail_engine.scan(query)
+    for check_fn in (check_prompt_injection, check_off_domain):
+        is_safe, message = check_fn(query, user_id, matches)
+        if not is_safe:
+            GUARDRAIL_BLOCKS.inc(check=check_fn.__name__.replace("check_", "", 1))
             return False, message
 
     return True, ""
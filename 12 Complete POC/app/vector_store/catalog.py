@@ -0,0 +1,180 @@
+"""
+app/vector_store/catalog.py — SQLite Document Catalog
+
+[Concept: Keep Document-Level Metadata Out of the Vector DB]
+
+────────────────────────────────────────────────────────────────
+WHY A SEPARATE CATALOG?
+────────────────────────────────────────────────────────────────
+ChromaDB stores CHUNKS. Listing DOCUMENTS from it means reading the
+metadata of every chunk and grouping by doc_id in Python — work
+that grows with the corpus on every GET /documents call.
+
+The catalog keeps ONE row per document in SQLite (SQLITE_DB_PATH):
+
+  doc_id | title | department | access_level | source | chunk_count | ingested_at
+
+  - Ingestion upserts the row after the chunks are stored.
+  - Deletion removes it together with the chunks.
+  - Listing is an indexed query with LIMIT/OFFSET — the cost
+    depends on the page size, not on the number of chunks.
+
+Each write is a single SQLite transaction, so a reader never sees
+a half-updated row.
+────────────────────────────────────────────────────────────────
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.config import SQLITE_DB_PATH
+from app.observability.logger import logger
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id        TEXT PRIMARY KEY,
+    title         TEXT NOT NULL,
+    department    TEXT NOT NULL,
+    access_level  TEXT NOT NULL,
+    source        TEXT,
+    chunk_count   INTEGER NOT NULL,
+    ingested_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_department   ON documents (department COLLATE NOCASE, ingested_at);
+CREATE INDEX IF NOT EXISTS idx_documents_access_level ON documents (access_level, ingested_at);
+CREATE INDEX IF NOT EXISTS idx_documents_ingested_at  ON documents (ingested_at);
+CREATE TABLE IF NOT EXISTS catalog_state (
+    key    TEXT PRIMARY KEY,
+    value  TEXT NOT NULL
+);
+"""
+
+_COLUMNS = ("doc_id", "title", "department", "access_level", "source", "chunk_count")
+
+
+class DocumentCatalog:
+    """One row per ingested document, with paginated, filterable listing."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _get_conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    # ── Writes ──
+
+    def upsert_document(
+        self,
+        doc_id: str,
+        title: str,
+        department: str,
+        access_level: str,
+        chunk_count: int,
+        source: Optional[str] = None,
+    ) -> None:
+        """Insert or replace a document row (re-ingest keeps the original ingested_at)."""
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                conn.execute(
+                    "INSERT INTO documents "
+                    "(doc_id, title, department, access_level, source, chunk_count, ingested_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(doc_id) DO UPDATE SET "
+                    "  title = excluded.title, department = excluded.department, "
+                    "  access_level = excluded.access_level, source = excluded.source, "
+                    "  chunk_count = excluded.chunk_count",
+                    (doc_id, title, department, access_level, source, chunk_count, time.time()),
+                )
+
+    def delete_document(self, doc_id: str) -> bool:
+        """Remove a document row. Returns True if it existed."""
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                cursor = conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+            return cursor.rowcount > 0
+
+    def needs_backfill(self) -> bool:
+        """True until backfill() has run once against this database."""
+        with self._lock:
+            row = self._get_conn().execute(
+                "SELECT 1 FROM catalog_state WHERE key = 'backfilled'"
+            ).fetchone()
+        return row is None
+
+    def backfill(self, documents: List[Dict]) -> None:
+        """
+        Insert rows for documents ingested before the catalog existed.
+        Rows already present are kept; the database is then marked as backfilled.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._get_conn()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO catalog_state (key, value) VALUES ('backfilled', '1')")
+                conn.executemany(
+                    "INSERT OR IGNORE INTO documents "
+                    "(doc_id, title, department, access_level, source, chunk_count, ingested_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (d["doc_id"], d["title"], d["department"], d["access_level"],
+                         d.get("source"), d["chunk_count"], now)
+                        for d in documents
+                    ],
+                )
+        logger.info("[CATALOG] Backfilled %s documents from ChromaDB", len(documents))
+
+    # ── Reads ──
+
+    def list_documents(
+        self,
+        limit: int,
+        offset: int = 0,
+        department: Optional[str] = None,
+        access_level: Optional[str] = None,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Return (one page of documents in ingestion order, total matching).
+        department matches case-insensitively; access_level exactly.
+        """
+        clauses, params = [], []
+        if department:
+            clauses.append("department = ? COLLATE NOCASE")
+            params.append(department)
+        if access_level:
+            clauses.append("access_level = ?")
+            params.append(access_level)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            conn = self._get_conn()
+            total = conn.execute(f"SELECT COUNT(*) FROM documents {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM documents {where} "
+                f"ORDER BY ingested_at, doc_id LIMIT ? OFFSET ?",
+                [*params, limit, offset],
+            ).fetchall()
+
+        return [dict(zip(_COLUMNS, row)) for row in rows], total
+
+
+# ──────────────────────────────────────────────
+# Singleton instance
+# ──────────────────────────────────────────────
+
+document_catalog = DocumentCatalog(SQLITE_DB_PATH)
@@ -38,38 +38,95 @@ ChromaDB stores:
 ────────────────────────────────────────────────────────────────
 """
 
+import asyncio
+import hashlib
+import threading
+import uuid
+
 import chromadb
+import numpy as np
 from chromadb.config import Settings
 from langchain_chroma import Chroma
 from langchain_openai import OpenAIEmbeddings
 from langchain_core.documents import Document
-from typing import List, Dict, Optional, Any
+from langchain_core.embeddings import Embeddings
+from typing import List, Dict, Optional, Any, Tuple
 
 from app.config import (
     OPENAI_API_KEY, EMBEDDING_MODEL,
-    CHROMA_PERSIST_DIR, COLLECTION_NAME, TOP_K_RESULTS
+    CHROMA_PERSIST_DIR, COLLECTION_NAME, TOP_K_RESULTS, VECTOR_BACKEND,
+    EMBEDDING_CACHE_ENABLED, EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_ENTRIES,
 )
+from app.vector_store.catalog import document_catalog
+from app.vector_store.corpus_version import bump_corpus_version, get_corpus_version
+from app.vector_store.embedding_cache import CachedEmbeddings
+from app.vector_store.flat_index import FlatIndex
+from app.vector_store.keyword_index import BM25Index
 from app.observability.logger import logger
+from app.observability.metrics import EMBEDDING_LATENCY, VECTOR_STORE_LATENCY, register_stats
+from app.observability.tracing import traced
 
 
 # ──────────────────────────────────────────────
 # Embedding Model
 # ──────────────────────────────────────────────
 
-def get_embedding_function() -> OpenAIEmbeddings:
+_embedding_function: Optional[Embeddings] = None
+
+
+def get_embedding_function() -> Embeddings:
     """
     Return the embedding model used to convert text → vectors.
 
     We use OpenAI's text-embedding-ada-002 (1536 dimensions).
     This model is fast, cheap, and semantically rich.
 
-    To swap to a different provider, replace this function.
-    Example: return HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    The model is wrapped in a persistent CachedEmbeddings (see
+    embedding_cache.py) so unchanged text is never embedded twice.
+    One instance is shared per process, so ingestion and retrieval
+    read and write the same cache.
+
+    To swap to a different provider, replace the inner model.
+    Example: HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+    """
+    global _embedding_function
+    if _embedding_function is None:
+        embeddings: Embeddings = OpenAIEmbeddings(
+            model=EMBEDDING_MODEL,
+            openai_api_key=OPENAI_API_KEY
+        )
+        if EMBEDDING_CACHE_ENABLED:
+            embeddings = CachedEmbeddings(
+                underlying=embeddings,
+                model=EMBEDDING_MODEL,
+                db_path=EMBEDDING_CACHE_PATH,
+                max_entries=EMBEDDING_CACHE_MAX_ENTRIES,
+            )
+        _embedding_function = embeddings
+    return _embedding_function
+
+
+# ──────────────────────────────────────────────
+# Chunk IDs and Content Hashes
+# ──────────────────────────────────────────────
+
+def chunk_id(doc_id: str, chunk_index: int) -> str:
     """
-    return OpenAIEmbeddings(
-        model=EMBEDDING_MODEL,
-        openai_api_key=OPENAI_API_KEY
-    )
+    Deterministic ChromaDB ID for a chunk: "{doc_id}:{chunk_index}".
+
+    Because the ID is derivable from (doc_id, chunk_index), neighbors of a
+    matched chunk can be fetched by primary key in one batched get instead
+    of a metadata scan per document.
+    """
+    return f"{doc_id}:{chunk_index}"
+
+
+def content_hash(text: str) -> str:
+    """
+    sha256 of a chunk's text, stored in its metadata as "content_hash".
+    Re-ingestion compares hashes to reuse embeddings of unchanged chunks.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
 # ──────────────────────────────────────────────
@@ -82,11 +139,28 @@ class VectorStore:
       - Storing document chunks with metadata
       - Permission-filtered similarity search
       - Document listing and deletion
+
+    ChromaDB is always the system of record. When VECTOR_BACKEND=numpy,
+    similarity search is answered by an in-process FlatIndex (see
+    flat_index.py) loaded from the collection on first use and kept in
+    sync by add_documents / delete_document. The BM25 keyword index
+    (keyword_index.py) used by hybrid search is maintained the same way.
+
+    Every write bumps the corpus version. If the stored version moves
+    without a write from this process (e.g. ingest_sample_data.py ran
+    meanwhile), the in-process indexes are dropped and reloaded.
     """
 
-    def __init__(self):
+    def __init__(self, backend: str = VECTOR_BACKEND):
         self.embeddings = get_embedding_function()
+        self.backend = backend
         self._store: Optional[Chroma] = None
+        self._flat_index: Optional[FlatIndex] = None
+        self._flat_index_lock = threading.Lock()
+        self._keyword_index: Optional[BM25Index] = None
+        self._keyword_index_lock = threading.Lock()
+        # Corpus version the loaded in-process indexes reflect (None = none loaded)
+        self._indexes_version: Optional[int] = None
 
     def _get_store(self) -> Chroma:
         """
@@ -99,10 +173,82 @@ class VectorStore:
                 embedding_function=self.embeddings,
                 persist_directory=CHROMA_PERSIST_DIR,
             )
-            logger.info(f"[VECTOR_STORE] Connected to ChromaDB at '{CHROMA_PERSIST_DIR}'")
+            logger.info("[VECTOR_STORE] Connected to ChromaDB at '%s'", CHROMA_PERSIST_DIR)
         return self._store
 
-    def add_documents(self, documents: List[Document]) -> List[str]:
+    def _iter_collection(self, include: List[str], page_size: int = 5000):
+        """Yield the whole collection page by page to bound peak memory during loads."""
+        collection = self._get_store()._collection
+        offset = 0
+        while True:
+            page = collection.get(include=include, limit=page_size, offset=offset)
+            if not page["ids"]:
+                return
+            yield page
+            offset += len(page["ids"])
+
+    def _get_flat_index(self) -> FlatIndex:
+        """Lazily load every stored embedding into the in-process FlatIndex."""
+        if self._flat_index is None:
+            with self._flat_index_lock:
+                if self._flat_index is None:
+                    version = get_corpus_version()
+                    index = FlatIndex()
+                    for page in self._iter_collection(["embeddings", "documents", "metadatas"]):
+                        index.add(page["ids"], page["embeddings"], page["documents"], page["metadatas"])
+                    self._flat_index = index
+                    if self._indexes_version is None:
+                        self._indexes_version = version
+                    logger.info("[VECTOR_STORE] Loaded %s chunks into in-process flat index", len(index))
+        return self._flat_index
+
+    def _get_keyword_index(self) -> BM25Index:
+        """Lazily build the BM25 inverted index from every stored chunk text."""
+        if self._keyword_index is None:
+            with self._keyword_index_lock:
+                if self._keyword_index is None:
+                    version = get_corpus_version()
+                    index = BM25Index()
+                    for page in self._iter_collection(["documents", "metadatas"]):
+                        index.add(page["ids"], page["documents"], page["metadatas"])
+                    self._keyword_index = index
+                    if self._indexes_version is None:
+                        self._indexes_version = version
+                    logger.info("[VECTOR_STORE] Built BM25 keyword index over %s chunks", len(index))
+        return self._keyword_index
+
+    def _sync_local_indexes(self) -> None:
+        """Drop in-process indexes that another process's writes have made stale."""
+        if self._indexes_version is None:
+            return
+        current = get_corpus_version()
+        if current != self._indexes_version:
+            logger.info(
+                "[VECTOR_STORE] Corpus changed externally (v%s → v%s) — reloading in-process indexes",
+                self._indexes_version, current,
+            )
+            self._drop_local_indexes()
+
+    def _drop_local_indexes(self) -> None:
+        self._flat_index = None
+        self._keyword_index = None
+        self._indexes_version = None
+
+    def _after_write(self) -> None:
+        """
+        Bump the corpus version after a write. The in-process indexes were
+        updated by the write itself, so they stay valid unless some other
+        process also wrote in between (then the version jumped by more than 1).
+        """
+        version = bump_corpus_version()
+        if self._indexes_version is not None:
+            if version == self._indexes_version + 1:
+                self._indexes_version = version
+            else:
+                self._drop_local_indexes()
+
+    @traced("vector_store.add_documents", count_result=True)
+    def add_documents(self, documents: List[Document], ids: Optional[List[str]] = None) -> List[str]:
         """
         Add a list of LangChain Document objects to ChromaDB.
 
@@ -110,13 +256,93 @@ class VectorStore:
           - page_content: the text of the chunk
           - metadata: dict with doc_id, title, department, access_level
 
+        ids: optional explicit IDs (ingestion passes chunk_id(doc_id, index)).
+        Writes are upserts, so re-adding an existing ID replaces that chunk.
+
+        Embeddings are computed here (through the shared cache) and written
+        with the chunks, so the same vectors can also be appended to the
+        flat index without a second embedding call. The keyword index and
+        the corpus version (which invalidates cached retrieval results)
+        are updated too.
+
         Returns list of assigned IDs.
         """
-        store = self._get_store()
-        ids = store.add_documents(documents)
-        logger.info(f"[VECTOR_STORE] Added {len(documents)} chunks to ChromaDB")
+        if not documents:
+            return []
+
+        texts      = [doc.page_content for doc in documents]
+        metadatas  = [doc.metadata for doc in documents]
+        ids        = ids or [str(uuid.uuid4()) for _ in documents]
+        embeddings = self.embeddings.embed_documents(texts)
+
+        self.upsert_embedded(ids, texts, embeddings, metadatas)
         return ids
 
+    @traced("vector_store.upsert_embedded")
+    def upsert_embedded(
+        self,
+        ids: List[str],
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Store chunks whose embeddings were already computed (one upsert).
+
+        add_documents embeds then calls this; the bulk ingestion CLI embeds
+        in its own thread pool and calls it directly, so ChromaDB writes
+        stay batched and single-threaded.
+        """
+        if not ids:
+            return
+
+        collection = self._get_store()._collection
+        collection.upsert(ids=ids, embeddings=embeddings, documents=texts, metadatas=metadatas)
+        if self._flat_index is not None:
+            self._flat_index.add(ids, embeddings, texts, metadatas)
+        if self._keyword_index is not None:
+            self._keyword_index.add(ids, texts, metadatas)
+        self._after_write()
+
+        logger.info("[VECTOR_STORE] Added %s chunks to ChromaDB", len(ids))
+
+    @traced("vector_store.embed_query")
+    def embed_query(self, query: str) -> Optional[List[float]]:
+        """Embed a query (through the shared cache). Returns None on provider error."""
+        try:
+            with EMBEDDING_LATENCY.time(provider="openai", operation="query"):
+                return self.embeddings.embed_query(query)
+        except Exception as e:
+            logger.error(f"[VECTOR_STORE] Query embedding error: {e}")
+            return None
+
+    @traced("vector_store.aembed_query")
+    async def aembed_query(self, query: str) -> Optional[List[float]]:
+        """Async variant of embed_query."""
+        try:
+            with EMBEDDING_LATENCY.time(provider="openai", operation="query"):
+                return await self.embeddings.aembed_query(query)
+        except Exception as e:
+            logger.error(f"[VECTOR_STORE] Query embedding error: {e}")
+            return None
+
+    @traced("vector_store.aembed_queries", count_result=True)
+    async def aembed_queries(self, queries: List[str]) -> List[Optional[List[float]]]:
+        """
+        Embed several queries with ONE embed_documents request (used by
+        /ask_batch). On provider error every entry is None and callers fall
+        back to embedding per query.
+        """
+        if not queries:
+            return []
+        try:
+            with EMBEDDING_LATENCY.time(provider="openai", operation="query_batch"):
+                return await self.embeddings.aembed_documents(queries)
+        except Exception as e:
+            logger.error(f"[VECTOR_STORE] Batch query embedding error: {e}")
+            return [None] * len(queries)
+
+    @traced("vector_store.similarity_search", count_result=True)
     def similarity_search(
         self,
         query: str,
@@ -147,6 +373,10 @@ class VectorStore:
         allowed list.
         ────────────────────────────────────────────────────────
 
+        With VECTOR_BACKEND=numpy the same contract is honored by the
+        FlatIndex: the role's precomputed access-level mask excludes
+        disallowed chunks before top-k selection.
+
         Args:
             query: The user's question (will be embedded automatically)
             allowed_access_levels: List of access levels user can see
@@ -155,30 +385,87 @@ class VectorStore:
         Returns:
             List of dicts with 'content', 'metadata', 'score'
         """
+        # No allowed levels → return nothing (shouldn't reach LLM)
+        if not allowed_access_levels:
+            return []
+
+        query_embedding = self.embed_query(query)
+        if query_embedding is None:
+            return []
+
+        return self.similarity_search_by_vector(query_embedding, allowed_access_levels, k)
+
+    @traced("vector_store.asimilarity_search", count_result=True)
+    async def asimilarity_search(
+        self,
+        query: str,
+        allowed_access_levels: List[str],
+        k: int = TOP_K_RESULTS
+    ) -> List[Dict[str, Any]]:
+        """
+        Async variant of similarity_search for the non-blocking /ask path.
+
+        The query embedding is awaited on the provider's async client; the
+        index lookup itself is local CPU/disk work, so it runs in a worker
+        thread to keep the event loop free for other requests.
+        """
+        if not allowed_access_levels:
+            return []
+
+        query_embedding = await self.aembed_query(query)
+        if query_embedding is None:
+            return []
+
+        return await asyncio.to_thread(
+            self.similarity_search_by_vector, query_embedding, allowed_access_levels, k
+        )
+
+    @traced("vector_store.similarity_search_by_vector", count_result=True)
+    def similarity_search_by_vector(
+        self,
+        query_embedding: List[float],
+        allowed_access_levels: List[str],
+        k: int = TOP_K_RESULTS
+    ) -> List[Dict[str, Any]]:
+        """
+        Permission-filtered search with an already computed query embedding.
+        Same filter, result shape and scores as similarity_search.
+        """
+        if not allowed_access_levels:
+            return []
+
+        if self.backend == "numpy":
+            try:
+                self._sync_local_indexes()
+                with VECTOR_STORE_LATENCY.time(backend="numpy", operation="search"):
+                    return self._get_flat_index().search(query_embedding, allowed_access_levels, k)
+            except Exception as e:
+                logger.error(f"[VECTOR_STORE] Flat index search error: {e}")
+                return []
+
         store = self._get_store()
 
         # Build the permission filter for ChromaDB
         # This is injected into the vector DB query itself
-        if allowed_access_levels:
-            where_filter = {"access_level": {"$in": allowed_access_levels}}
-        else:
-            # No allowed levels → return nothing (shouldn't reach LLM)
-            return []
+        where_filter = {"access_level": {"$in": allowed_access_levels}}
 
         try:
-            # similarity_search_with_relevance_scores returns (Document, score) tuples
-            results = store.similarity_search_with_relevance_scores(
-                query=query,
-                k=k,
-                filter=where_filter
-            )
+            # The by-vector search returns raw distances; convert them with the
+            # same relevance function similarity_search_with_relevance_scores uses
+            with VECTOR_STORE_LATENCY.time(backend="chroma", operation="search"):
+                results = store.similarity_search_by_vector_with_relevance_scores(
+                    embedding=query_embedding,
+                    k=k,
+                    filter=where_filter
+                )
+            relevance_fn = store._select_relevance_score_fn()
 
             chunks = []
-            for doc, score in results:
+            for doc, distance in results:
                 chunks.append({
                     "content":     doc.page_content,
                     "metadata":    doc.metadata,
-                    "score":       round(score, 4),
+                    "score":       round(relevance_fn(distance), 4),
                 })
 
             return chunks
@@ -187,6 +474,76 @@ class VectorStore:
             logger.error(f"[VECTOR_STORE] Search error: {e}")
             return []
 
+    # ──────────────────────────────────────────────
+    # Keyword (BM25) Search — lexical leg of hybrid retrieval
+    # ──────────────────────────────────────────────
+
+    @traced("vector_store.keyword_search", count_result=True)
+    def keyword_search(
+        self,
+        query: str,
+        allowed_access_levels: List[str],
+        k: int = TOP_K_RESULTS,
+    ) -> List[Tuple[str, float]]:
+        """
+        BM25 search over chunk texts. Returns (chunk id, bm25 score) pairs,
+        best first, already restricted to allowed_access_levels.
+        """
+        if not allowed_access_levels:
+            return []
+        try:
+            self._sync_local_indexes()
+            with VECTOR_STORE_LATENCY.time(backend="bm25", operation="keyword_search"):
+                return self._get_keyword_index().search(query, allowed_access_levels, k)
+        except Exception as e:
+            logger.error(f"[VECTOR_STORE] Keyword search error: {e}")
+            return []
+
+    @traced("vector_store.get_scored_chunks", count_result=True)
+    def get_scored_chunks(
+        self,
+        ids: List[str],
+        query_embedding: List[float],
+        allowed_access_levels: List[str],
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch chunks by ID and score them against a query embedding.
+
+        Used for hybrid hits that only the keyword leg found: their
+        'score' is the same vector relevance score similarity_search
+        would have given them, so downstream thresholds (citations) keep
+        working. Access level is re-checked on every chunk.
+
+        Returns {id: {'content', 'metadata', 'score'}} for the ids found.
+        """
+        if not ids or not allowed_access_levels:
+            return {}
+
+        try:
+            store = self._get_store()
+            with VECTOR_STORE_LATENCY.time(backend="chroma", operation="fetch_scored"):
+                result = store._collection.get(ids=ids, include=["documents", "metadatas", "embeddings"])
+            relevance_fn = store._select_relevance_score_fn()
+        except Exception as e:
+            logger.error(f"[VECTOR_STORE] get_scored_chunks error: {e}")
+            return {}
+
+        allowed = set(allowed_access_levels)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        scored: Dict[str, Dict[str, Any]] = {}
+        for cid, content, meta, embedding in zip(
+            result["ids"], result["documents"], result["metadatas"], result["embeddings"]
+        ):
+            if meta.get("access_level") not in allowed:
+                continue
+            diff = np.asarray(embedding, dtype=np.float32) - query
+            scored[cid] = {
+                "content":  content,
+                "metadata": meta,
+                "score":    round(relevance_fn(float(diff @ diff)), 4),
+            }
+        return scored
+
     # ──────────────────────────────────────────────
     # Sentence Window Retrieval — Neighbor Fetching
     #
@@ -202,6 +559,7 @@ class VectorStore:
     #   - Reading  : wide passage         → complete context for the LLM
     # ──────────────────────────────────────────────
 
+    @traced("vector_store.fetch_neighbors", count_result=True)
     def fetch_neighbors(
         self,
         doc_id: str,
@@ -243,10 +601,11 @@ class VectorStore:
                 ]
             }
 
-            result = collection.get(
-                where=where_filter,
-                include=["documents", "metadatas"]
-            )
+            with VECTOR_STORE_LATENCY.time(backend="chroma", operation="fetch_neighbors"):
+                result = collection.get(
+                    where=where_filter,
+                    include=["documents", "metadatas"]
+                )
 
             # documents and metadatas lists are positionally aligned
             neighbors = []
@@ -262,20 +621,106 @@ class VectorStore:
             logger.error(f"[VECTOR_STORE] fetch_neighbors error doc_id={doc_id}: {e}")
             return []
 
-    def list_documents(self) -> List[Dict]:
+    @traced("vector_store.fetch_neighbor_windows", count_result=True)
+    def fetch_neighbor_windows(
+        self,
+        windows: List[Tuple[str, int, int]],
+        allowed_access_levels: List[str],
+    ) -> Dict[Tuple[str, int, int], List[tuple]]:
         """
-        Return a summary of all stored documents.
-        Groups chunks by doc_id to show one entry per document.
+        Fetch several (doc_id, start_index, end_index) windows in ONE round trip.
+
+        Every chunk in every window has a known ID (chunk_id), so all of them
+        are requested with a single collection.get(ids=[...]) — a primary-key
+        lookup — instead of one $and metadata scan per window.
+
+        IDs past the end of a document simply come back missing. The access
+        level of every returned chunk is re-checked against
+        allowed_access_levels (defense-in-depth, as in fetch_neighbors).
+
+        Returns:
+            {window: [(chunk_index, content), ...] sorted by chunk_index}.
+            A window maps to [] when none of its chunks were found
+            (e.g. documents ingested before deterministic IDs) or on error.
         """
-        store = self._get_store()
+        result_map: Dict[Tuple[str, int, int], List[tuple]] = {w: [] for w in windows}
+        if not windows or not allowed_access_levels:
+            return result_map
+
+        wanted = list(dict.fromkeys(
+            chunk_id(doc_id, idx)
+            for doc_id, start, end in windows
+            for idx in range(start, end + 1)
+        ))
+
         try:
-            # Get all items from the collection
-            collection = store._collection
-            result = collection.get(include=["metadatas"])
+            collection = self._get_store()._collection
+            with VECTOR_STORE_LATENCY.time(backend="chroma", operation="fetch_windows"):
+                result = collection.get(ids=wanted, include=["documents", "metadatas"])
+        except Exception as e:
+            logger.error(f"[VECTOR_STORE] fetch_neighbor_windows error: {e}")
+            return result_map
+
+        allowed = set(allowed_access_levels)
+        by_doc: Dict[str, Dict[int, str]] = {}
+        for content, meta in zip(result["documents"], result["metadatas"]):
+            if meta.get("access_level") not in allowed:
+                continue
+            by_doc.setdefault(meta.get("doc_id"), {})[meta.get("chunk_index", 0)] = content
+
+        for window in windows:
+            doc_id, start, end = window
+            chunks = by_doc.get(doc_id, {})
+            result_map[window] = sorted(
+                (idx, content) for idx, content in chunks.items() if start <= idx <= end
+            )
 
-            # Group by doc_id
-            doc_map: Dict[str, Dict] = {}
-            for meta in result["metadatas"]:
+        return result_map
+
+    def embedding_cache_stats(self) -> Optional[Dict[str, float]]:
+        """Hit/miss counters of the embedding cache, or None when it is disabled."""
+        if isinstance(self.embeddings, CachedEmbeddings):
+            return self.embeddings.stats()
+        return None
+
+    @traced("vector_store.list_documents", count_result=True)
+    def list_documents(
+        self,
+        limit: int = 50,
+        offset: int = 0,
+        department: Optional[str] = None,
+        access_level: Optional[str] = None,
+    ) -> Tuple[List[Dict], int]:
+        """
+        Return (one page of document summaries, total matching documents).
+
+        Served from the SQLite document catalog (catalog.py), so the cost
+        depends on the page size rather than the number of stored chunks.
+        Blocking: async callers run it in a thread.
+        """
+        try:
+            self.backfill_catalog()   # no-op once the startup backfill has run
+            return document_catalog.list_documents(limit, offset, department, access_level)
+        except Exception as e:
+            logger.error(f"[VECTOR_STORE] List error: {e}")
+            return [], 0
+
+    def backfill_catalog(self) -> None:
+        """
+        Add documents ingested before the catalog existed, once per database.
+        Scans every chunk's metadata: called at startup, off the event loop.
+        """
+        if document_catalog.needs_backfill():
+            document_catalog.backfill(self._scan_documents())
+
+    def _scan_documents(self) -> List[Dict]:
+        """
+        Group every chunk's metadata by doc_id (one entry per document).
+        Reads the whole collection — only used to backfill the catalog.
+        """
+        doc_map: Dict[str, Dict] = {}
+        for page in self._iter_collection(["metadatas"]):
+            for meta in page["metadatas"]:
                 doc_id = meta.get("doc_id", "unknown")
                 if doc_id not in doc_map:
                     doc_map[doc_id] = {
@@ -283,16 +728,71 @@ class VectorStore:
                         "title":        meta.get("title", "Unknown"),
                         "department":   meta.get("department", "Unknown"),
                         "access_level": meta.get("access_level", "public"),
+                        "source":       meta.get("source"),
                         "chunk_count":  0,
                     }
                 doc_map[doc_id]["chunk_count"] += 1
 
-            return list(doc_map.values())
+        return list(doc_map.values())
 
-        except Exception as e:
-            logger.error(f"[VECTOR_STORE] List error: {e}")
-            return []
+    # ──────────────────────────────────────────────
+    # Per-document chunk access (incremental re-ingestion)
+    # ──────────────────────────────────────────────
+
+    @traced("vector_store.get_chunk_hashes", count_result=True)
+    def get_chunk_hashes(self, doc_id: str) -> Dict[str, str]:
+        """
+        Return {chunk id: content_hash} for every stored chunk of doc_id.
 
+        Only metadata is read. Chunks stored before content hashes existed
+        have their hash computed from their text (fetched for those only).
+        """
+        collection = self._get_store()._collection
+        result = collection.get(where={"doc_id": doc_id}, include=["metadatas"])
+
+        hashes: Dict[str, str] = {}
+        legacy: List[str] = []
+        for cid, meta in zip(result["ids"], result["metadatas"]):
+            if meta.get("content_hash"):
+                hashes[cid] = meta["content_hash"]
+            else:
+                legacy.append(cid)
+
+        if legacy:
+            texts = collection.get(ids=legacy, include=["documents"])
+            for cid, content in zip(texts["ids"], texts["documents"]):
+                hashes[cid] = content_hash(content)
+        return hashes
+
+    @traced("vector_store.get_chunks", count_result=True)
+    def get_chunks(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Fetch chunks by ID: {id: {'content', 'metadata', 'embedding'}} for the ids found."""
+        if not ids:
+            return {}
+        collection = self._get_store()._collection
+        result = collection.get(ids=ids, include=["documents", "metadatas", "embeddings"])
+        return {
+            cid: {"content": content, "metadata": meta, "embedding": embedding}
+            for cid, content, meta, embedding in zip(
+                result["ids"], result["documents"], result["metadatas"], result["embeddings"]
+            )
+        }
+
+    @traced("vector_store.delete_chunks")
+    def delete_chunks(self, ids: List[str]) -> int:
+        """Remove specific chunks from ChromaDB and the in-process indexes."""
+        if not ids:
+            return 0
+        self._get_store()._collection.delete(ids=ids)
+        if self._flat_index is not None:
+            self._flat_index.remove(ids)
+        if self._keyword_index is not None:
+            self._keyword_index.remove(ids)
+        # Cached retrieval results may reference the deleted chunks
+        self._after_write()
+        return len(ids)
+
+    @traced("vector_store.delete_document")
     def delete_document(self, doc_id: str) -> int:
         """Remove all chunks for a given doc_id. Returns chunks deleted."""
         store = self._get_store()
@@ -300,9 +800,9 @@ class VectorStore:
             collection = store._collection
             result = collection.get(where={"doc_id": doc_id}, include=[])
             ids = result["ids"]
-            if ids:
-                collection.delete(ids=ids)
-            logger.info(f"[VECTOR_STORE] Deleted {len(ids)} chunks for doc_id={doc_id}")
+            self.delete_chunks(ids)
+            document_catalog.delete_document(doc_id)
+            logger.info("[VECTOR_STORE] Deleted %s chunks for doc_id=%s", len(ids), doc_id)
             return len(ids)
         except Exception as e:
             logger.error(f"[VECTOR_STORE] Delete error: {e}")
@@ -314,3 +814,4 @@ class VectorStore:
 # ──────────────────────────────────────────────
 
 vector_store = VectorStore()
+register_stats("rag_embedding_cache", vector_store.embedding_cache_stats)
@@ -0,0 +1,60 @@
+"""
+app/vector_store/corpus_version.py — Corpus Version Counter
+
+A single integer that changes whenever the set of stored chunks changes
+(ingestion or deletion). Caches of retrieval results stamp their entries
+with the version they were computed at; an entry from an older version
+is stale and is never served.
+
+The counter lives in SQLite (SQLITE_DB_PATH) rather than in memory so
+that a re-ingest from a separate process (e.g. ingest_sample_data.py)
+invalidates the caches of a running API server too.
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+from app.config import SQLITE_DB_PATH
+from app.observability.logger import logger
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS corpus_state (
+    id       INTEGER PRIMARY KEY CHECK (id = 1),
+    version  INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO corpus_state (id, version) VALUES (1, 0);
+"""
+
+_lock = threading.Lock()
+_conn: Optional[sqlite3.Connection] = None
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn
+    if _conn is None:
+        directory = os.path.dirname(SQLITE_DB_PATH)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        _conn = sqlite3.connect(SQLITE_DB_PATH, check_same_thread=False)
+        _conn.executescript(_SCHEMA)
+    return _conn
+
+
+def get_corpus_version() -> int:
+    """Return the current corpus version (0 for a fresh database)."""
+    with _lock:
+        return _get_conn().execute("SELECT version FROM corpus_state WHERE id = 1").fetchone()[0]
+
+
+def bump_corpus_version() -> int:
+    """Atomically increment the corpus version and return the new value."""
+    with _lock:
+        conn = _get_conn()
+        with conn:
+            conn.execute("UPDATE corpus_state SET version = version + 1 WHERE id = 1")
+        version = conn.execute("SELECT version FROM corpus_state WHERE id = 1").fetchone()[0]
+    logger.debug("[CORPUS] version bumped to %s", version)
+    return version
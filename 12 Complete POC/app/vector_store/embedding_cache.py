@@ -0,0 +1,286 @@
+"""
+app/vector_store/embedding_cache.py — Persistent Embedding Cache
+
+[Concept: Caching Expensive Model Calls]
+
+────────────────────────────────────────────────────────────────
+WHY CACHE EMBEDDINGS?
+────────────────────────────────────────────────────────────────
+Every embedding is a network round-trip to the embedding provider,
+and the result for a given (model, text) pair NEVER changes:
+
+  embed("How many vacation days?")  → [0.021, -0.143, ...]   (today)
+  embed("How many vacation days?")  → [0.021, -0.143, ...]   (tomorrow)
+
+Without a cache we pay for the same vector again on:
+  - every re-run of ingest_sample_data.py
+  - every re-ingest of an unchanged document via /ingest_document
+  - every repeated /ask question
+
+This module wraps any LangChain Embeddings object with a
+CONTENT-ADDRESSED cache stored in SQLite on disk:
+
+  key   = (model name, sha256(text))
+  value = float32 vector bytes
+
+  - Content-addressed: identical text → identical key, regardless
+    of which document or user produced it.
+  - Persistent: survives server restarts and is shared between the
+    ingestion script and the API server.
+  - Bounded: once max_entries is exceeded, the LEAST RECENTLY USED
+    entries are evicted (LRU), so the file cannot grow forever.
+────────────────────────────────────────────────────────────────
+"""
+
+import asyncio
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from app.observability.logger import logger
+from app.observability.tracing import set_span_attributes
+
+
+# ──────────────────────────────────────────────
+# Schema
+# ──────────────────────────────────────────────
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embedding_cache (
+    model      TEXT NOT NULL,
+    text_hash  TEXT NOT NULL,
+    vector     BLOB NOT NULL,
+    last_used  REAL NOT NULL,
+    PRIMARY KEY (model, text_hash)
+);
+CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used
+    ON embedding_cache (last_used);
+"""
+
+
+def _hash_text(text: str) -> str:
+    """sha256 of the exact text — the content address of an embedding."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _to_blob(vector: List[float]) -> bytes:
+    # float32 matches the precision ChromaDB stores vectors at
+    return array("f", vector).tobytes()
+
+
+def _from_blob(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+# ──────────────────────────────────────────────
+# Cached Embeddings Wrapper
+# ──────────────────────────────────────────────
+
+class CachedEmbeddings(Embeddings):
+    """
+    Drop-in replacement for any LangChain Embeddings object.
+
+    Both embed_documents and embed_query consult the cache first and
+    only send cache MISSES to the underlying provider. Batches keep
+    their order: a batch of 10 texts with 7 hits makes ONE provider
+    call for the remaining 3.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model: str,
+        db_path: str,
+        max_entries: int,
+    ):
+        self.underlying  = underlying
+        self.model       = model
+        self.db_path     = db_path
+        self.max_entries = max_entries
+
+        self.hits      = 0
+        self.misses    = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._entry_count: Optional[int] = None
+
+    # ── Storage ──
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Lazily open the SQLite file (creating its directory if needed)."""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            # WAL lets the ingestion script and the API server share the file
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._entry_count = conn.execute(
+                "SELECT COUNT(*) FROM embedding_cache"
+            ).fetchone()[0]
+            logger.info(
+                "[EMBED_CACHE] Opened '%s' (%s entries, max=%s)",
+                self.db_path, self._entry_count, self.max_entries,
+            )
+        return self._conn
+
+    def _lookup(self, hashes: List[str]) -> Dict[str, List[float]]:
+        """Fetch cached vectors for the given hashes and refresh their LRU stamp."""
+        if not hashes:
+            return {}
+
+        found: Dict[str, List[float]] = {}
+        with self._lock:
+            conn = self._get_conn()
+            unique = list(dict.fromkeys(hashes))
+            # Stay under SQLite's bound-parameter limit on large batches
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT text_hash, vector FROM embedding_cache "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [self.model, *batch],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = _from_blob(blob)
+
+            if found:
+                now = time.time()
+                conn.executemany(
+                    "UPDATE embedding_cache SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, self.model, h) for h in found],
+                )
+                conn.commit()
+
+        return found
+
+    def _store(self, items: List[Tuple[str, List[float]]]) -> None:
+        """Insert freshly computed vectors, then evict LRU entries over the bound."""
+        if not items:
+            return
+
+        with self._lock:
+            conn = self._get_conn()
+            now = time.time()
+            conn.executemany(
+                "INSERT OR IGNORE INTO embedding_cache (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [(self.model, h, _to_blob(v), now) for h, v in items],
+            )
+            # The insert holds the write lock until commit, so this count
+            # includes rows added by other processes sharing the file
+            self._entry_count = conn.execute("SELECT COUNT(*) FROM embedding_cache").fetchone()[0]
+
+            overflow = self._entry_count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    "DELETE FROM embedding_cache WHERE rowid IN ("
+                    "  SELECT rowid FROM embedding_cache ORDER BY last_used ASC LIMIT ?"
+                    ")",
+                    (overflow,),
+                )
+                self._entry_count -= overflow
+                self.evictions += overflow
+                logger.debug("[EMBED_CACHE] Evicted %s least-recently-used entries", overflow)
+
+            conn.commit()
+
+    def _split(self, texts: List[str]) -> Tuple[List[str], Dict[str, List[float]], List[str]]:
+        """Return (hashes, cached vectors by hash, texts that still need embedding)."""
+        hashes = [_hash_text(t) for t in texts]
+        cached = self._lookup(hashes)
+
+        missing: List[str] = []
+        seen = set(cached)
+        for text, text_hash in zip(texts, hashes):
+            if text_hash not in seen:
+                missing.append(text)
+                seen.add(text_hash)
+
+        # Repeats inside one batch are embedded once, so they count as hits
+        with self._lock:
+            self.hits   += len(texts) - len(missing)
+            self.misses += len(missing)
+        set_span_attributes({
+            "embedding.cache_hits":   len(texts) - len(missing),
+            "embedding.cache_misses": len(missing),
+        })
+        return hashes, cached, missing
+
+    def _merge(
+        self,
+        hashes: List[str],
+        cached: Dict[str, List[float]],
+        missing: List[str],
+        computed: List[List[float]],
+    ) -> List[List[float]]:
+        fresh = [(_hash_text(t), v) for t, v in zip(missing, computed)]
+        self._store(fresh)
+        cached.update(fresh)
+        logger.debug(
+            "[EMBED_CACHE] batch=%s | provider_calls_for=%s texts", len(hashes), len(missing),
+        )
+        return [cached[h] for h in hashes]
+
+    # ── Embeddings interface ──
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = self._split(texts)
+        computed = self.underlying.embed_documents(missing) if missing else []
+        return self._merge(hashes, cached, missing, computed)
+
+    def embed_query(self, text: str) -> List[float]:
+        hashes, cached, missing = self._split([text])
+        computed = [self.underlying.embed_query(text)] if missing else []
+        return self._merge(hashes, cached, missing, computed)[0]
+
+    # The async variants run the SQLite lookup and store in a worker thread:
+    # a hit is a SELECT + UPDATE + commit under self._lock, which an ingestion
+    # thread may hold for a whole batch insert. The event loop must not wait.
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        hashes, cached, missing = await asyncio.to_thread(self._split, texts)
+        computed = await self.underlying.aembed_documents(missing) if missing else []
+        return await self._amerge(hashes, cached, missing, computed)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        hashes, cached, missing = await asyncio.to_thread(self._split, [text])
+        computed = [await self.underlying.aembed_query(text)] if missing else []
+        return (await self._amerge(hashes, cached, missing, computed))[0]
+
+    async def _amerge(
+        self,
+        hashes: List[str],
+        cached: Dict[str, List[float]],
+        missing: List[str],
+        computed: List[List[float]],
+    ) -> List[List[float]]:
+        if not missing:
+            return self._merge(hashes, cached, missing, computed)   # nothing to store
+        return await asyncio.to_thread(self._merge, hashes, cached, missing, computed)
+
+    # ── Reporting ──
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters for this process (entries is the on-disk total at the last write)."""
+        lookups = self.hits + self.misses
+        return {
+            "hits":      self.hits,
+            "misses":    self.misses,
+            "hit_rate":  round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries":   self._entry_count or 0,
+        }
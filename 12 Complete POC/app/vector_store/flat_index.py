@@ -0,0 +1,221 @@
+"""
+app/vector_store/flat_index.py — In-Process Flat (Exact) Vector Index
+
+[Concept: Brute-Force Search Can Beat ANN at Small Scale]
+
+────────────────────────────────────────────────────────────────
+WHY A FLAT INDEX?
+────────────────────────────────────────────────────────────────
+ChromaDB answers every query with an HNSW graph walk plus a
+metadata WHERE filter ({"access_level": {"$in": [...]}}).
+That machinery pays off at millions of vectors. For a corpus of
+up to a few hundred thousand chunks, a single matrix multiply is
+both EXACT and faster:
+
+  M  = all chunk embeddings, one contiguous float32 matrix (n × d)
+  q  = query embedding (d)
+  M @ q                  → n dot products in one BLAS call
+  mask[access_level]     → one precomputed boolean array per level
+  argpartition(dist, k)  → top-k in O(n), no full sort
+
+Permission filtering is a vectorized AND with the role's mask, so
+disallowed chunks are excluded before ranking — they can never
+appear in the top-k, exactly like the ChromaDB WHERE filter.
+
+Scores use the same formula as the ChromaDB backend (LangChain's
+relevance score for ChromaDB's squared-L2 distance), so callers
+see identical result shapes and comparable numbers:
+
+  distance = ||m||² - 2·(m·q) + ||q||²
+  score    = 1 - distance / √2
+────────────────────────────────────────────────────────────────
+"""
+
+import math
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class FlatIndex:
+    """
+    Exact top-k search over a growable float32 matrix.
+
+    Rows are appended with add() and dropped with remove(). Storage
+    grows geometrically (like a Python list) so repeated ingestion
+    does not copy the whole matrix on every call.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._size = 0
+        self._matrix: Optional[np.ndarray] = None     # (capacity, dim) float32
+        self._norms2: Optional[np.ndarray] = None     # (capacity,) squared row norms
+        self._ids:       List[str] = []
+        self._contents:  List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._row_of: Dict[str, int] = {}
+        # One boolean mask per access level, aligned with matrix rows
+        self._level_masks: Dict[str, np.ndarray] = {}
+        # Cache of OR-ed masks per allowed-levels combination (cleared on mutation)
+        self._combined_masks: Dict[Tuple[str, ...], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ──────────────────────────────────────────────
+    # Mutation
+    # ──────────────────────────────────────────────
+
+    def _ensure_capacity(self, needed: int, dim: int) -> None:
+        if self._matrix is None:
+            capacity = max(needed, 1024)
+            self._matrix = np.empty((capacity, dim), dtype=np.float32)
+            self._norms2 = np.empty(capacity, dtype=np.float32)
+            return
+
+        if self._matrix.shape[1] != dim:
+            raise ValueError(
+                f"Embedding dimension mismatch: index has {self._matrix.shape[1]}, got {dim}"
+            )
+
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+
+        new_capacity = max(needed, capacity * 2)
+        matrix = np.empty((new_capacity, dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        norms2 = np.empty(new_capacity, dtype=np.float32)
+        norms2[:self._size] = self._norms2[:self._size]
+        self._matrix, self._norms2 = matrix, norms2
+
+        for level, mask in self._level_masks.items():
+            grown = np.zeros(new_capacity, dtype=bool)
+            grown[:self._size] = mask[:self._size]
+            self._level_masks[level] = grown
+
+    def add(
+        self,
+        ids: Sequence[str],
+        embeddings: Sequence[Sequence[float]],
+        contents: Sequence[str],
+        metadatas: Sequence[Dict[str, Any]],
+    ) -> None:
+        """Append rows. Existing ids are replaced (upsert semantics, like ChromaDB)."""
+        if not ids:
+            return
+
+        with self._lock:
+            existing = [i for i in ids if i in self._row_of]
+            if existing:
+                self.remove(existing)
+
+            vectors = np.asarray(embeddings, dtype=np.float32)
+            start, end = self._size, self._size + len(ids)
+            self._ensure_capacity(end, vectors.shape[1])
+
+            self._matrix[start:end] = vectors
+            self._norms2[start:end] = np.einsum("ij,ij->i", vectors, vectors)
+
+            for offset, (chunk_id, content, meta) in enumerate(zip(ids, contents, metadatas)):
+                row = start + offset
+                level = meta.get("access_level", "public")
+                if level not in self._level_masks:
+                    self._level_masks[level] = np.zeros(self._matrix.shape[0], dtype=bool)
+                self._level_masks[level][row] = True
+                self._row_of[chunk_id] = row
+
+            self._ids.extend(ids)
+            self._contents.extend(contents)
+            self._metadatas.extend(dict(m) for m in metadatas)
+            self._size = end
+            self._combined_masks.clear()
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Drop rows by id, compacting the matrix. Returns the number removed."""
+        with self._lock:
+            rows = [self._row_of[i] for i in ids if i in self._row_of]
+            if not rows:
+                return 0
+
+            keep = np.ones(self._size, dtype=bool)
+            keep[rows] = False
+            kept = int(keep.sum())
+
+            self._matrix[:kept] = self._matrix[:self._size][keep]
+            self._norms2[:kept] = self._norms2[:self._size][keep]
+            for level, mask in self._level_masks.items():
+                compacted = np.zeros_like(mask)
+                compacted[:kept] = mask[:self._size][keep]
+                self._level_masks[level] = compacted
+
+            keep_list = keep.tolist()
+            self._ids       = [v for v, k in zip(self._ids, keep_list) if k]
+            self._contents  = [v for v, k in zip(self._contents, keep_list) if k]
+            self._metadatas = [v for v, k in zip(self._metadatas, keep_list) if k]
+            self._row_of    = {chunk_id: row for row, chunk_id in enumerate(self._ids)}
+            self._size = kept
+            self._combined_masks.clear()
+            return len(rows)
+
+    # ──────────────────────────────────────────────
+    # Search
+    # ──────────────────────────────────────────────
+
+    def _allowed_mask(self, allowed_access_levels: List[str]) -> np.ndarray:
+        key = tuple(sorted(set(allowed_access_levels)))
+        mask = self._combined_masks.get(key)
+        if mask is None:
+            mask = np.zeros(self._size, dtype=bool)
+            for level in key:
+                level_mask = self._level_masks.get(level)
+                if level_mask is not None:
+                    mask |= level_mask[:self._size]
+            self._combined_masks[key] = mask
+        return mask
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        allowed_access_levels: List[str],
+        k: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Return the k nearest permitted chunks, best first.
+
+        Same contract as VectorStore.similarity_search: an empty
+        allowed_access_levels list returns [] and each result is a
+        dict with 'content', 'metadata' and 'score'.
+        """
+        if not allowed_access_levels or k <= 0:
+            return []
+
+        with self._lock:
+            if self._size == 0:
+                return []
+
+            mask = self._allowed_mask(allowed_access_levels)
+            permitted = int(mask.sum())
+            if permitted == 0:
+                return []
+
+            q = np.asarray(query_embedding, dtype=np.float32)
+            # Squared L2 distance via one matmul: ||m||² - 2 m·q + ||q||²
+            dists = self._norms2[:self._size] - 2.0 * (self._matrix[:self._size] @ q)
+            dists += float(q @ q)
+            dists[~mask] = np.inf
+
+            top_k = min(k, permitted)
+            candidates = np.argpartition(dists, top_k - 1)[:top_k]
+            ordered = candidates[np.argsort(dists[candidates])]
+
+            return [
+                {
+                    "content":  self._contents[row],
+                    "metadata": dict(self._metadatas[row]),
+                    "score":    round(1.0 - float(dists[row]) / math.sqrt(2), 4),
+                }
+                for row in ordered.tolist()
+            ]
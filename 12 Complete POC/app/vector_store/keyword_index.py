@@ -0,0 +1,143 @@
+"""
+app/vector_store/keyword_index.py — In-Process BM25 Inverted Index
+
+[Concept: Hybrid Search — Lexical + Semantic]
+
+────────────────────────────────────────────────────────────────
+WHY A KEYWORD INDEX NEXT TO THE VECTORS?
+────────────────────────────────────────────────────────────────
+Embeddings capture MEANING, but policy questions often hinge on an
+exact TERM that carries little semantic weight on its own:
+
+  "What is the per diem for Berlin?"
+  "Do I need the VPN from home?"
+  "Which salary band is L3?"
+
+ada-002 may rank a generic "travel expenses" chunk above the one
+that literally says "per diem". BM25 scores the opposite way: rare
+terms that appear in a chunk dominate its score.
+
+  idf(t)      = ln(1 + (N - df + 0.5) / (df + 0.5))
+  score(c, q) = Σ idf(t) · tf·(k1+1) / (tf + k1·(1 - b + b·len/avg_len))
+
+The index is an INVERTED index: term → {chunk id → term frequency}.
+A query only touches the posting lists of its own terms, so search
+cost depends on how common the query's words are, not on corpus size.
+
+Permission filtering happens inside the scoring loop: postings of
+chunks whose access_level is not allowed are skipped, so they can
+never be returned — the same guarantee as the vector leg's WHERE filter.
+────────────────────────────────────────────────────────────────
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Sequence, Tuple
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Very common words carry no ranking signal and only lengthen posting lists
+_STOPWORDS = frozenset("""
+a an and are as at be by can do does for from has have how i if in is it its
+my of on or our should that the their there this to was we what when where
+which who will with you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric terms, stopwords removed ("L3" → "l3", "per diem" → "per", "diem")."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over chunk texts, keyed by the same IDs as ChromaDB.
+
+    Only ids, term frequencies, lengths and access levels are held in
+    memory — chunk text and metadata stay in ChromaDB.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b  = b
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Dict[str, int]] = {}   # term → {chunk id → tf}
+        self._terms:    Dict[str, Counter] = {}          # chunk id → its term counts
+        self._lengths:  Dict[str, int] = {}              # chunk id → token count
+        self._levels:   Dict[str, str] = {}              # chunk id → access_level
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    # ──────────────────────────────────────────────
+    # Mutation
+    # ──────────────────────────────────────────────
+
+    def add(self, ids: Sequence[str], contents: Sequence[str], metadatas: Sequence[Dict]) -> None:
+        """Index chunks. Existing ids are re-indexed (upsert semantics, like ChromaDB)."""
+        with self._lock:
+            self.remove([i for i in ids if i in self._lengths])
+            for chunk_id, content, meta in zip(ids, contents, metadatas):
+                terms = Counter(tokenize(content))
+                for term, tf in terms.items():
+                    self._postings.setdefault(term, {})[chunk_id] = tf
+                self._terms[chunk_id]   = terms
+                self._lengths[chunk_id] = sum(terms.values())
+                self._levels[chunk_id]  = meta.get("access_level", "public")
+                self._total_length += self._lengths[chunk_id]
+
+    def remove(self, ids: Sequence[str]) -> int:
+        """Drop chunks by id. Returns the number removed."""
+        removed = 0
+        with self._lock:
+            for chunk_id in ids:
+                terms = self._terms.pop(chunk_id, None)
+                if terms is None:
+                    continue
+                for term in terms:
+                    postings = self._postings[term]
+                    del postings[chunk_id]
+                    if not postings:
+                        del self._postings[term]
+                self._total_length -= self._lengths.pop(chunk_id)
+                del self._levels[chunk_id]
+                removed += 1
+        return removed
+
+    # ──────────────────────────────────────────────
+    # Search
+    # ──────────────────────────────────────────────
+
+    def search(self, query: str, allowed_access_levels: List[str], k: int) -> List[Tuple[str, float]]:
+        """
+        Return up to k (chunk id, bm25 score) pairs, best first,
+        restricted to chunks whose access_level is allowed.
+        """
+        if not allowed_access_levels or k <= 0:
+            return []
+
+        allowed = set(allowed_access_levels)
+        with self._lock:
+            n = len(self._lengths)
+            if n == 0:
+                return []
+            avg_length = self._total_length / n
+
+            scores: Dict[str, float] = {}
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, tf in postings.items():
+                    if self._levels[chunk_id] not in allowed:
+                        continue
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[chunk_id] / avg_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
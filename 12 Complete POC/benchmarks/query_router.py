@@ -0,0 +1,129 @@
+"""
+benchmarks/query_router.py — Embedding Router vs LLM Classifier Report
+
+Scores the three ways classify_query can route a query against the
+expected "route" of every query in demo_queries.py (guardrail-blocked
+demos have no route and are skipped):
+
+  - router:  nearest route centroid only (query_router.py)
+  - llm:     the structured-output LLM call only (route + arguments)
+  - hybrid:  what classify_query does with ROUTER_ENABLED — a confident
+             router settles "rag" and "list"; everything else (tool
+             routes, low margins) takes the one LLM call
+
+Latency is measured per query over --repeat runs:
+
+  - embed:   embedding the query, bypassing the embedding cache. On
+             the RAG path this is NOT extra work — retrieval reuses
+             the vector — so the router's own added cost is "route".
+  - route:   nearest-centroid lookup
+  - llm:     one structured classification call
+
+Needs OPENAI_API_KEY (and ANTHROPIC_API_KEY with LLM_PROVIDER=anthropic).
+
+Usage:
+    python benchmarks/query_router.py
+    python benchmarks/query_router.py --repeat 5 --threshold 0.03
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import ROUTER_CONFIDENCE_THRESHOLD
+from app.agents.knowledge_agent import _get_decision_llm, _classification_messages, NO_ARGUMENT_ROUTES
+from app.agents.query_router import query_router
+from app.vector_store.chroma_store import vector_store
+from demo_queries import DEMO_QUERIES
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def llm_classify(llm, query: str) -> str:
+    return llm.invoke(_classification_messages(query)).route
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat",    type=int,   default=3, help="Timed runs per query")
+    parser.add_argument("--threshold", type=float, default=ROUTER_CONFIDENCE_THRESHOLD,
+                        help="Router margin below which the LLM decides")
+    args = parser.parse_args()
+
+    cases = [(demo["query"], demo["route"]) for demo in DEMO_QUERIES if demo.get("route")]
+    # Bypass the embedding cache so embed timings are real API round trips
+    raw_embeddings = getattr(vector_store.embeddings, "underlying", vector_store.embeddings)
+    llm = _get_decision_llm()
+
+    t0 = time.perf_counter()
+    query_router.warm_up()
+    warm_up = time.perf_counter() - t0
+
+    print("=" * 78)
+    print("  Query Router Report — nearest-centroid router vs LLM classifier")
+    print(f"  queries={len(cases)}  repeat={args.repeat}  threshold={args.threshold}  "
+          f"centroid warm-up={warm_up:.2f}s")
+    print("=" * 78)
+    print(f"  {'expected':<10} {'router':<10} {'margin':>7} {'llm':<10} {'hybrid':<10}  query")
+    print(f"  {'-' * 74}")
+
+    correct = {"router": 0, "llm": 0, "hybrid": 0}
+    llm_calls = 0
+    times = {"embed": [], "route": [], "llm": []}
+
+    for query, expected in cases:
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            embedding = raw_embeddings.embed_query(query)
+            times["embed"].append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            routed, margin = query_router.route(embedding)
+            times["route"].append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            llm_label = llm_classify(llm, query)
+            times["llm"].append(time.perf_counter() - t0)
+
+        settled = margin >= args.threshold and routed in NO_ARGUMENT_ROUTES
+        hybrid = routed if settled else llm_label
+        llm_calls += not settled
+
+        correct["router"] += routed == expected
+        correct["llm"]    += llm_label == expected
+        correct["hybrid"] += hybrid == expected
+
+        flag = "" if settled else " (llm)"
+        print(f"  {expected:<10} {routed:<10} {margin:>7.4f} {llm_label:<10} "
+              f"{hybrid + flag:<10}  {query[:34]}")
+
+    n = len(cases)
+    ms = lambda s: f"{s * 1000:8.1f}ms"
+    print()
+    print(f"  Accuracy:  router {correct['router']}/{n}   llm {correct['llm']}/{n}   "
+          f"hybrid {correct['hybrid']}/{n}   (LLM called for {llm_calls}/{n})")
+    print()
+    print(f"  {'latency':<10} {'p50':>10} {'p95':>10}")
+    for name, samples in times.items():
+        print(f"  {name:<10} {ms(percentile(samples, 0.5)):>10} {ms(percentile(samples, 0.95)):>10}")
+
+    # Mean classification cost per request. The router's embedding is shared
+    # with retrieval on RAG queries; tool queries pay for it on top.
+    route_mean = statistics.mean(times["route"])
+    llm_mean = statistics.mean(times["llm"])
+    hybrid_mean = route_mean + llm_mean * llm_calls / n
+    print()
+    print(f"  Mean classification cost per query: llm {ms(llm_mean).strip()}  →  "
+          f"hybrid {ms(hybrid_mean).strip()} (embedding reused by retrieval)")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
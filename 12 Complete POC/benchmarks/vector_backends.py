@@ -0,0 +1,137 @@
+"""
+benchmarks/vector_backends.py — Flat Index vs ChromaDB Search Benchmark
+
+Compares the two VECTOR_BACKEND options on the same synthetic corpus:
+  - "chroma": HNSW + {"access_level": {"$in": [...]}} WHERE filter
+  - "numpy":  FlatIndex (one matmul + argpartition + access-level masks)
+
+Vectors are random unit vectors (like ada-002 embeddings, which are
+normalized), spread over the three access levels. No API keys needed —
+the embeddings are generated locally and ChromaDB runs in memory.
+
+Reports per role:
+  - p50 / p95 query latency for each backend
+  - recall@k of ChromaDB's approximate results vs the exact flat index
+
+Usage:
+    python benchmarks/vector_backends.py
+    python benchmarks/vector_backends.py --chunks 200000 --dim 1536 --queries 200
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.vector_store.flat_index import FlatIndex
+
+
+ROLE_LEVELS = {
+    "employee": ["public"],
+    "manager":  ["public", "manager"],
+    "admin":    ["public", "manager", "confidential"],
+}
+
+# Rough shape of a real corpus: most chunks are public
+LEVEL_WEIGHTS = {"public": 0.6, "manager": 0.3, "confidential": 0.1}
+
+
+def make_corpus(n: int, dim: int, seed: int):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((n, dim), dtype=np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    levels = rng.choice(list(LEVEL_WEIGHTS), size=n, p=list(LEVEL_WEIGHTS.values()))
+    ids = [f"chunk_{i}" for i in range(n)]
+    metadatas = [{"doc_id": f"doc_{i // 50}", "chunk_index": i % 50, "access_level": str(lvl)}
+                 for i, lvl in enumerate(levels)]
+    return ids, vectors, metadatas
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks",  type=int, default=50000)
+    parser.add_argument("--dim",     type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k",       type=int, default=4)
+    parser.add_argument("--seed",    type=int, default=7)
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("  Vector Backend Benchmark — FlatIndex (numpy) vs ChromaDB (HNSW)")
+    print(f"  chunks={args.chunks}  dim={args.dim}  queries={args.queries}  k={args.k}")
+    print("=" * 70)
+
+    ids, vectors, metadatas = make_corpus(args.chunks, args.dim, args.seed)
+    documents = [f"text of {i}" for i in ids]
+    queries = make_corpus(args.queries, args.dim, args.seed + 1)[1]
+
+    # ── Build: flat index ──
+    t0 = time.perf_counter()
+    flat = FlatIndex()
+    flat.add(ids, vectors, documents, metadatas)
+    flat_build = time.perf_counter() - t0
+
+    # ── Build: ChromaDB (in-memory, same distance as the app's collection) ──
+    import chromadb
+    client = chromadb.EphemeralClient()
+    collection = client.create_collection("bench")
+    t0 = time.perf_counter()
+    batch = 5000
+    for start in range(0, args.chunks, batch):
+        end = start + batch
+        collection.add(
+            ids=ids[start:end],
+            embeddings=vectors[start:end].tolist(),
+            documents=documents[start:end],
+            metadatas=metadatas[start:end],
+        )
+    chroma_build = time.perf_counter() - t0
+
+    print(f"\n  Build time:  flat={flat_build:.2f}s   chroma={chroma_build:.2f}s\n")
+    print(f"  {'role':<10} {'flat p50':>10} {'flat p95':>10} {'chroma p50':>12} {'chroma p95':>12} {'recall@k':>10}")
+    print(f"  {'-' * 66}")
+
+    for role, levels in ROLE_LEVELS.items():
+        flat_times, chroma_times, recalls = [], [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            exact = flat.search(q, levels, args.k)
+            flat_times.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            approx = collection.query(
+                query_embeddings=[q.tolist()],
+                n_results=args.k,
+                where={"access_level": {"$in": levels}},
+                include=["documents", "metadatas", "distances"],
+            )
+            chroma_times.append(time.perf_counter() - t0)
+
+            exact_docs = {r["content"] for r in exact}
+            approx_docs = set(approx["documents"][0])
+            recalls.append(len(exact_docs & approx_docs) / max(1, len(exact_docs)))
+
+        ms = lambda s: f"{s * 1000:.2f}ms"
+        print(
+            f"  {role:<10} {ms(percentile(flat_times, 0.5)):>10} {ms(percentile(flat_times, 0.95)):>10} "
+            f"{ms(percentile(chroma_times, 0.5)):>12} {ms(percentile(chroma_times, 0.95)):>12} "
+            f"{statistics.mean(recalls):>10.3f}"
+        )
+
+    print()
+    print("  recall@k < 1.0 means HNSW missed some exact nearest neighbors.")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""
+bulk_ingest.py — Parallel bulk ingestion into ChromaDB
+
+Backfills many documents at once. Unlike ingest_sample_data.py, which
+handles one file at a time, the three stages run concurrently:
+
+  parse + split   → process pool  (CPU-bound: PDF parsing, text splitting)
+  embed           → thread pool   (network-bound: embedding API calls),
+                    at most --embed-concurrency batches in flight
+  store           → main thread   (one batched ChromaDB upsert per batch)
+
+New documents are only parsed while fewer than --embed-concurrency x
+EMBED_BACKLOG_FACTOR batches wait for the embedder, so memory stays
+bounded however many files are queued.
+
+Re-ingesting a doc_id goes through the same diff as ingest_file: text
+that is already stored keeps its embedding, only new or changed chunks
+are embedded, and chunks past the new end are deleted.
+
+If one of a document's batches fails, the document is deleted rather
+than left half-written without a catalog entry; re-run to ingest it.
+
+Input is either a directory (every .txt / .pdf file below it, all with
+the same --department / --access-level) or a manifest file: a JSON list
+or JSON Lines with one object per document, same fields as the entries
+in ingest_sample_data.py:
+
+  {"file_path": "hr/handbook.pdf", "title": "HR Handbook", "department": "HR",
+   "access_level": "public", "doc_id": "doc_hr_handbook"}
+
+(file_path is relative to the manifest; doc_id is optional.)
+
+Usage:
+    python bulk_ingest.py data/documents --department HR --access-level public
+    python bulk_ingest.py manifest.jsonl --workers 8 --embed-concurrency 8 --batch-size 128
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, List, Tuple
+
+# Make sure we can import from the app package
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.config import INGEST_BATCH_SIZE
+from app.models.schemas import AccessLevel
+from app.rag.ingestion import IncrementalWriter, PlannedBatch, split_file
+from app.vector_store.catalog import document_catalog
+from app.vector_store.chroma_store import vector_store
+
+
+SUPPORTED_EXTENSIONS = (".txt", ".pdf")
+
+# Batches allowed to wait for the embedder, per embedding request in flight,
+# before no further documents are parsed
+EMBED_BACKLOG_FACTOR = 4
+
+
+# ──────────────────────────────────────────────
+# Job discovery
+# ──────────────────────────────────────────────
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def jobs_from_directory(root: str, department: str, access_level: AccessLevel) -> List[Dict]:
+    """One job per supported file below root; title and doc_id come from the path."""
+    jobs = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if not name.lower().endswith(SUPPORTED_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, name)
+            stem = os.path.splitext(os.path.relpath(path, root))[0]
+            jobs.append({
+                "file_path":    path,
+                "title":        os.path.basename(stem).replace("_", " ").title(),
+                "department":   department,
+                "access_level": access_level,
+                "doc_id":       f"doc_{_slug(stem)}",
+            })
+    _check_unique_doc_ids(jobs)
+    return jobs
+
+
+def jobs_from_manifest(manifest_path: str) -> List[Dict]:
+    """Read a JSON list or JSON Lines manifest; file paths are relative to it."""
+    with open(manifest_path, encoding="utf-8") as f:
+        raw = f.read().strip()
+    entries = json.loads(raw) if raw.startswith("[") else [json.loads(line) for line in raw.splitlines() if line.strip()]
+
+    base = os.path.dirname(os.path.abspath(manifest_path))
+    jobs = []
+    for entry in entries:
+        path = entry["file_path"]
+        jobs.append({
+            "file_path":    path if os.path.isabs(path) else os.path.join(base, path),
+            "title":        entry["title"],
+            "department":   entry["department"],
+            "access_level": AccessLevel(entry.get("access_level", AccessLevel.PUBLIC.value)),
+            "doc_id":       entry.get("doc_id") or f"doc_{_slug(os.path.splitext(path)[0])}",
+        })
+    _check_unique_doc_ids(jobs)
+    return jobs
+
+
+def _check_unique_doc_ids(jobs: List[Dict]) -> None:
+    """Two jobs with one doc_id would overwrite each other's chunks; refuse them."""
+    paths_by_id: Dict[str, List[str]] = {}
+    for job in jobs:
+        paths_by_id.setdefault(job["doc_id"], []).append(job["file_path"])
+    duplicates = {doc_id: paths for doc_id, paths in paths_by_id.items() if len(paths) > 1}
+    if duplicates:
+        details = "; ".join(f"{doc_id}: {', '.join(paths)}" for doc_id, paths in sorted(duplicates.items()))
+        raise ValueError(f"duplicate doc_id in input — {details}")
+
+
+# ──────────────────────────────────────────────
+# Stage workers
+# ──────────────────────────────────────────────
+
+def parse_and_split(file_path: str) -> Tuple[List[str], float]:
+    """Process-pool stage: load + split one file. Returns (chunk texts, seconds)."""
+    started = time.perf_counter()
+    texts = list(split_file(file_path))
+    return texts, time.perf_counter() - started
+
+
+def embed_batch(texts: List[str]) -> Tuple[List[List[float]], float]:
+    """Thread-pool stage: one embedding request (through the shared cache)."""
+    started = time.perf_counter()
+    vectors = vector_store.embeddings.embed_documents(texts)
+    return vectors, time.perf_counter() - started
+
+
+# ──────────────────────────────────────────────
+# Pipeline
+# ──────────────────────────────────────────────
+
+class BulkIngestor:
+    """Runs the parse → embed → store pipeline and accumulates stage timings."""
+
+    def __init__(self, workers: int, embed_concurrency: int, batch_size: int):
+        self.workers           = workers
+        self.embed_concurrency = embed_concurrency
+        self.batch_size        = batch_size
+
+        self.stage_seconds = {"parse": 0.0, "embed": 0.0, "store": 0.0}
+        self.docs_done  = 0
+        self.chunks_done = 0
+        self.failures: List[Tuple[str, str]] = []
+
+        # doc_id → [job, writer, batches still to store]
+        self._pending_docs: Dict[str, list] = {}
+        self._embedding: Dict[Future, Tuple[str, PlannedBatch]] = {}
+
+    def run(self, jobs: List[Dict]) -> None:
+        queue = list(reversed(jobs))
+        parsing: Dict[Future, Dict] = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers) as parse_pool, \
+             ThreadPoolExecutor(max_workers=self.embed_concurrency) as embed_pool:
+
+            while queue or parsing or self._embedding:
+                # Keep the parsers a bounded distance ahead of the embedder:
+                # a parsed document's batches all wait in the embed pool's queue
+                while (queue and len(parsing) < self.workers * 2
+                       and len(self._embedding) < self.embed_concurrency * EMBED_BACKLOG_FACTOR):
+                    job = queue.pop()
+                    parsing[parse_pool.submit(parse_and_split, job["file_path"])] = job
+
+                done, _ = wait([*parsing, *self._embedding], return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future in parsing:
+                        self._on_parsed(parsing.pop(future), future, embed_pool)
+                    else:
+                        self._on_embedded(future)
+
+    def _on_parsed(self, job: Dict, future: Future, embed_pool: ThreadPoolExecutor) -> None:
+        try:
+            texts, seconds = future.result()
+        except Exception as e:
+            self.failures.append((job["file_path"], str(e)))
+            return
+        self.stage_seconds["parse"] += seconds
+
+        doc_id = job["doc_id"]
+        if not texts:
+            self.failures.append((job["file_path"], "no text extracted"))
+            return
+
+        # Same diff path as ingest_file: chunks whose text is already stored
+        # under this doc_id reuse their embedding, and stale chunks are
+        # deleted once every batch is stored
+        writer = IncrementalWriter(doc_id, {
+            "doc_id":       doc_id,
+            "title":        job["title"],
+            "department":   job["department"],
+            "access_level": job["access_level"].value,
+            "source":       job["file_path"],
+        })
+        starts = range(0, len(texts), self.batch_size)
+        self._pending_docs[doc_id] = [job, writer, len(starts)]
+
+        for start in starts:
+            try:
+                batch = writer.plan(texts[start:start + self.batch_size])
+            except Exception as e:
+                self._fail(doc_id, e)
+                return
+            if batch.missing:
+                self._embedding[embed_pool.submit(embed_batch, batch.missing)] = (doc_id, batch)
+            else:
+                self._store(doc_id, batch, [])
+
+    def _on_embedded(self, future: Future) -> None:
+        doc_id, batch = self._embedding.pop(future)
+        if doc_id not in self._pending_docs:
+            return   # an earlier batch of this document already failed
+
+        try:
+            vectors, seconds = future.result()
+        except Exception as e:
+            self._fail(doc_id, e)
+            return
+        self.stage_seconds["embed"] += seconds
+        self._store(doc_id, batch, vectors)
+
+    def _store(self, doc_id: str, batch: PlannedBatch, vectors: List[List[float]]) -> None:
+        pending = self._pending_docs.get(doc_id)
+        if pending is None:
+            return
+        job, writer, _ = pending
+
+        try:
+            started = time.perf_counter()
+            writer.store(batch, vectors)
+            pending[2] -= 1
+            if pending[2] == 0:
+                diff = writer.finish()
+            self.stage_seconds["store"] += time.perf_counter() - started
+        except Exception as e:
+            self._fail(doc_id, e)
+            return
+
+        if pending[2] == 0:
+            del self._pending_docs[doc_id]
+            document_catalog.upsert_document(
+                doc_id=doc_id,
+                title=job["title"],
+                department=job["department"],
+                access_level=job["access_level"].value,
+                chunk_count=writer.count,
+                source=job["file_path"],
+            )
+            self.docs_done   += 1
+            self.chunks_done += writer.count
+            print(f"  OK  {job['title']}  ({writer.count} chunks, "
+                  f"{diff['embedded']} embedded, {diff['removed']} removed)")
+
+    def _fail(self, doc_id: str, error: Exception) -> None:
+        job = self._pending_docs.pop(doc_id)[0]
+        self.failures.append((job["file_path"], str(error)))
+        # Some chunks may already hold the new text (or a previous version's
+        # chunks were overwritten), so no consistent version is left: remove
+        # the document entirely rather than leave chunks the catalog does not list
+        vector_store.delete_document(doc_id)
+
+
+# ──────────────────────────────────────────────
+# CLI
+# ──────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory of .txt/.pdf files, or a .json/.jsonl manifest")
+    parser.add_argument("--department",        default="General", help="Department for directory input")
+    parser.add_argument("--access-level",      default=AccessLevel.PUBLIC.value,
+                        choices=[level.value for level in AccessLevel], help="Access level for directory input")
+    parser.add_argument("--workers",           type=int, default=os.cpu_count() or 2,
+                        help="Parse/split processes")
+    parser.add_argument("--embed-concurrency", type=int, default=4,
+                        help="Embedding requests in flight at once")
+    parser.add_argument("--batch-size",        type=int, default=INGEST_BATCH_SIZE,
+                        help="Chunks per embedding request / ChromaDB upsert")
+    args = parser.parse_args()
+
+    try:
+        if os.path.isdir(args.source):
+            jobs = jobs_from_directory(args.source, args.department, AccessLevel(args.access_level))
+        else:
+            jobs = jobs_from_manifest(args.source)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print("=" * 60)
+    print("  AI Knowledge Assistant — Bulk Ingestion")
+    print(f"  documents={len(jobs)}  workers={args.workers}  "
+          f"embed_concurrency={args.embed_concurrency}  batch_size={args.batch_size}")
+    print("=" * 60)
+    print()
+
+    ingestor = BulkIngestor(args.workers, args.embed_concurrency, args.batch_size)
+    started = time.perf_counter()
+    ingestor.run(jobs)
+    elapsed = max(time.perf_counter() - started, 1e-9)
+
+    for file_path, error in ingestor.failures:
+        print(f"  ERROR  {file_path}: {error}")
+
+    stages = ingestor.stage_seconds
+    print()
+    print("=" * 60)
+    print(f"  Ingested {ingestor.docs_done}/{len(jobs)} documents, "
+          f"{ingestor.chunks_done} chunks in {elapsed:.1f}s")
+    print(f"  Throughput: {ingestor.docs_done / elapsed:.2f} docs/sec, "
+          f"{ingestor.chunks_done / elapsed:.1f} chunks/sec")
+    print("  Time per stage (summed across workers):")
+    print(f"    parse + split: {stages['parse']:8.1f}s")
+    print(f"    embed:         {stages['embed']:8.1f}s")
+    print(f"    store:         {stages['store']:8.1f}s")
+
+    cache_stats = vector_store.embedding_cache_stats()
+    if cache_stats:
+        print(f"  Embedding cache: {cache_stats['hits']} hits / "
+              f"{cache_stats['misses']} misses (hit rate {cache_stats['hit_rate']:.0%})")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
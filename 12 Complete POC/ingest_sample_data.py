@@ -16,6 +16,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.rag.ingestion import ingest_file
 from app.models.schemas import AccessLevel
+from app.vector_store.chroma_store import vector_store
 
 
 def main():
@@ -93,6 +94,11 @@ def main():
     print(f"  Ingestion complete!")
     print(f"  Total chunks stored: {total_chunks}")
     print(f"  Vector DB: ./data/chroma_db")
+
+    cache_stats = vector_store.embedding_cache_stats()
+    if cache_stats:
+        print(f"  Embedding cache: {cache_stats['hits']} hits / "
+              f"{cache_stats['misses']} misses (hit rate {cache_stats['hit_rate']:.0%})")
     print()
     print("  Next step: start the server with:")
     print("  uvicorn app.main:app --reload")